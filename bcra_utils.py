@@ -1,54 +1,105 @@
 # bcra_utils.py
 from __future__ import annotations
 
-from dataclasses import dataclass
+import ast
+import functools
+import hashlib
+import inspect
+import io
+import json
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List, Optional, Tuple
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+try:  # parser CSV multihilo; si no está, usamos el de pandas
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:  # pragma: no cover
+    pa, pa_csv = None, None
+
+
+@contextmanager
+def atomic_path(out: Path):
+    """
+    Temporal al lado de `out` para escribir y reemplazar atómicamente al salir sin error.
+    El nombre es único (pid + uuid): dos procesos (p.ej. workers de la app y un fetch)
+    escribiendo el mismo archivo no se pisan el temporal. Si algo falla, lo borra.
+    """
+    out = Path(out)
+    tmp = out.with_name(f"{out.name}.{os.getpid()}.{uuid.uuid4().hex[:12]}.tmp")
+    try:
+        yield tmp
+        tmp.replace(out)
+    finally:
+        tmp.unlink(missing_ok=True)
+
 
 # =========================
 # Carga de datos (formato long)
 # =========================
 
-def _read_one_csv(path: Path) -> pd.DataFrame:
+def _read_raw_csv(path: Path, data: Optional[bytes] = None) -> pd.DataFrame:
+    """
+    Lee el CSV crudo (o `data`, si viene: p.ej. header + cola agregada).
+    Con pyarrow el parseo es multihilo y las fechas ISO ya vienen tipadas
+    (evita la inferencia fila a fila de `to_datetime`); si falla, pandas.
+    """
+    if pa_csv is not None:
+        try:
+            src = pa.BufferReader(data) if data is not None else path
+            table = pa_csv.read_csv(src, read_options=pa_csv.ReadOptions(use_threads=True))
+            return table.to_pandas(date_as_object=False)
+        except Exception:
+            pass
+    return pd.read_csv(io.BytesIO(data) if data is not None else path)
+
+
+def _to_fecha(col: pd.Series) -> pd.Series:
+    """Columna de fechas -> datetime64 naive (UTC). Barato si ya viene tipada."""
+    return pd.to_datetime(col, errors="coerce", utc=True).dt.tz_localize(None)
+
+
+def _find_roles(columns: Iterable[str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Identifica (fecha, descripcion, valor) entre nombres de columna ya normalizados.
+    """
+    columns = list(columns)
+    # fecha: 'fecha' o 'date'
+    fcol = next((c for c in columns if c in ("fecha", "date")), None)
+    # descripcion: 'descripcion'/'description'/'variable'/'serie'
+    dcol = next((c for c in columns if c in ("descripcion", "description", "variable", "serie", "series", "name")), None)
+    # valor: 'valor'/'value'
+    vcol = next((c for c in columns if c in ("valor", "value")), None)
+    return fcol, dcol, vcol
+
+
+def _read_one_csv(path: Path, data: Optional[bytes] = None) -> pd.DataFrame:
     """
     Intenta leer un CSV cualquiera del folder data/ y devolverlo en formato:
       fecha (datetime), descripcion (str), valor (float)
     Admite varias formas de columnas y normaliza.
     """
-    df = pd.read_csv(path)
+    df = _read_raw_csv(path, data)
     # normalizar nombres
     df.columns = [c.strip().lower() for c in df.columns]
-
-    # identificar columnas posibles
-    # fecha: 'fecha' o 'date'
-    fcol = None
-    for c in df.columns:
-        if c in ("fecha", "date"):
-            fcol = c
-            break
-
-    # descripcion: 'descripcion'/'description'/'variable'/'serie'
-    dcol = None
-    for c in df.columns:
-        if c in ("descripcion", "description", "variable", "serie", "series", "name"):
-            dcol = c
-            break
-
-    # valor: 'valor'/'value'
-    vcol = None
-    for c in df.columns:
-        if c in ("valor", "value"):
-            vcol = c
-            break
+    fcol, dcol, vcol = _find_roles(df.columns)
 
     # Caso: CSV “wide” (muchas columnas con series). Intentamos stackear.
     if fcol and not dcol and not vcol and len(df.columns) > 1:
         df = df.rename(columns={fcol: "fecha"})
-        df["fecha"] = pd.to_datetime(df["fecha"], errors="coerce", utc=True).dt.tz_localize(None)
+        df["fecha"] = _to_fecha(df["fecha"])
         # columnas de series = todo menos fecha
         value_cols = [c for c in df.columns if c != "fecha"]
         long = df.melt(id_vars="fecha", value_vars=value_cols, var_name="descripcion", value_name="valor")
@@ -59,7 +110,7 @@ def _read_one_csv(path: Path) -> pd.DataFrame:
     # Caso “long” ya bien formado
     if fcol and dcol and vcol:
         out = pd.DataFrame({
-            "fecha": pd.to_datetime(df[fcol], errors="coerce", utc=True).dt.tz_localize(None),
+            "fecha": _to_fecha(df[fcol]),
             "descripcion": df[dcol].astype(str),
             "valor": pd.to_numeric(df[vcol], errors="coerce"),
         })
@@ -70,7 +121,7 @@ def _read_one_csv(path: Path) -> pd.DataFrame:
     if fcol and len(df.columns) == 2:
         other = [c for c in df.columns if c != fcol][0]
         out = pd.DataFrame({
-            "fecha": pd.to_datetime(df[fcol], errors="coerce", utc=True).dt.tz_localize(None),
+            "fecha": _to_fecha(df[fcol]),
             "descripcion": Path(path).stem,
             "valor": pd.to_numeric(df[other], errors="coerce"),
         })
@@ -81,70 +132,2567 @@ def _read_one_csv(path: Path) -> pd.DataFrame:
     return pd.DataFrame(columns=["fecha", "descripcion", "valor"])
 
 
-def load_bcra_long(data_dir: str | Path = "data") -> pd.DataFrame:
+# =========================
+# Esquema detectado por archivo (cacheado)
+# =========================
+
+# Por CSV: layout, columnas, separador y formato de fecha; se reusa mientras el header no cambie.
+SCHEMA_FILE = "series_store.schemas.json"
+_SAMPLE_BYTES = 1 << 16
+_DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%d/%m/%Y", "%Y-%m")
+
+
+def _head_bytes(path: Path, data: Optional[bytes] = None) -> bytes:
+    if data is not None:
+        return data[:_SAMPLE_BYTES]
+    with open(path, "rb") as f:
+        return f.read(_SAMPLE_BYTES)
+
+
+def _detect_schema(path: Path, sample: bytes) -> dict:
     """
-    Carga TODOS los CSV de `data/` y devuelve un DF long con columnas:
-      fecha (datetime), descripcion (str), valor (float)
+    Hace UNA vez lo que `_read_one_csv` hace en cada carga: separador, layout
+    (wide/long/pair/none), columnas y formato de fecha (sobre una muestra).
     """
-    data_dir = Path(data_dir)
-    frames: List[pd.DataFrame] = []
-    for p in sorted(data_dir.glob("*.csv")):
-        try:
-            frames.append(_read_one_csv(p))
-        except Exception:
-            # Ignoramos CSVs rotos; evitamos romper toda la app
-            continue
-    if not frames:
+    import csv
+
+    header = sample.split(b"\n", 1)[0]
+    try:
+        sep = csv.Sniffer().sniff(header.decode("utf-8", "replace"), delimiters=",;\t|").delimiter
+    except csv.Error:
+        sep = ","
+    # sólo líneas completas
+    body = sample[: sample.rfind(b"\n") + 1] if b"\n" in sample else sample
+    df = pd.read_csv(io.BytesIO(body), sep=sep, dtype=str)
+    norm = {c.strip().lower(): c for c in df.columns}
+    fcol, dcol, vcol = _find_roles(norm)
+
+    schema = {"key": _sha1(header), "sep": sep, "layout": "none", "date_format": None}
+    if fcol and not dcol and not vcol and len(norm) > 1:
+        schema.update(layout="wide", value_cols={norm[c]: c for c in norm if c != fcol})
+    elif fcol and dcol and vcol:
+        schema.update(layout="long", descripcion=norm[dcol], valor=norm[vcol])
+    elif fcol and len(norm) == 2:
+        other = [c for c in norm if c != fcol][0]
+        schema.update(layout="pair", valor=norm[other])
+    if fcol:
+        schema["fecha"] = norm[fcol]
+        vals = df[norm[fcol]].dropna()
+        for fmt in _DATE_FORMATS:
+            if len(vals) and pd.to_datetime(vals, format=fmt, errors="coerce").notna().all():
+                schema["date_format"] = fmt
+                break
+    return schema
+
+
+def _read_with_schema(path: Path, schema: dict, data: Optional[bytes] = None) -> pd.DataFrame:
+    """
+    Lee con el esquema ya conocido: sólo las columnas necesarias, tipos explícitos y
+    formato de fecha fijo (sin inferencia). Si el archivo no respeta el esquema, levanta.
+    """
+    layout = schema["layout"]
+    if layout == "none":
         return pd.DataFrame(columns=["fecha", "descripcion", "valor"])
-    df = pd.concat(frames, ignore_index=True)
-    # limpieza final
-    df = df.dropna(subset=["fecha", "valor"])
-    df["descripcion"] = df["descripcion"].astype(str)
-    df = df.sort_values(["descripcion", "fecha"]).reset_index(drop=True)
+    fcol, fmt = schema["fecha"], schema["date_format"]
+    if layout == "wide":
+        num_cols = list(schema["value_cols"])
+    else:
+        num_cols = [schema["valor"]]
+    str_cols = [schema["descripcion"]] if layout == "long" else []
+    usecols = [fcol] + str_cols + num_cols
+
+    if pa_csv is not None:
+        types = {c: pa.float64() for c in num_cols}
+        types.update({c: pa.string() for c in str_cols})
+        types[fcol] = pa.timestamp("s") if fmt else pa.string()
+        table = pa_csv.read_csv(
+            pa.BufferReader(data) if data is not None else path,
+            read_options=pa_csv.ReadOptions(use_threads=True),
+            parse_options=pa_csv.ParseOptions(delimiter=schema["sep"]),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=usecols, column_types=types,
+                timestamp_parsers=[fmt] if fmt else None,
+            ),
+        )
+        df = table.to_pandas(date_as_object=False)
+    else:
+        df = pd.read_csv(
+            io.BytesIO(data) if data is not None else path, sep=schema["sep"], usecols=usecols,
+            dtype={**{c: "float64" for c in num_cols}, **{c: str for c in str_cols}, fcol: str},
+        )
+        if fmt:
+            df[fcol] = pd.to_datetime(df[fcol], format=fmt, errors="coerce")
+    fecha = df[fcol].astype("datetime64[ns]") if fmt else _to_fecha(df[fcol])
+
+    if layout == "wide":
+        wide = df[num_cols].rename(columns=schema["value_cols"])
+        wide.insert(0, "fecha", fecha)
+        out = wide.melt(id_vars="fecha", var_name="descripcion", value_name="valor")
+    elif layout == "long":
+        out = pd.DataFrame({"fecha": fecha, "descripcion": df[schema["descripcion"]].astype(str), "valor": df[schema["valor"]]})
+    else:
+        out = pd.DataFrame({"fecha": fecha, "descripcion": Path(path).stem, "valor": df[schema["valor"]]})
+    out = out.dropna(subset=["fecha", "valor"])
+    return out[["fecha", "descripcion", "valor"]].sort_values("fecha")
+
+
+def _read_schemas(data_dir: Path) -> dict:
+    try:
+        return json.loads((data_dir / SCHEMA_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_schemas(data_dir: Path, schemas: dict) -> None:
+    try:
+        with atomic_path(data_dir / SCHEMA_FILE) as tmp:
+            tmp.write_text(json.dumps(schemas, indent=1, sort_keys=True, ensure_ascii=False), encoding="utf-8")
+    except OSError:
+        pass
+
+
+# =========================
+# Registro de fuentes (precedencia + alias)
+# =========================
+
+@dataclass(frozen=True)
+class Source:
+    pattern: str                 # glob sobre el nombre del archivo
+    priority: int                # menor = gana cuando dos fuentes traen el mismo (fecha, serie)
+    aliases: dict = field(default_factory=dict)  # nombre en el archivo -> nombre canónico
+
+
+# Varias fuentes describen la misma serie: la API de Monetarias es la canónica; el CSV
+# histórico de base monetaria (serie = nombre de archivo) y los derivados sólo completan.
+SOURCES: Tuple[Source, ...] = (
+    Source("monetarias_long.csv", 0),
+    Source("base_monetaria.csv", 1, {"base_monetaria": "Base monetaria\xa0- Total (en millones de pesos)"}),
+    Source("macro_core_long.csv", 2),
+)
+_DEFAULT_PRIORITY = 9
+
+
+def _source_for(path: Path) -> Source:
+    import fnmatch
+    return next((s for s in SOURCES if fnmatch.fnmatch(Path(path).name, s.pattern)), Source("*", _DEFAULT_PRIORITY))
+
+
+def _apply_source(df: pd.DataFrame, path: Path) -> pd.DataFrame:
+    """Renombra las series del archivo a su nombre canónico según el registro."""
+    aliases = _source_for(path).aliases
+    if aliases and not df.empty:
+        df = df.assign(descripcion=df["descripcion"].replace(aliases))
     return df
 
 
+def _read_one_csv_safe(path: Path, data: Optional[bytes] = None, schemas: Optional[dict] = None) -> Optional[pd.DataFrame]:
+    """
+    Lee un CSV usando el esquema cacheado en `schemas` (lo detecta y lo guarda ahí si falta
+    o si cambió el header). Si la lectura tipada falla, cae a la detección genérica.
+    """
+    try:
+        if schemas is not None:
+            sample = _head_bytes(path, data)
+            key = _sha1(sample.split(b"\n", 1)[0])
+            schema = schemas.get(path.name)
+            if not schema or schema.get("key") != key:
+                schema = schemas[path.name] = _detect_schema(path, sample)
+            try:
+                return _apply_source(_read_with_schema(path, schema, data), path)
+            except Exception:
+                pass
+        return _apply_source(_read_one_csv(path, data), path)
+    except Exception:
+        # Ignoramos CSVs rotos; evitamos romper toda la app
+        return None
+
+
+def _read_csv_files(paths: List[Path], max_workers: Optional[int] = None) -> List[pd.DataFrame]:
+    """Parsea `paths` en paralelo (thread pool); los rotos vuelven como DF vacío."""
+    if not paths:
+        return []
+    data_dir = paths[0].parent
+    schemas = _read_schemas(data_dir)
+    before = json.dumps(schemas, sort_keys=True)
+    if max_workers is None:
+        max_workers = min(len(paths), os.cpu_count() or 1) or 1
+    empty = pd.DataFrame(columns=["fecha", "descripcion", "valor"])
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        frames = [f if f is not None else empty for f in ex.map(lambda p: _read_one_csv_safe(p, schemas=schemas), paths)]
+    if json.dumps(schemas, sort_keys=True) != before:
+        _write_schemas(data_dir, schemas)
+    return frames
+
+
+def _concat_long(frames: List[pd.DataFrame], paths: Optional[List[Path]] = None) -> pd.DataFrame:
+    """
+    Concatena una sola vez y deja el DF long limpio y ordenado por (descripcion, fecha).
+    Cada (descripcion, fecha) queda una sola vez: gana la fuente de menor prioridad
+    (ver `SOURCES`, según `paths`) y, dentro de un mismo archivo, la última fila.
+    """
+    if paths is None:
+        paths = [Path("")] * len(frames)
+    pairs = [(f, _source_for(p).priority) for f, p in zip(frames, paths) if not f.empty]
+    if not pairs:
+        return pd.DataFrame(columns=["fecha", "descripcion", "valor"])
+    df = pd.concat([f for f, _ in pairs], ignore_index=True)
+    prio = np.repeat([pr for _, pr in pairs], [len(f) for f, _ in pairs])
+    # limpieza final
+    keep = df["fecha"].notna().to_numpy() & df["valor"].notna().to_numpy()
+    df, prio = df[keep].assign(descripcion=lambda d: d["descripcion"].astype(str)), prio[keep]
+    # de-duplicación vectorizada: orden estable por (serie, fecha, prioridad, fila descendente)
+    codes, _ = pd.factorize(df["descripcion"], sort=True)
+    days = _to_days(df["fecha"])
+    order = np.lexsort((-np.arange(len(df)), prio, days, codes))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (codes[order][1:] != codes[order][:-1]) | (days[order][1:] != days[order][:-1])
+    return df.iloc[order[first]].reset_index(drop=True)
+
+
+def _load_csv_dir(data_dir: Path, max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Lee TODOS los CSV de `data_dir` (camino lento / fallback) y devuelve el DF long.
+    Los archivos se parsean en paralelo (thread pool) y se concatenan una sola vez.
+    """
+    paths = sorted(data_dir.glob("*.csv"))
+    return _concat_long(_read_csv_files(paths, max_workers), paths)
+
+
 # =========================
-# Helpers de búsqueda / resample
+# Store columnar (Parquet)
 # =========================
 
-def _norm(s: str) -> str:
-    return str(s).strip().lower()
+STORE_FILE = "series_store.parquet"
+STORE_ROW_GROUP = 1 << 16
 
 
-def find_first(candidates: Iterable[str], *tokens: str) -> Optional[str]:
+def _store_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("fecha", pa.date32()),
+        ("descripcion", pa.dictionary(pa.int32(), pa.string())),
+        ("valor", pa.float64()),
+    ])
+
+
+def write_store(df: "pd.DataFrame | SeriesStore", data_dir: str | Path = "data") -> Path:
     """
-    Devuelve el primer string en `candidates` que contenga TODOS los tokens (insensible a mayúsculas).
+    Escribe el DF long (fecha, descripcion, valor) —o un `SeriesStore`— como store
+    Parquet canónico: fecha date32, descripcion dictionary-encoded, valor float64, zstd.
+    Antes suma las versiones en términos reales de las series en pesos (ver `with_real_terms`).
+    También deja al lado el snapshot Arrow (ver `write_snapshot`), el resumen por
+    serie (ver `write_stats`) y las vistas de baja frecuencia (ver `write_views`).
+    El estado de KPIs se actualiza aparte, con el delta (ver `refresh_kpi_state`).
+    Se escribe a un temporal y se reemplaza atómicamente.
+    Además registra la versión en `data/store/` (ver `record_version`): eso es lo que se
+    commitea; el Parquet, el snapshot y el resumen son derivados locales.
     """
-    toks = [_norm(t) for t in tokens if t]
-    for c in candidates:
-        sc = _norm(c)
-        if all(t in sc for t in toks):
-            return c
-    return None
+    store = df if isinstance(df, SeriesStore) else SeriesStore.from_long(df)
+    store = with_real_terms(store, data_dir)
+    # primero la versión: así el Parquet queda más nuevo que el manifest de versiones
+    record_version(store, data_dir)
+    return _write_store_files(store, Path(data_dir))
 
 
-def resample_series(s: pd.Series, freq: str = "D", how: str = "last") -> pd.Series:
+def _write_parquet(table, out: Path) -> Path:
+    import pyarrow.parquet as pq
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    # row groups chicos + orden por serie => min/max de cada grupo sirven para podar
+    with atomic_path(out) as tmp:
+        pq.write_table(table, tmp, compression="zstd", row_group_size=STORE_ROW_GROUP)
+    return out
+
+
+def _write_store_files(store: "SeriesStore", data_dir: Path) -> Path:
+    table = store.to_arrow()
+    out = _write_parquet(table, data_dir / STORE_FILE)
+    write_snapshot(table, data_dir)
+    write_stats(store, data_dir / STATS_FILE, _real_meta(_bcra_meta(data_dir), store))
+    write_views(store, data_dir / VIEWS_FILE)
+    return out
+
+
+# Manifest de ingesta: por cada CSV, hasta qué byte y cuántas filas ya están en el store.
+MANIFEST_FILE = "series_store.manifest.json"
+_SIG_BYTES = 4096
+
+
+def _sha1(b: bytes) -> str:
+    return hashlib.sha1(b).hexdigest()
+
+
+def _file_entry(path: Path, rows: int) -> dict:
+    """Estado de `path` tal como quedó ingerido (offset = tamaño si termina en newline)."""
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(max(0, size - _SIG_BYTES))
+        tail = f.read()
+    return {
+        "size": size,
+        "rows": int(rows),
+        "offset": size if tail.endswith(b"\n") else None,
+        "head": _sha1(header),
+        "tail": _sha1(tail),
+    }
+
+
+def _appended_bytes(path: Path, entry: Optional[dict]) -> Optional[bytes]:
     """
-    Re-muestrea una serie (index datetime) a 'D' o 'M', usando 'last' por default.
+    Si `path` sólo creció desde `entry` (mismo header y mismos bytes antes del offset),
+    devuelve header + cola nueva (b"" si no cambió). None => hay que re-parsear todo.
     """
-    if s.empty:
-        return s
-    if how not in ("last", "mean", "sum", "first"):
-        how = "last"
-    if freq.upper().startswith("M"):
-        r = s.resample("M")
+    if not entry or entry.get("offset") is None:
+        return None
+    offset = entry["offset"]
+    size = path.stat().st_size
+    if size < offset:
+        return None
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(max(0, offset - _SIG_BYTES))
+        before = f.read(min(offset, _SIG_BYTES))
+        if _sha1(header) != entry["head"] or _sha1(before) != entry["tail"]:
+            return None
+        if size == offset:
+            return b""
+        f.seek(offset)
+        return header + f.read()
+
+
+def _read_manifest(data_dir: Path) -> dict:
+    try:
+        return json.loads((data_dir / MANIFEST_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(data_dir: Path, manifest: dict) -> None:
+    with atomic_path(data_dir / MANIFEST_FILE) as tmp:
+        tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+
+
+def build_store(data_dir: str | Path = "data", incremental: bool = True) -> Path:
+    """
+    Re-ingesta los CSV de `data_dir` y regenera el store Parquet (+ snapshot Arrow).
+    Lo llaman los scripts de fetch/build al terminar.
+
+    Con `incremental=True`, si todos los CSV ya ingeridos sólo crecieron (append), se
+    parsean únicamente las colas nuevas y se suman al store existente; si alguno fue
+    reescrito, desapareció o no hay store previo, se re-parsea todo. El manifest y los
+    esquemas se commitean con `data/store/`: desde un clon limpio el store previo sale de
+    las versiones.
+    """
+    data_dir = Path(data_dir)
+    paths = sorted(data_dir.glob("*.csv"))
+    store = data_dir / STORE_FILE
+    if incremental and _mtime(data_dir / VERSIONS_DIR / VERSIONS_MANIFEST) > _mtime(store):
+        # clon limpio (o pull): el Parquet es derivado local; se re-materializa desde las
+        # versiones commiteadas, que viajan junto con el manifest de ingesta
+        _write_store_files(load_version(None, data_dir), data_dir)
+    manifest = _read_manifest(data_dir) if incremental and store.exists() else {}
+
+    tails = {}
+    if manifest and set(manifest) <= {p.name for p in paths}:
+        for p in paths:
+            # CSV nuevo => se parsea entero, pero sin tocar el resto
+            tails[p.name] = _appended_bytes(p, manifest.get(p.name)) if p.name in manifest else p.read_bytes()
+    if not tails or any(t is None for t in tails.values()):
+        return _build_store_full(data_dir, paths)
+
+    new_manifest = dict(manifest)
+    schemas = _read_schemas(data_dir)
+    parts, part_paths = [], []
+    for p in paths:
+        data = tails[p.name]
+        if not data:
+            continue
+        f = _read_one_csv_safe(p, data, schemas)
+        f = f if f is not None else pd.DataFrame(columns=["fecha", "descripcion", "valor"])
+        parts.append(f)
+        part_paths.append(p)
+        new_manifest[p.name] = _file_entry(p, manifest.get(p.name, {}).get("rows", 0) + len(f))
+    if parts:
+        # el store viejo no vuelve a pandas: se mergea a nivel arrays
+        merged = SeriesStore.concat([_read_store(store), SeriesStore.from_long(_concat_long(parts, part_paths))])
+        if merged.duplicated().any():
+            # la cola pisa fechas ya guardadas: el store no sabe de qué fuente vino cada
+            # fila, así que se reconstruye para resolver la precedencia
+            return _build_store_full(data_dir, paths)
+        out = write_store(merged, data_dir)
     else:
-        r = s.resample("D")
-    if how == "mean":
-        out = r.mean()
-    elif how == "sum":
-        out = r.sum()
-    elif how == "first":
-        out = r.first()
+        out = store
+    _write_schemas(data_dir, schemas)
+    _write_manifest(data_dir, new_manifest)
+    return out
+
+
+def _build_store_full(data_dir: Path, paths: List[Path]) -> Path:
+    frames = _read_csv_files(paths)
+    new_manifest = {p.name: _file_entry(p, len(f)) for p, f in zip(paths, frames)}
+    out = write_store(_concat_long(frames, paths), data_dir)
+    _write_manifest(data_dir, new_manifest)
+    return out
+
+
+def _read_store(path: Path, value_dtype: str = "float64") -> "SeriesStore":
+    """
+    Lee el store Parquet directo a arrays (sin pasar por object strings de pandas).
+    """
+    import pyarrow.parquet as pq
+    return SeriesStore.from_arrow(pq.read_table(path), value_dtype=value_dtype)
+
+
+# =========================
+# Snapshot Arrow (memory-mapped)
+# =========================
+
+SNAPSHOT_FILE = "series_store.arrow"
+
+
+def write_snapshot(table, data_dir: str | Path = "data") -> Path:
+    """
+    Escribe `table` (esquema del store) como Arrow IPC sin comprimir y en un solo batch,
+    para que se pueda mapear en memoria y leer las columnas sin copiar.
+    """
+    import pyarrow as pa
+
+    out = Path(data_dir) / SNAPSHOT_FILE
+    table = table.combine_chunks()
+    with atomic_path(out) as tmp:
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+    return out
+
+
+def _open_snapshot(path: Path, value_dtype: str = "float64") -> "SeriesStore":
+    """
+    Abre el snapshot con mmap read-only: fechas, códigos y valores quedan como vistas
+    sobre las páginas del archivo, compartidas por todos los procesos vía page cache.
+    """
+    import pyarrow as pa
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    return SeriesStore.from_arrow(table, value_dtype=value_dtype)
+
+
+def _mtime(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return -1
+
+
+def _ensure_snapshot(data_dir: Path) -> Optional[Path]:
+    """
+    Devuelve el snapshot vigente; si falta o es más viejo que el Parquet, lo regenera
+    (lo hace el primer worker que arranca; el resto lo encuentra hecho).
+    Si llegó una versión nueva en `data/store/` (p.ej. un pull del commit del fetch),
+    primero re-materializa el Parquet desde las versiones.
+    """
+    snap, store = data_dir / SNAPSHOT_FILE, data_dir / STORE_FILE
+    versions = data_dir / VERSIONS_DIR / VERSIONS_MANIFEST
+    try:
+        if _mtime(versions) > _mtime(store):
+            _write_store_files(load_version(None, data_dir), data_dir)
+            return snap
+    except Exception:
+        pass
+    if snap.exists() and (not store.exists() or snap.stat().st_mtime_ns >= store.stat().st_mtime_ns):
+        return snap
+    if not store.exists():
+        return None
+    try:
+        import pyarrow.parquet as pq
+        return write_snapshot(pq.read_table(store), data_dir)
+    except Exception:
+        # p.ej. filesystem read-only: seguimos leyendo el Parquet
+        return None
+
+
+# =========================
+# Store versionado (base + deltas)
+# =========================
+
+# data/store/: bases completas inmutables + un delta chico por corrida (filas nuevas o
+# revisadas; las bajas van como NaN). Es lo que se commitea: cada fetch suma sólo su cambio.
+VERSIONS_DIR = "store"
+VERSIONS_MANIFEST = "versions.json"
+COMPACT_EVERY = 14          # deltas desde la última base (≈ una semana de fetch) antes de compactar
+# historia consultable con `load_version(as_of)`: la compactación sólo poda lo anterior a
+# la base que cubre "última versión - KEEP_MONTHS meses"
+KEEP_MONTHS = int(os.environ.get("BCRA_KEEP_MONTHS", "12"))
+_ID_FORMAT = "%Y%m%dT%H%M%SZ"
+
+
+def list_versions(data_dir: str | Path = "data") -> list[dict]:
+    """Segmentos registrados, en orden: [{"id", "kind" (base|delta), "file", "rows"}, ...]."""
+    try:
+        path = Path(data_dir) / VERSIONS_DIR / VERSIONS_MANIFEST
+        return json.loads(path.read_text(encoding="utf-8"))["segments"]
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def _write_versions(data_dir: Path, segments: list[dict]) -> None:
+    with atomic_path(data_dir / VERSIONS_DIR / VERSIONS_MANIFEST) as tmp:
+        tmp.write_text(json.dumps({"segments": segments}, indent=1), encoding="utf-8")
+
+
+def _keys(store: "SeriesStore", names: np.ndarray) -> np.ndarray:
+    """Clave int64 (código global, día) por fila; ordenada si `names` lo está."""
+    remap = np.searchsorted(names, store.names).astype(np.int64)
+    codes = remap[store.codes] if len(remap) else store.codes.astype(np.int64)
+    return (codes << 32) | (store.days.astype(np.int64) + (1 << 31))
+
+
+def _from_keys(names: np.ndarray, keys: np.ndarray, values: np.ndarray) -> "SeriesStore":
+    codes = (keys >> 32).astype(np.int32)
+    used, codes = np.unique(codes, return_inverse=True)
+    days = ((keys & 0xFFFFFFFF) - (1 << 31)).astype(np.int32)
+    return SeriesStore.from_parts(names[used], codes, days, values)
+
+
+def _diff_stores(old: "SeriesStore", new: "SeriesStore") -> "SeriesStore":
+    """Filas de `new` que no están (o cambiaron) en `old`, más las que `new` ya no tiene (NaN)."""
+    names = np.array(sorted(set(old.names) | set(new.names)), dtype=object)
+    ko, kn = _keys(old, names), _keys(new, names)
+    vo, vn = old.values.astype(float, copy=False), new.values.astype(float, copy=False)
+    pos = np.minimum(np.searchsorted(ko, kn), max(len(ko) - 1, 0))
+    found = (ko[pos] == kn) if len(ko) else np.zeros(len(kn), dtype=bool)
+    # tolerancia de 1 ulp-ish: distintos parsers de CSV no redondean igual el último dígito
+    changed = ~found | ~np.isclose(vo[pos], vn, rtol=1e-12, atol=0.0) if len(ko) else ~found
+    gone = ~np.isin(ko, kn, assume_unique=True)
+    keys = np.concatenate([kn[changed], ko[gone]])
+    values = np.concatenate([vn[changed], np.full(int(gone.sum()), np.nan)])
+    return _from_keys(names, keys, values)
+
+
+def _apply_delta(base: "SeriesStore", delta: "SeriesStore") -> "SeriesStore":
+    """`base` con `delta` encima: por (serie, fecha) gana el delta; NaN = baja."""
+    merged = SeriesStore.concat([base, delta])  # orden estable: base antes que delta
+    keep = np.r_[~merged.duplicated()[1:], True] & ~np.isnan(merged.values)
+    names = merged.names
+    keys = (merged.codes[keep].astype(np.int64) << 32) | (merged.days[keep].astype(np.int64) + (1 << 31))
+    return _from_keys(names, keys, merged.values[keep])
+
+
+def _version_bound(as_of) -> str:
+    """id de versión, fecha o timestamp -> id máximo incluido (fechas solas: todo ese día, UTC)."""
+    if isinstance(as_of, str) and len(as_of) == 16 and as_of.endswith("Z") and "T" in as_of:
+        return as_of
+    ts = pd.Timestamp(as_of)
+    ts = ts.tz_convert("UTC") if ts.tzinfo is not None else ts.tz_localize("UTC")
+    if ts == ts.normalize():
+        ts = ts + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+    return ts.strftime(_ID_FORMAT)
+
+
+def load_version(as_of=None, data_dir: str | Path = "data") -> "SeriesStore":
+    """
+    Store tal como estaba en la versión `as_of` (id de versión, fecha o timestamp; None =
+    la última): la base más reciente hasta ahí más los deltas posteriores a esa base.
+    Sin versiones registradas devuelve el store vacío; si `as_of` es anterior a la historia
+    retenida (ver `KEEP_MONTHS`), LookupError.
+    """
+    vdir = Path(data_dir) / VERSIONS_DIR
+    segs = list_versions(data_dir)
+    if as_of is not None and segs:
+        bound = _version_bound(as_of)
+        if bound < segs[0]["id"]:
+            raise LookupError(
+                f"no hay versiones hasta {as_of}: la historia retenida arranca en {segs[0]['id']} "
+                f"(KEEP_MONTHS={KEEP_MONTHS})"
+            )
+        segs = [s for s in segs if s["id"] <= bound]
+    bases = [i for i, s in enumerate(segs) if s["kind"] == "base"]
+    if not bases:
+        return SeriesStore.empty()
+    out = _read_store(vdir / segs[bases[-1]]["file"])
+    for s in segs[bases[-1] + 1:]:
+        out = _apply_delta(out, _read_store(vdir / s["file"]))
+    return out
+
+
+def record_version(store: "SeriesStore", data_dir: str | Path = "data", run_id: Optional[str] = None) -> Optional[str]:
+    """
+    Registra `store` como nueva versión en `data/store/`: la primera vez como base; después
+    sólo el delta contra la última versión. Sin cambios no escribe nada (devuelve None).
+    Cada `COMPACT_EVERY` deltas (o si el delta ya pesa como un cuarto del store) compacta.
+    """
+    data_dir = Path(data_dir)
+    segs = list_versions(data_dir)
+    run_id = run_id or pd.Timestamp.now(tz="UTC").strftime(_ID_FORMAT)
+    while segs and run_id <= segs[-1]["id"]:
+        run_id = (pd.Timestamp(run_id) + pd.Timedelta(seconds=1)).strftime(_ID_FORMAT)
+
+    if not segs:
+        _write_parquet(store.to_arrow(), data_dir / VERSIONS_DIR / f"base-{run_id}.parquet")
+        _write_versions(data_dir, [{"id": run_id, "kind": "base", "file": f"base-{run_id}.parquet", "rows": len(store)}])
+        return run_id
+
+    prev = load_version(None, data_dir)
+    delta = _diff_stores(prev, store)
+    if not len(delta):
+        return None
+    _write_parquet(delta.to_arrow(), data_dir / VERSIONS_DIR / f"delta-{run_id}.parquet")
+    segs.append({"id": run_id, "kind": "delta", "file": f"delta-{run_id}.parquet", "rows": len(delta)})
+    _write_versions(data_dir, segs)
+
+    since_base = len(segs) - 1 - max(i for i, s in enumerate(segs) if s["kind"] == "base")
+    if since_base >= COMPACT_EVERY or 4 * sum(s["rows"] for s in segs[-since_base:]) >= len(prev):
+        compact_versions(data_dir)
+    return run_id
+
+
+def compact_versions(data_dir: str | Path = "data", keep_months: Optional[int] = None) -> Optional[str]:
+    """
+    Escribe una base nueva con el estado de la última versión (mismo id), así la carga
+    no re-aplica deltas, y poda lo que quedó fuera de la ventana de `keep_months` meses
+    (default `KEEP_MONTHS`) antes de la última versión: se conserva desde la última base
+    anterior al corte, así cualquier `as_of` dentro de la ventana se puede reconstruir, y
+    se borran los archivos de lo podado.
+    """
+    data_dir = Path(data_dir)
+    segs = list_versions(data_dir)
+    if not segs or segs[-1]["kind"] == "base":
+        return None
+    last = segs[-1]["id"]
+    store = load_version(None, data_dir)
+    _write_parquet(store.to_arrow(), data_dir / VERSIONS_DIR / f"base-{last}.parquet")
+    segs.append({"id": last, "kind": "base", "file": f"base-{last}.parquet", "rows": len(store)})
+
+    keep_months = KEEP_MONTHS if keep_months is None else keep_months
+    horizon = (pd.Timestamp(last) - pd.DateOffset(months=keep_months)).strftime(_ID_FORMAT)
+    bases = [i for i, s in enumerate(segs) if s["kind"] == "base" and s["id"] <= horizon]
+    cut = bases[-1] if bases else 0
+    pruned, segs = segs[:cut], segs[cut:]
+    # primero el manifest: si se corta en el medio quedan archivos huérfanos, no referencias rotas
+    _write_versions(data_dir, segs)
+    for s in pruned:
+        (data_dir / VERSIONS_DIR / s["file"]).unlink(missing_ok=True)
+    return last
+
+
+# =========================
+# Resumen por serie (sidecar)
+# =========================
+
+# Lo que necesitan pickers, controles de rango y KPIs sin cargar las series.
+STATS_FILE = "series_store.stats.parquet"
+STATS_COLUMNS = ["id", "unidad", "frecuencia", "desde", "hasta", "n", "min", "max", "ultimo", "mom", "yoy"]
+# KPIs de un rango visible (ver `SeriesStore.kpis` / `kpi_table`); los de rango completo
+# salen del estado incremental (ver `refresh_kpi_state`).
+KPI_COLUMNS = ["fecha", "ultimo", "mom", "yoy", "d_per"]
+
+
+def _bcra_meta(data_dir: Path) -> Optional[pd.DataFrame]:
+    """id/unidad por descripcion, del catálogo de Monetarias que baja el fetch."""
+    try:
+        cat = json.loads((data_dir / "monetarias_catalogo.json").read_text(encoding="utf-8"))
+        return pd.DataFrame(cat)
+    except (OSError, ValueError):
+        return None
+
+
+def write_stats(store: "SeriesStore", path: str | Path, meta: Optional[pd.DataFrame] = None) -> Path:
+    """
+    Escribe `store.stats()` en `path` (Parquet chico, una fila por serie).
+    `meta` opcional aporta `id`/`unidad` por `descripcion`.
+    """
+    path = Path(path)
+    st = store.stats()
+    if meta is not None and "descripcion" in meta:
+        meta = meta.drop_duplicates("descripcion").set_index("descripcion")
+        for col in ("id", "unidad"):
+            if col in meta:
+                st[col] = [None if pd.isna(v) else str(v) for v in meta[col].astype(object).reindex(st.index)]
+    with atomic_path(path) as tmp:
+        st.reset_index().to_parquet(tmp, index=False)
+    return path
+
+
+def read_stats(path: str | Path, fallback: Callable[[], "SeriesStore"]) -> pd.DataFrame:
+    """Sidecar de `path` con index descripcion; si no se puede leer, `fallback().stats()`."""
+    try:
+        return pd.read_parquet(path).set_index("descripcion")
+    except Exception:
+        # sin sidecar (o sin pyarrow): se calcula del store, que igual queda cacheado
+        return fallback().stats()
+
+
+# =========================
+# Vistas materializadas (frecuencias bajas)
+# =========================
+
+# Las frecuencias del selector, re-muestreadas una vez al escribir el store. Un solo
+# Parquet con columna `vista` ("M_last", "Q_mean", ...), ordenado por vista/serie/fecha.
+VIEWS_FILE = "series_store.views.parquet"
+STORE_VIEWS = [("W", "last"), ("M", "last"), ("M", "mean"), ("Q", "last"), ("Q", "mean"), ("A", "last"), ("A", "mean")]
+
+
+def _view_key(freq: str, how: str) -> str:
+    return f"{_freq(freq)}_{how}"
+
+
+def write_views(store: "SeriesStore", path: str | Path) -> Path:
+    """Materializa `STORE_VIEWS` de `store` en `path` (ver `load_store_view`)."""
+    import pyarrow as pa
+    tables = []
+    for freq, how in STORE_VIEWS:
+        t = store.resample(freq, how).to_arrow()
+        tables.append(t.append_column("vista", pa.array([_view_key(freq, how)] * t.num_rows, pa.string())))
+    table = pa.concat_tables(tables).unify_dictionaries().combine_chunks()
+    return _write_parquet(table, Path(path))
+
+
+def _read_view(path: Path, freq: str, how: str) -> "SeriesStore":
+    import pyarrow.parquet as pq
+    table = pq.read_table(path, columns=["fecha", "descripcion", "valor"], filters=[("vista", "=", _view_key(freq, how))])
+    return SeriesStore.from_arrow(table)
+
+
+# =========================
+# Términos reales (deflactado por IPC)
+# =========================
+
+# Cada serie en pesos tiene en el store su versión a precios constantes de `REAL_BASE`
+# (`ipc_nivel_general` de DatosAR, lo baja scripts/fetch_datosar_core.py).
+# Se recalculan todas en cada escritura del store (ver `with_real_terms`), pero con base
+# fija un IPC nuevo sólo suma filas: el delta de versiones no reescribe la historia real.
+# Mover la base rebasa todas las series una vez.
+REAL_SUFFIX = " – en términos reales"
+REAL_BASE = "2024-12"
+IPC_FILE = "datosar_core_long.parquet"
+IPC_INDICADOR = "ipc_nivel_general"
+_ARS_RE = re.compile(r"(millones|miles)\s+de\s+(pesos|\$)|\(en\s+(pesos|\$)\)", re.IGNORECASE)
+
+
+def is_ars(name: str) -> bool:
+    """Serie nominal en pesos (stock o flujo, también variaciones diarias): candidata a deflactar. Tasas no."""
+    return bool(_ARS_RE.search(name)) and "%" not in name and not name.endswith(REAL_SUFFIX)
+
+
+def real_name(name: str) -> str:
+    """Nombre en el store de la versión en términos reales de `name`."""
+    return name + REAL_SUFFIX
+
+
+def load_ipc(data_dir: str | Path = "data") -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(meses desde 1970-01, nivel) del IPC nacional, ordenado; None si no está bajado."""
+    try:
+        df = pd.read_parquet(Path(data_dir) / IPC_FILE, columns=["fecha", "indicador", "valor"])
+    except Exception:
+        return None
+    df = df[df["indicador"] == IPC_INDICADOR]
+    vals = pd.to_numeric(df["valor"], errors="coerce").to_numpy()
+    fechas = pd.to_datetime(df["fecha"], errors="coerce")
+    ok = fechas.notna().to_numpy() & np.isfinite(vals) & (vals > 0)
+    if not ok.any():
+        return None
+    months = _months(_to_days(fechas[ok]))
+    months, first = np.unique(months[::-1], return_index=True)  # un dato por mes (el último)
+    return months, vals[ok][::-1][first]
+
+
+def real_terms(store: "SeriesStore", ipc: Tuple[np.ndarray, np.ndarray]) -> "SeriesStore":
+    """
+    Versiones a precios constantes de todas las series en pesos de `store`, en una pasada:
+    valor * IPC(`REAL_BASE`) / IPC(fecha). Series mensuales usan el IPC de su mes; las
+    diarias, el IPC interpolado por día (log-lineal entre mitades de mes, o sea la variación
+    mensual encadenada y repartida en el mes) hasta la mitad del último mes con IPC, para no
+    extrapolar valores que el próximo IPC cambiaría. Sin IPC de la base no hay series reales.
+    """
+    months, level = ipc
+    ars = np.array([i for i, n in enumerate(store.names) if is_ars(n)], dtype=np.int64)
+    base = np.flatnonzero(months == _real_base_month())
+    if not len(ars) or not len(base):
+        return SeriesStore.empty()
+
+    # paso medio por serie: >= 25 días => mensual (o más baja)
+    n = np.diff(store.offsets)
+    lo, hi = store.offsets[:-1], np.maximum(store.offsets[1:] - 1, 0)
+    span = np.where(n > 1, store.days[np.minimum(hi, len(store.days) - 1)] - store.days[np.minimum(lo, len(store.days) - 1)], 0)
+    monthly = (n > 1) & (span >= 25 * np.maximum(n - 1, 1))
+
+    rows = np.isin(store.codes, ars)
+    codes, days = store.codes[rows], store.days[rows]
+    vals = store.values[rows].astype(float, copy=False)
+    m = _months(days)
+    p_month = np.full(len(m), np.nan)
+    inside = (m >= months[0]) & (m <= months[-1])
+    by_month = np.full(int(months[-1] - months[0]) + 1, np.nan)
+    by_month[months - months[0]] = level
+    p_month[inside] = by_month[m[inside] - months[0]]
+    mid = months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64) + 14
+    p_day = np.exp(np.interp(days, mid, np.log(level)))
+    p = np.where(monthly[codes], p_month, np.where(inside & (days <= mid[-1]), p_day, np.nan))
+
+    with np.errstate(all="ignore"):
+        real = vals * level[base[0]] / p
+    keep = np.isfinite(real)
+    return SeriesStore.from_parts(
+        np.array([real_name(store.names[c]) for c in ars], dtype=object),
+        np.searchsorted(ars, codes[keep]), days[keep], real[keep],
+    )
+
+
+def _real_base_month() -> int:
+    """`REAL_BASE` en meses desde 1970-01 (la escala de `load_ipc`)."""
+    return int(np.datetime64(REAL_BASE, "M").astype(np.int64))
+
+
+def with_real_terms(store: "SeriesStore", data_dir: str | Path = "data") -> "SeriesStore":
+    """`store` con las series reales recalculadas con el IPC actual (sin IPC, sólo las nominales)."""
+    real = np.array([n.endswith(REAL_SUFFIX) for n in store.names], dtype=bool)
+    if real.any():
+        keep = ~real[store.codes]
+        store = SeriesStore.from_parts(
+            store.names[~real], (np.cumsum(~real) - 1)[store.codes[keep]],
+            store.days[keep], store.values[keep], str(store.values.dtype),
+        )
+    ipc = load_ipc(data_dir)
+    extra = real_terms(store, ipc) if ipc is not None else SeriesStore.empty()
+    return SeriesStore.concat([store, extra], str(store.values.dtype)) if len(extra) else store
+
+
+def _real_meta(meta: Optional[pd.DataFrame], store: "SeriesStore") -> Optional[pd.DataFrame]:
+    """Suma a `meta` la unidad de las series reales ("pesos constantes de mm/aaaa")."""
+    names = [n for n in store.names if n.endswith(REAL_SUFFIX)]
+    if not names:
+        return meta
+    base = pd.Timestamp(REAL_BASE)
+    extra = pd.DataFrame({
+        "descripcion": names, "unidad": f"pesos constantes de {base:%m/%Y} (IPC)",
+        "id": pd.Series([None] * len(names), dtype=object),  # sin id: no convertir los del catálogo a float
+    })
+    return extra if meta is None else pd.concat([meta, extra], ignore_index=True)
+
+
+# =========================
+# Estado de KPIs (incremental)
+# =========================
+
+# Por serie: último dato, primero, cantidad y los últimos cierres de mes. Alcanza para
+# MoM/YoY aun con el mes en curso incompleto: hay 13 cierres en meses distintos hasta el
+# último completo, así que el de 12 meses antes siempre queda adentro.
+KPI_STATE_FILE = "series_store.kpistate.parquet"
+KPI_STATE_CLOSES = 14
+
+
+def _state_frame(names, fecha, ultimo, primero, n, meses, cierres) -> pd.DataFrame:
+    """Arma el estado (index descripcion) y le calcula MoM/YoY a partir de los cierres."""
+    k = np.array([len(m) for m in meses], dtype=np.int64)
+    mcode = np.repeat(np.arange(len(k)), k)
+    flat = lambda xs, dt: np.concatenate(list(xs) + [np.array([], dtype=dt)]).astype(dt)
+    mom, yoy = _mom_yoy(mcode, flat(meses, np.int64), flat(cierres, float), np.arange(len(k)), np.asarray(fecha, dtype=np.int32))
+    return pd.DataFrame({
+        "fecha": _from_days(np.asarray(fecha, dtype=np.int32)),
+        "ultimo": np.asarray(ultimo, dtype=float),
+        "primero": np.asarray(primero, dtype=float),
+        "n": np.asarray(n, dtype=np.int64),
+        "meses": list(meses),
+        "cierres": list(cierres),
+        "mom": mom,
+        "yoy": yoy,
+    }, index=pd.Index(list(names), dtype=object, name="descripcion"))
+
+
+def kpi_state(store: "SeriesStore", names: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Estado de KPIs desde el histórico completo de `store` (todas las series o `names`)."""
+    if names is not None:
+        spans = [store.span(n) for n in dict.fromkeys(names)]
+        rows = np.sort(np.concatenate([np.arange(lo, hi) for lo, hi in spans] + [np.array([], dtype=np.int64)]))
     else:
-        out = r.last()
-    return out.dropna()
+        rows = slice(None)
+    codes, days, vals = store.codes[rows], store.days[rows], store.values[rows].astype(float, copy=False)
+    ok = ~np.isnan(vals)
+    codes, days, vals = codes[ok], days[ok], vals[ok]
+    offsets = np.searchsorted(codes, np.arange(len(store.names) + 1))
+    has = np.flatnonzero(np.diff(offsets) > 0)
+    lo, hi = offsets[:-1][has], offsets[1:][has]
+
+    month = _months(days)
+    last = np.r_[(codes[1:] != codes[:-1]) | (month[1:] != month[:-1]), True] if len(codes) else np.array([], dtype=bool)
+    mcode, mmonth, mval = codes[last], month[last], vals[last]
+    mhi = np.searchsorted(mcode, has, side="right")
+    mlo = np.maximum(np.searchsorted(mcode, has, side="left"), mhi - KPI_STATE_CLOSES)
+    return _state_frame(
+        store.names[has], days[hi - 1], vals[hi - 1], vals[lo], hi - lo,
+        [mmonth[a:b] for a, b in zip(mlo, mhi)], [mval[a:b] for a, b in zip(mlo, mhi)],
+    )
+
+
+def update_kpi_state(state: Optional[pd.DataFrame], store: "SeriesStore", delta: Optional["SeriesStore"] = None) -> pd.DataFrame:
+    """
+    Lleva `state` (el de antes) al de `store` (el de ahora) mirando sólo `delta`, las filas
+    nuevas/cambiadas entre ambos (NaN = baja). Las series sin filas en el delta no se tocan;
+    las que sólo agregaron datos posteriores a su último dato avanzan con esas filas; las
+    que tuvieron revisiones o bajas se recalculan desde `store` (sólo esas).
+    Sin estado previo o sin delta, arma todo desde `store`.
+    """
+    if state is None or delta is None:
+        return kpi_state(store)
+    if not len(delta):
+        return state
+
+    names, fecha, ultimo, primero, n, meses, cierres, redo = [], [], [], [], [], [], [], []
+    offsets = delta.offsets
+    for code in np.flatnonzero(np.diff(offsets) > 0):
+        name = delta.names[code]
+        days, vals = delta.days[offsets[code]:offsets[code + 1]], delta.values[offsets[code]:offsets[code + 1]].astype(float)
+        if name not in state.index:
+            redo.append(name)
+            continue
+        row = state.loc[name]
+        last_day = _day(row["fecha"])
+        if np.isnan(vals).any() or days[0] <= last_day:
+            redo.append(name)
+            continue
+        # sólo agregados: los cierres de los meses nuevos pisan / siguen a los del anillo
+        month = _months(days)
+        end = np.r_[month[1:] != month[:-1], True]
+        m_old, c_old = np.asarray(row["meses"], dtype=np.int64), np.asarray(row["cierres"], dtype=float)
+        keep = m_old < month[0]
+        names.append(name)
+        fecha.append(days[-1])
+        ultimo.append(vals[-1])
+        primero.append(row["primero"])
+        n.append(int(row["n"]) + len(days))
+        meses.append(np.r_[m_old[keep], month[end]][-KPI_STATE_CLOSES:])
+        cierres.append(np.r_[c_old[keep], vals[end]][-KPI_STATE_CLOSES:])
+
+    parts = [state]
+    if names:
+        parts.append(_state_frame(names, fecha, ultimo, primero, n, meses, cierres))
+    if redo:
+        parts.append(kpi_state(store, redo))
+    out = pd.concat(parts)
+    out = out[~out.index.duplicated(keep="last")]
+    # las que quedaron sin datos en `store` (todo dado de baja) salen del estado
+    return out[out.index.isin(list(store.index))].sort_index()
+
+
+def kpis_from_state(state: pd.DataFrame) -> pd.DataFrame:
+    """Tabla de KPIs de rango completo (`KPI_COLUMNS`) a partir del estado: O(1) por serie."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        first, last = state["primero"].to_numpy(float), state["ultimo"].to_numpy(float)
+        d_per = np.where((state["n"].to_numpy() >= 2) & (first != 0), (last / first - 1.0) * 100.0, np.nan)
+    return state[["fecha", "ultimo", "mom", "yoy"]].assign(d_per=d_per)[KPI_COLUMNS]
+
+
+def write_kpi_state(state: pd.DataFrame, path: str | Path, version: Optional[str] = None) -> Path:
+    """Escribe el estado en `path`; `version` (id de `data/store/`) queda en la metadata."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    path = Path(path)
+    table = pa.Table.from_pandas(state.reset_index(), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"version": (version or "").encode()})
+    with atomic_path(path) as tmp:
+        pq.write_table(table, tmp, compression="zstd")
+    return path
+
+
+def read_kpi_state(path: str | Path) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """(estado, versión) de `path`; (None, None) si no existe o no se puede leer."""
+    try:
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+        version = (table.schema.metadata or {}).get(b"version", b"").decode() or None
+        return table.to_pandas().set_index("descripcion"), version
+    except Exception:
+        return None, None
+
+
+def _long_store(df: pd.DataFrame, name_col: str) -> "SeriesStore":
+    return SeriesStore.from_long(df[["fecha", name_col, "valor"]].rename(columns={name_col: "descripcion"}))
+
+
+def refresh_long_kpi_state(long_path: str | Path, prev: Optional[pd.DataFrame], name_col: str = "titulo") -> pd.DataFrame:
+    """
+    Hook post-fetch para los long que se reescriben enteros (p.ej. `datosar_core_long.parquet`):
+    `prev` es el long de antes de sobrescribirlo; el delta contra el nuevo actualiza el estado
+    `<long>.kpistate.parquet` (series por `name_col`, el nombre que usan las páginas).
+    """
+    long_path = Path(long_path)
+    path = long_path.with_suffix(".kpistate.parquet")
+    new = _long_store(pd.read_parquet(long_path), name_col)
+    state, _ = read_kpi_state(path)
+    delta = None
+    if state is not None and prev is not None and not prev.empty:
+        delta = _diff_stores(_long_store(prev, name_col), new)
+    state = update_kpi_state(state, new, delta)
+    write_kpi_state(state, path)
+    return state
+
+
+# =========================
+# Representación compacta en memoria
+# =========================
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def _to_days(fechas) -> np.ndarray:
+    """fechas (datetime-like) -> int32 días desde 1970-01-01."""
+    d = pd.to_datetime(pd.Series(fechas)).to_numpy().astype("datetime64[D]")
+    return (d - _EPOCH).astype(np.int32)
+
+
+def _from_days(days: np.ndarray) -> np.ndarray:
+    """int32 días -> datetime64[ns] (lo que esperan las páginas)."""
+    return (days.astype("datetime64[D]")).astype("datetime64[ns]")
+
+
+def _day(x) -> Optional[int]:
+    """date/datetime/Timestamp/str -> días desde 1970-01-01 (None = sin límite)."""
+    if x is None:
+        return None
+    return int((np.datetime64(pd.Timestamp(x).date(), "D") - _EPOCH).astype(np.int64))
+
+
+# Frecuencias de re-muestreo. Etiqueta = último día del período (como pandas:
+# semana a domingo, fin de mes / trimestre / año).
+FREQS = ("D", "W", "M", "Q", "A")
+HOWS = ("last", "first", "mean", "sum", "min", "max")
+_PCT_RE = re.compile(r"tasa|%|porcentaje|variaci[oó]n|interanual|\bi\.a\.", re.IGNORECASE)
+
+
+def normalize_freq(freq: Optional[str]) -> str:
+    """
+    Frecuencia de `FREQS` para `freq`: None => "D", "Y" => "A" y los alias de pandas
+    (ME/QE/YE, W-SUN, ...) por su primera letra. ValueError si no es ninguna.
+    """
+    f = (freq or "D").strip().upper()[:1]
+    f = "A" if f == "Y" else f
+    if f not in FREQS:
+        raise ValueError(f"freq debe ser una de {'/'.join(FREQS)} (o Y): {freq!r}")
+    return f
+
+
+def _freq(freq: Optional[str]) -> str:
+    # para los selects de las páginas: lo desconocido cae a diario
+    try:
+        return normalize_freq(freq)
+    except ValueError:
+        return "D"
+
+
+def resample_how(name: str) -> str:
+    """Agregación natural de una serie: promedio para tasas/porcentajes, fin de período para stocks/niveles."""
+    return "mean" if _PCT_RE.search(name or "") else "last"
+
+
+def _period_codes(days: np.ndarray, freq: str) -> np.ndarray:
+    """días -> código entero del período (`freq` en FREQS); crece con la fecha."""
+    days = days.astype(np.int64, copy=False)
+    if freq == "D":
+        return days
+    if freq == "W":
+        return (days + 3) // 7  # 1970-01-01 fue jueves; semanas lunes..domingo
+    month = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return {"M": month, "Q": month // 3, "A": month // 12}[freq]
+
+
+def _period_end(codes: np.ndarray, freq: str) -> np.ndarray:
+    """código de período -> días del último día del período."""
+    if freq == "D":
+        return codes.astype(np.int32)
+    if freq == "W":
+        return (codes * 7 + 3).astype(np.int32)
+    months = {"M": 1, "Q": 3, "A": 12}[freq]
+    nxt = ((codes + 1) * months).astype("datetime64[M]").astype("datetime64[D]")
+    return ((nxt - _EPOCH).astype(np.int64) - 1).astype(np.int32)
+
+
+def _reduce_groups(vals: np.ndarray, starts: np.ndarray, how: str) -> np.ndarray:
+    """Reducción por grupos contiguos (`starts` = primera fila de cada grupo, sin NaN)."""
+    if how == "first":
+        return vals[starts]
+    if how == "last":
+        return vals[np.r_[starts[1:], len(vals)] - 1]
+    if how in ("sum", "mean"):
+        tot = np.add.reduceat(vals, starts)
+        return tot if how == "sum" else tot / np.diff(np.r_[starts, len(vals)])
+    return (np.minimum if how == "min" else np.maximum).reduceat(vals, starts)
+
+
+def _resample_rows(
+    codes: np.ndarray, days: np.ndarray, vals: np.ndarray, freq: str, how_of_code: Callable[[np.ndarray], np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Núcleo del re-muestreo: filas ordenadas por (serie, fecha) -> una fila por (serie, período).
+    Los grupos son tramos contiguos, así que cada agregación es un solo reduceat sobre todas
+    las series a la vez. `how_of_code(códigos de serie)` da la agregación de cada grupo.
+    """
+    ok = ~np.isnan(vals)
+    codes, days, vals = codes[ok], days[ok], vals[ok]
+    if not len(vals):
+        return codes, days, vals
+    period = _period_codes(days, freq)
+    new = np.r_[True, (codes[1:] != codes[:-1]) | (period[1:] != period[:-1])]
+    starts = np.flatnonzero(new)
+    g_codes = codes[starts]
+    g_how = how_of_code(g_codes)
+    out = np.empty(len(starts), dtype=float)
+    for h in np.unique(g_how):
+        m = g_how == h
+        out[m] = _reduce_groups(vals, starts, str(h))[m]
+    return g_codes, _period_end(period[starts], freq), out
+
+
+def _months(days: np.ndarray) -> np.ndarray:
+    """días -> meses desde 1970-01 (int64)."""
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def _mom_yoy(
+    mcode: np.ndarray, mmonth: np.ndarray, mval: np.ndarray, codes: np.ndarray, d_fin: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    MoM / YoY (%) de las series `codes`, como `compute_kpis` parado en `d_fin` (uno por
+    serie), a partir de cierres de mes ordenados por (serie, mes): el último cierre cuyo
+    fin de mes es <= d_fin (el mes en curso no cuenta) contra el cierre anterior y contra
+    el último cierre <= el mismo mes del año previo. NaN si falta la base o es 0.
+    """
+    mkey = mcode.astype(np.int64) * (1 << 32) + mmonth
+    codes = codes.astype(np.int64)
+    L = np.searchsorted(mkey, codes * (1 << 32) + _months(d_fin + 1), side="left") - 1
+    Lc = np.maximum(L, 0)
+    ok = (L >= 0) & (mcode[Lc] == codes) if len(mkey) else np.zeros(len(codes), dtype=bool)
+    if not ok.any():
+        nan = np.full(len(codes), np.nan)
+        return nan, nan.copy()
+    P = np.maximum(L - 1, 0)
+    R = np.maximum(np.searchsorted(mkey, mkey[Lc] - 12, side="right") - 1, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prev_ok = ok & (L >= 1) & (mcode[P] == codes) & (mval[P] != 0)
+        mom = np.where(prev_ok, (mval[Lc] / mval[P] - 1.0) * 100.0, np.nan)
+        ref_ok = ok & (mkey[R] <= mkey[Lc] - 12) & (mcode[R] == codes) & (mval[R] != 0)
+        yoy = np.where(ref_ok, (mval[Lc] / mval[R] - 1.0) * 100.0, np.nan)
+    return mom, yoy
+
+
+# Alineación as-of de N series (generaliza pd.merge_asof de a pares)
+ASOF_DIRECTIONS = ("backward", "forward", "nearest")
+
+
+def _per_series(x, n: int) -> list:
+    return list(x) if isinstance(x, (list, tuple, np.ndarray)) else [x] * n
+
+
+def asof_align(
+    parts: "list[Tuple[np.ndarray, np.ndarray]]", on: "Optional[int | np.ndarray]" = None,
+    tol: "Optional[int] | list" = None, direction: "str | list" = "backward",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Alinea N series `parts` = [(días ordenados, valores), ...] sobre un calendario común,
+    como N `merge_asof` pero con un solo `searchsorted` sobre todas las filas juntas.
+    `on`: índice de la serie cuyo calendario manda, array de días, o None (unión de fechas).
+    `tol` (días, None = sin límite) y `direction` (ASOF_DIRECTIONS) pueden ser uno por serie.
+    Devuelve (días, matriz) con una columna por serie y NaN donde no hay dato a tiempo.
+    """
+    n = len(parts)
+    tols = np.array([np.iinfo(np.int64).max // 4 if t is None else int(t) for t in _per_series(tol, n)], dtype=np.int64)
+    dirs = np.array(_per_series(direction, n), dtype=object)
+    bad = set(dirs) - set(ASOF_DIRECTIONS)
+    if bad:
+        raise ValueError(f"direction debe ser una de {ASOF_DIRECTIONS}: {sorted(bad)}")
+    if on is None:
+        cal = np.unique(np.concatenate([np.asarray(d, dtype=np.int64) for d, _ in parts] + [np.array([], dtype=np.int64)]))
+    elif isinstance(on, (int, np.integer)):
+        cal = np.asarray(parts[on][0], dtype=np.int64)
+    else:
+        cal = np.asarray(on, dtype=np.int64)
+    if not n or not len(cal) or not sum(len(d) for d, _ in parts):
+        return cal.astype(np.int32), np.full((len(cal), n), np.nan)
+
+    # todas las series en un arreglo ordenado por (serie, día): una búsqueda para todas
+    lens = np.array([len(d) for d, _ in parts], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(lens)])
+    codes = np.repeat(np.arange(n, dtype=np.int64), lens)
+    days = np.concatenate([np.asarray(d, dtype=np.int64) for d, _ in parts])
+    vals = np.concatenate([np.asarray(v, dtype=float) for _, v in parts])
+    shift = np.int64(1) << 32
+    q_code = np.repeat(np.arange(n, dtype=np.int64), len(cal))
+    q_day = np.tile(cal, n)
+    back = np.searchsorted(codes * shift + days, q_code * shift + q_day, side="right") - 1
+
+    lo, hi = starts[q_code], starts[q_code + 1]
+    exact = (back >= lo) & (days[np.clip(back, 0, len(days) - 1)] == q_day)
+    fwd = np.where(exact, back, back + 1)
+    last = max(len(days) - 1, 0)
+    d_back = np.where(back >= lo, q_day - days[np.clip(back, 0, last)], -1)
+    d_fwd = np.where(fwd < hi, days[np.clip(fwd, 0, last)] - q_day, -1)
+    t = tols[q_code]
+    ok_back = (d_back >= 0) & (d_back <= t)
+    ok_fwd = (d_fwd >= 0) & (d_fwd <= t)
+
+    d = dirs[q_code]
+    use_back = np.where(d == "backward", ok_back,
+               np.where(d == "forward", False, ok_back & (~ok_fwd | (d_back <= d_fwd))))
+    use_fwd = ~use_back & ok_fwd & (d != "backward")
+    pos = np.where(use_back, back, fwd)
+    out = np.where(use_back | use_fwd, vals[np.clip(pos, 0, last)] if len(vals) else np.nan, np.nan)
+    return cal.astype(np.int32), out.reshape(n, len(cal)).T
+
+
+@dataclass(frozen=True)
+class SeriesStore:
+    """
+    Tabla long compacta, ordenada por (código de serie, fecha):
+      names  : nombres de serie; el código de una serie es su posición acá
+      codes  : int32 (una por fila)
+      days   : int32, días desde 1970-01-01
+      values : float64 (o float32 si sólo se usa para mostrar)
+    Al construirse arma el índice por serie: `offsets[c]:offsets[c+1]` es el tramo
+    contiguo de la serie de código c, y dentro del tramo las fechas se buscan con searchsorted.
+    """
+    names: np.ndarray
+    codes: np.ndarray
+    days: np.ndarray
+    values: np.ndarray
+    offsets: np.ndarray = field(init=False, repr=False, compare=False)
+    index: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "offsets", np.searchsorted(self.codes, np.arange(len(self.names) + 1)))
+        object.__setattr__(self, "index", {n: i for i, n in enumerate(self.names)})
+
+    @classmethod
+    def empty(cls, value_dtype: str = "float64") -> "SeriesStore":
+        return cls(
+            names=np.array([], dtype=object),
+            codes=np.array([], dtype=np.int32),
+            days=np.array([], dtype=np.int32),
+            values=np.array([], dtype=value_dtype),
+        )
+
+    @classmethod
+    def from_parts(cls, names, codes, days, values, value_dtype: str = "float64") -> "SeriesStore":
+        names = np.asarray(names, dtype=object)
+        codes = np.asarray(codes, dtype=np.int32)
+        days = np.asarray(days, dtype=np.int32)
+        values = np.asarray(values, dtype=value_dtype)
+        # nombres ordenados => códigos ordenados como las descripciones
+        order = np.argsort(names, kind="stable")
+        if len(order) and (order != np.arange(len(order))).any():
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+            names, codes = names[order], rank[codes].astype(np.int32)
+        # orden (código, fecha); lo más común es que ya venga así
+        if len(codes) > 1:
+            key = codes.astype(np.int64) * (1 << 32) + days
+            if (np.diff(key) < 0).any():
+                idx = np.lexsort((days, codes))
+                codes, days, values = codes[idx], days[idx], values[idx]
+        return cls(names=names, codes=codes, days=days, values=values)
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame, value_dtype: str = "float64") -> "SeriesStore":
+        if not df.empty:
+            df = df.dropna(subset=["fecha"])
+        if df.empty:
+            return cls.empty(value_dtype)
+        codes, uniques = pd.factorize(df["descripcion"].astype(str), sort=True)
+        return cls.from_parts(
+            np.asarray(uniques, dtype=object), codes, _to_days(df["fecha"]),
+            pd.to_numeric(df["valor"], errors="coerce").to_numpy(), value_dtype,
+        )
+
+    @classmethod
+    def from_arrow(cls, table, value_dtype: str = "float64") -> "SeriesStore":
+        import pyarrow as pa
+        if table.num_rows == 0:
+            return cls.empty(value_dtype)
+        if any(col.num_chunks != 1 for col in table.columns):
+            table = table.unify_dictionaries().combine_chunks()
+        desc = table.column("descripcion").chunk(0)
+        if not pa.types.is_dictionary(desc.type):
+            desc = desc.dictionary_encode()
+        # con un solo chunk y sin nulos, to_numpy no copia (clave para el snapshot mmap)
+        return cls.from_parts(
+            np.asarray(desc.dictionary.to_pylist(), dtype=object),
+            desc.indices.to_numpy(zero_copy_only=False),
+            table.column("fecha").chunk(0).view(pa.int32()).to_numpy(zero_copy_only=False),
+            table.column("valor").chunk(0).to_numpy(zero_copy_only=False),
+            value_dtype,
+        )
+
+    @classmethod
+    def concat(cls, stores: List["SeriesStore"], value_dtype: str = "float64") -> "SeriesStore":
+        """Une varios stores (tabla de nombres unificada, re-ordenado por serie y fecha)."""
+        names = np.array(sorted(set().union(*(s.names for s in stores))), dtype=object)
+        pos = {n: i for i, n in enumerate(names)}
+        remap = [np.array([pos[n] for n in s.names], dtype=np.int32) for s in stores]
+        return cls.from_parts(
+            names,
+            np.concatenate([m[s.codes] if len(m) else s.codes for m, s in zip(remap, stores)]),
+            np.concatenate([s.days for s in stores]),
+            np.concatenate([s.values.astype(value_dtype, copy=False) for s in stores]),
+            value_dtype,
+        )
+
+    def duplicated(self) -> np.ndarray:
+        """Máscara de filas que repiten (serie, fecha) de la anterior (el store está ordenado)."""
+        dup = np.zeros(len(self.codes), dtype=bool)
+        dup[1:] = (self.codes[1:] == self.codes[:-1]) & (self.days[1:] == self.days[:-1])
+        return dup
+
+    def to_arrow(self):
+        """Tabla Arrow con el esquema del store (fecha date32, descripcion dictionary, valor float64)."""
+        import pyarrow as pa
+        return pa.table({
+            "fecha": pa.array(self.days, pa.int32()).view(pa.date32()),
+            "descripcion": pa.DictionaryArray.from_arrays(
+                pa.array(self.codes, pa.int32()), pa.array(list(self.names), pa.string())
+            ),
+            "valor": pa.array(self.values.astype("float64", copy=False)),
+        }, schema=_store_schema())
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.codes.nbytes + self.days.nbytes + self.values.nbytes
+            + sum(len(n) for n in self.names)
+        )
+
+    def with_values(self, value_dtype: str) -> "SeriesStore":
+        """Copia liviana con otro dtype de valor (p.ej. float32 para sólo-display)."""
+        return SeriesStore(self.names, self.codes, self.days, self.values.astype(value_dtype, copy=False))
+
+    def span(self, name: str, start=None, end=None) -> Tuple[int, int]:
+        """
+        Filas [lo, hi) de `name` dentro de [start, end] (ambos inclusive). (0, 0) si no existe.
+        """
+        code = self.index.get(name)
+        if code is None:
+            return 0, 0
+        lo, hi = int(self.offsets[code]), int(self.offsets[code + 1])
+        d0, d1 = _day(start), _day(end)
+        days = self.days[lo:hi]
+        if d0 is not None:
+            lo += int(np.searchsorted(days, d0, side="left"))
+            days = self.days[lo:hi]
+        if d1 is not None:
+            hi = lo + int(np.searchsorted(days, d1, side="right"))
+        return lo, hi
+
+    def series(self, name: str, start=None, end=None) -> pd.Series:
+        """Serie `name` (index fecha) recortada a [start, end], sin escanear la tabla."""
+        lo, hi = self.span(name, start, end)
+        return pd.Series(
+            self.values[lo:hi].astype(float, copy=False),
+            index=pd.DatetimeIndex(_from_days(self.days[lo:hi]), name="fecha"),
+            name=name,
+        )
+
+    def bounds(self, names: Iterable[str]) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """(primera, última) fecha entre las series `names`; (None, None) si no hay datos."""
+        spans = [self.span(n) for n in names]
+        firsts = [self.days[lo] for lo, hi in spans if hi > lo]
+        lasts = [self.days[hi - 1] for lo, hi in spans if hi > lo]
+        if not firsts:
+            return None, None
+        d0, d1 = _from_days(np.array([min(firsts), max(lasts)], dtype=np.int32))
+        return pd.Timestamp(d0), pd.Timestamp(d1)
+
+    def align(self, names: Iterable[str], start=None, end=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Alinea `names` en [start, end] sin pasar por índices de pandas.
+        Devuelve (días, matriz) con días = unión ordenada de fechas observadas y una
+        columna por serie (NaN donde esa serie no tiene dato). Las series son ragged
+        (diarias y mensuales conviven), así que la matriz sólo cubre fechas con algún dato.
+        """
+        spans = [self.span(n, start, end) for n in names]
+        parts = [self.days[lo:hi] for lo, hi in spans]
+        if len(parts) == 1:
+            days = parts[0]
+        else:
+            days = np.unique(np.concatenate(parts)) if parts else np.array([], dtype=np.int32)
+        mat = np.full((len(days), len(spans)), np.nan)
+        for j, ((lo, hi), d) in enumerate(zip(spans, parts)):
+            if hi > lo:
+                mat[np.searchsorted(days, d), j] = self.values[lo:hi]
+        return days, mat
+
+    def asof(
+        self, names: Iterable[str], on=None, start=None, end=None,
+        tol: "Optional[int] | list" = None, direction: "str | list" = "backward",
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        `asof_align` de `names` (sin NaN) en [start, end]. `on`: nombre de la serie cuyo
+        calendario manda, array de días o None (unión). Un nombre puede repetirse con
+        distinta tolerancia/dirección; hay una columna por entrada de `names`.
+        """
+        parts = []
+        for n in names:
+            lo, hi = self.span(n, start, end)
+            v = self.values[lo:hi].astype(float, copy=False)
+            ok = ~np.isnan(v)
+            parts.append((self.days[lo:hi][ok], v[ok]))
+        if isinstance(on, str):
+            lo, hi = self.span(on, start, end)
+            on = self.days[lo:hi][~np.isnan(self.values[lo:hi].astype(float, copy=False))]
+        return asof_align(parts, on, tol, direction)
+
+    def resample(
+        self, freq: str, how: "str | dict" = "last", names: Optional[Iterable[str]] = None, start=None, end=None,
+    ) -> "SeriesStore":
+        """
+        Store re-muestreado a `freq` (D/W/M/Q/A), todas las series (o `names`) en una pasada.
+        `how`: una agregación de HOWS para todas, "auto" (`resample_how` por serie) o un
+        dict nombre -> agregación (las que falten usan "last"). Se recorta a [start, end]
+        antes de agrupar, como hacer `.loc[start:end].resample(...)` en pandas. Sin NaN.
+        """
+        freq = _freq(freq)
+        if names is None and start is None and end is None:
+            codes, days, vals = self.codes, self.days, self.values.astype(float, copy=False)
+        else:
+            spans = [self.span(n, start, end) for n in (self.names if names is None else dict.fromkeys(names))]
+            rows = np.concatenate([np.arange(lo, hi) for lo, hi in spans] + [np.array([], dtype=np.int64)])
+            rows.sort()
+            codes, days, vals = self.codes[rows], self.days[rows], self.values[rows].astype(float, copy=False)
+
+        if isinstance(how, str) and how != "auto":
+            how_of_code = lambda c: np.full(len(c), how if how in HOWS else "last", dtype=object)
+        else:
+            table = np.array([
+                resample_how(n) if how == "auto" else how.get(n, "last") for n in self.names
+            ], dtype=object)
+            how_of_code = lambda c: table[c]
+        codes, days, vals = _resample_rows(codes, days, vals, freq, how_of_code)
+        return SeriesStore(self.names, codes.astype(np.int32), days, vals.astype(self.values.dtype, copy=False))
+
+    def wide(self, names: Iterable[str], start=None, end=None, freq: str = "D", how: "str | dict" = "last") -> pd.DataFrame:
+        """
+        DF ancho (index fecha, una columna por serie) para `names` en [start, end].
+        Con `freq` distinto de "D" re-muestrea antes de alinear (ver `resample`).
+        """
+        names = list(dict.fromkeys(names))
+        if _freq(freq) != "D":
+            return self.resample(freq, how, names, start, end).wide(names)
+        days, mat = self.align(names, start, end)
+        return pd.DataFrame(
+            mat,
+            index=pd.DatetimeIndex(_from_days(days), name="fecha"),
+            columns=pd.Index(names, dtype=object, name="descripcion"),
+        )
+
+    def stats(self) -> pd.DataFrame:
+        """
+        Resumen por serie (index descripcion, sólo series con datos): frecuencia inferida,
+        primera/última fecha, cantidad, mínimo/máximo, último valor y MoM/YoY (%) sobre
+        cierres de mes, como `compute_kpis` parado en el último dato. Todo vectorizado.
+        """
+        vals = self.values.astype(float, copy=False)
+        ok = ~np.isnan(vals)
+        codes, days, vals = self.codes[ok], self.days[ok], vals[ok]
+        offsets = np.searchsorted(codes, np.arange(len(self.names) + 1))
+        has = np.diff(offsets) > 0
+        lo, hi = offsets[:-1][has], offsets[1:][has]
+        n = hi - lo
+        out = pd.DataFrame(index=pd.Index(self.names[has], dtype=object, name="descripcion"), columns=STATS_COLUMNS)
+        if not len(out):
+            return out
+
+        gap = np.where(n > 1, (days[hi - 1] - days[lo]) / np.maximum(n - 1, 1), np.nan)
+        freq = np.select([gap <= 5, gap <= 10, gap <= 45, gap <= 120, gap > 120], ["D", "W", "M", "Q", "A"], None)
+
+        # cierres de mes: última fila de cada (serie, mes)
+        month = _months(days)
+        last = np.r_[(codes[1:] != codes[:-1]) | (month[1:] != month[:-1]), True]
+        mom, yoy = _mom_yoy(codes[last], month[last], vals[last], np.flatnonzero(has), days[hi - 1])
+
+        out["id"] = None
+        out["unidad"] = None
+        out["frecuencia"] = freq
+        out["desde"] = _from_days(days[lo])
+        out["hasta"] = _from_days(days[hi - 1])
+        out["n"] = n.astype(np.int64)
+        out["min"] = np.minimum.reduceat(vals, lo)
+        out["max"] = np.maximum.reduceat(vals, lo)
+        out["ultimo"] = vals[hi - 1]
+        out["mom"] = mom
+        out["yoy"] = yoy
+        return out
+
+    def _codes_of(self, other: "SeriesStore") -> np.ndarray:
+        """Códigos de `other` traducidos a este store (-1 = serie que acá no existe)."""
+        if other.names is self.names or (len(other.names) == len(self.names) and (other.names == self.names).all()):
+            return other.codes
+        remap = np.array([self.index.get(n, -1) for n in other.names], dtype=np.int64)
+        return remap[other.codes]
+
+    def kpis(
+        self, names: Optional[Iterable[str]] = None, start=None, end=None, freq: str = "D", how: "str | dict" = "last",
+        monthly: Optional["SeriesStore"] = None,
+    ) -> pd.DataFrame:
+        """
+        KPIs de todas las series (o `names`) en una pasada, como `compute_kpis` con la serie
+        completa y la visible en [start, end] a `freq`/`how`: fecha y valor del último dato
+        visible, MoM / YoY (%) sobre cierres de mes hasta ese dato y Δ (%) entre el primer y
+        el último dato visible. `monthly`: cierres de mes ya calculados (la vista "M_last")
+        para no re-muestrear el histórico. Index descripcion, sólo series con datos visibles.
+        """
+        vis = self.resample(freq, how, names, start, end)
+        offsets = np.searchsorted(vis.codes, np.arange(len(self.names) + 1))
+        has = np.diff(offsets) > 0
+        lo, hi = offsets[:-1][has], offsets[1:][has]
+        out = pd.DataFrame(index=pd.Index(self.names[has], dtype=object, name="descripcion"), columns=KPI_COLUMNS)
+        if not len(out):
+            return out
+
+        m = monthly if monthly is not None else self.resample("M", "last", names)
+        mcode = self._codes_of(m)
+        keep = mcode >= 0
+        mom, yoy = _mom_yoy(
+            mcode[keep], _months(m.days[keep]), m.values[keep].astype(float, copy=False),
+            np.flatnonzero(has), vis.days[hi - 1],
+        )
+        first, last = vis.values[lo].astype(float), vis.values[hi - 1].astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d_per = np.where((hi - lo >= 2) & (first != 0), (last / first - 1.0) * 100.0, np.nan)
+
+        out["fecha"] = _from_days(vis.days[hi - 1])
+        out["ultimo"] = last
+        out["mom"] = mom
+        out["yoy"] = yoy
+        out["d_per"] = d_per
+        return out
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Vista pandas compatible con el DF long de siempre (fecha, descripcion, valor).
+        `descripcion` sale como Categorical sobre la tabla de nombres (no repite strings).
+        """
+        return pd.DataFrame({
+            "fecha": _from_days(self.days),
+            "descripcion": pd.Categorical.from_codes(self.codes, categories=pd.Index(self.names, dtype=object)),
+            "valor": self.values,
+        })
+
+
+# =========================
+# Cache compartido por proceso
+# =========================
+
+# key -> (huella, valor, paths, loader, data_dir); paths/loader/data_dir quedan para que
+# el watcher recargue
+_SHARED: dict[Any, tuple[tuple, Any, tuple, Callable[[], Any], Optional[Path]]] = {}
+# reentrante: un loader puede pedir otra clave (load_bcra_long -> load_bcra_store)
+_SHARED_LOCK = threading.RLock()
+# (key, versión de datos) -> valor, para los reruns con versión fijada (ver
+# `pin_data_version`): el watcher puede cambiar `_SHARED` a mitad de un rerun, pero lo
+# que el rerun pide sigue saliendo de la versión con la que arrancó.
+_BY_VERSION: dict[tuple, Any] = {}
+_KEEP_VERSIONS = 2          # versiones por clave (la vigente y la anterior)
+_PIN = threading.local()
+# data_dir (resuelto) -> claves que ya pidió el proceso, en orden de primer uso, con sus
+# (paths, loader); y la versión que la memoria tiene cargada entera (la "generación")
+_LOADERS: dict[str, dict[Any, tuple[tuple, Callable[[], Any]]]] = {}
+_GEN: dict[str, str] = {}
+_GEN_LOCK = threading.Lock()
+_GEN_RETRIES = 3
+
+
+def data_fingerprint(paths: Iterable[str | Path]) -> tuple:
+    """
+    Huella (nombre, mtime_ns, size) de cada archivo; los que no existen cuentan como None.
+    Cambia apenas un fetch/build reescribe algo en data/.
+    """
+    out = []
+    for p in paths:
+        p = Path(p)
+        try:
+            st_ = p.stat()
+            out.append((str(p), st_.st_mtime_ns, st_.st_size))
+        except OSError:
+            out.append((str(p), None, None))
+    return tuple(out)
+
+
+def _dir_key(data_dir: Path) -> str:
+    return str(Path(data_dir).resolve())
+
+
+def pin_data_version(data_dir: str | Path = "data") -> str:
+    """
+    Fija para el thread actual la versión de datos de `data_dir` (ver `data_version`) y
+    la devuelve. Las páginas lo llaman al arrancar cada rerun (ver `ui.pin_data`): desde
+    ahí store, vistas, resumen y KPIs del rerun salen todos de esa versión aunque un
+    fetch o el watcher cambien los datos en el medio. Sin pin, siempre la vigente.
+
+    Se fija la versión que está en memoria, no la del disco: con el watcher andando, la
+    última que cargó entera (la nueva llega en el rerun siguiente); sin watcher, si el
+    disco cambió, la nueva se carga acá entera (`_load_generation`) antes de fijarla.
+    """
+    data_dir = Path(data_dir)
+    d = _dir_key(data_dir)
+    version = _GEN.get(d)
+    if version is None or (_WATCHER is None and version != data_version(data_dir)):
+        version = _load_generation(data_dir)
+    _PIN.versions = {**getattr(_PIN, "versions", {}), d: version}
+    return version
+
+
+def _pinned_version(data_dir: Path) -> Optional[str]:
+    return getattr(_PIN, "versions", {}).get(_dir_key(data_dir))
+
+
+def _load_versioned(key: Any, loader: Callable[[], Any], data_dir: Optional[Path]) -> Any:
+    """`loader()`; si los datos no cambiaron mientras cargaba, queda también bajo su versión."""
+    if data_dir is None:
+        return loader()
+    # el snapshot se regenera antes de tomar la versión: si lo hiciera el loader, la
+    # versión cambiaría en el medio y el valor no quedaría guardado bajo ninguna
+    _ensure_snapshot(data_dir)
+    version = data_version(data_dir)
+    value = loader()
+    if data_version(data_dir) == version:
+        with _SHARED_LOCK:
+            _BY_VERSION.pop((key, version), None)
+            _BY_VERSION[(key, version)] = value
+            for old in [k for k in _BY_VERSION if k[0] == key][:-_KEEP_VERSIONS]:
+                del _BY_VERSION[old]
+    return value
+
+
+def _load_generation(data_dir: Path) -> str:
+    """
+    Carga con una misma versión de datos todas las claves de `data_dir` que ya usó el
+    proceso (en orden de primer uso: el store antes que lo armado sobre él), la deja como
+    generación vigente y la devuelve. Si los datos cambian mientras carga, empieza de
+    nuevo (hasta `_GEN_RETRIES` veces).
+    """
+    data_dir = Path(data_dir)
+    d = _dir_key(data_dir)
+    with _GEN_LOCK:
+        prev = getattr(_PIN, "versions", {})
+        try:
+            for _ in range(_GEN_RETRIES):
+                _ensure_snapshot(data_dir)
+                version = data_version(data_dir)
+                if _GEN.get(d) == version:
+                    return version
+                # fijada mientras carga: los loaders anidados (long -> store) reusan lo
+                # que ya quedó de esta versión
+                _PIN.versions = {**prev, d: version}
+                for key, (paths, loader) in list(_LOADERS.get(d, {}).items()):
+                    if (key, version) not in _BY_VERSION:
+                        shared_cache(key, paths, loader, data_dir)
+                if data_version(data_dir) == version and all(
+                    (key, version) in _BY_VERSION for key in _LOADERS.get(d, {})
+                ):
+                    _GEN[d] = version
+                    return version
+            # los datos no se quedaron quietos: lo que falte se carga al pedirlo
+            return version
+        finally:
+            _PIN.versions = prev
+
+
+def shared_cache(
+    key: Any, paths: Iterable[str | Path], loader: Callable[[], Any], data_dir: Optional[str | Path] = None,
+) -> Any:
+    """
+    Cache de proceso compartido por todas las sesiones de Streamlit.
+    Devuelve SIEMPRE el mismo objeto mientras no cambie la huella de `paths`
+    (sin copiar/despicklear como st.cache_data): quien lo use debe tratarlo como read-only.
+    Dentro del server de Streamlit arranca el watcher (ver `start_watcher`): desde ahí
+    los hits no tocan el disco y las recargas pasan fuera del request.
+    Con `data_dir`, lo cargado queda también por versión de datos y, si el thread fijó
+    una (ver `pin_data_version`), se devuelve el de esa versión. Una clave que el proceso
+    nunca había pedido se carga del disco: si el disco ya pasó a otra versión, sale de esa.
+    """
+    paths = tuple(paths)
+    data_dir = None if data_dir is None else Path(data_dir)
+    _maybe_start_watcher()
+    pin = None
+    if data_dir is not None:
+        _LOADERS.setdefault(_dir_key(data_dir), {}).setdefault(key, (paths, loader))
+        pin = _pinned_version(data_dir)
+        if pin is not None:
+            hit = _BY_VERSION.get((key, pin))
+            if hit is not None:
+                return hit
+    hit = _SHARED.get(key)
+    if pin is None and hit is not None and (_WATCHER is not None or hit[0] == data_fingerprint(paths)):
+        return hit[1]
+    with _SHARED_LOCK:
+        # otra sesión pudo haberlo cargado mientras esperábamos el lock
+        fp = data_fingerprint(paths)
+        if pin is not None and (key, pin) in _BY_VERSION:
+            return _BY_VERSION[(key, pin)]
+        hit = _SHARED.get(key)
+        if hit is not None and hit[0] == fp:
+            return hit[1]
+        value = _load_versioned(key, loader, data_dir)
+        _SHARED[key] = (fp, value, paths, loader, data_dir)
+        return value
+
+
+# =========================
+# Watcher de data/ (hot reload)
+# =========================
+
+_WATCHER: Optional[threading.Thread] = None
+_WATCH_INTERVAL = float(os.environ.get("BCRA_WATCH_INTERVAL", "30"))
+
+
+def _refresh_shared() -> int:
+    """
+    Recarga, fuera del request path, lo que cambió en disco y lo reemplaza por swap de
+    referencia: quien ya tomó un objeto lo sigue viendo entero. Las claves con `data_dir`
+    se recargan juntas, como una generación nueva (ver `_load_generation`); el resto, de a
+    una según su huella. Devuelve cuántas entradas cambió.
+    """
+    swapped = 0
+    for d in list(_LOADERS):
+        data_dir = Path(d)
+        if _GEN.get(d) == data_version(data_dir):
+            continue
+        try:
+            _load_generation(data_dir)
+        except Exception:
+            # p.ej. un build a mitad de camino: queda la versión vieja y se reintenta
+            continue
+        swapped += len(_LOADERS[d])
+    for key, (fp, _, paths, loader, data_dir) in list(_SHARED.items()):
+        if data_dir is not None:
+            continue
+        new_fp = data_fingerprint(paths)
+        if new_fp == fp:
+            continue
+        try:
+            entry = (new_fp, loader(), paths, loader, data_dir)
+        except Exception:
+            continue
+        with _SHARED_LOCK:
+            _SHARED[key] = entry
+        swapped += 1
+    return swapped
+
+
+def _watch_loop(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            _refresh_shared()
+        except Exception:
+            pass
+
+
+def start_watcher(interval: Optional[float] = None) -> threading.Thread:
+    """
+    Arranca (una sola vez por proceso) el thread que mira data/ cada `interval`
+    segundos y cambia en caliente lo que haya en el cache compartido.
+    """
+    global _WATCHER
+    with _SHARED_LOCK:
+        if _WATCHER is None:
+            _WATCHER = threading.Thread(
+                target=_watch_loop, args=(interval or _WATCH_INTERVAL,), name="bcra-data-watcher", daemon=True
+            )
+            _WATCHER.start()
+    return _WATCHER
+
+
+_WATCH_CHECKED = False
+
+
+def _maybe_start_watcher() -> None:
+    # sólo en el server (no en scripts de fetch/build, que leen lo que acaban de escribir)
+    global _WATCH_CHECKED
+    if _WATCH_CHECKED or _WATCH_INTERVAL <= 0:
+        return
+    try:
+        from streamlit import runtime
+        in_server = runtime.exists()
+    except Exception:
+        in_server = False
+    _WATCH_CHECKED = True
+    if in_server:
+        start_watcher()
+
+
+# =========================
+# Cache en disco (compartido entre procesos)
+# =========================
+
+# SQLite en data/.cache: un resultado calculado una vez por versión de datos lo usan
+# todos los workers y sesiones. LRU por tamaño total; hits/misses por función.
+DISK_CACHE_FILE = Path(".cache") / "results.sqlite"
+DISK_CACHE_MAX_BYTES = int(os.environ.get("BCRA_DISK_CACHE_MAX_MB", "256")) << 20
+_DISK_ENABLED = os.environ.get("BCRA_DISK_CACHE", "1") != "0"
+_DISK_LOCAL = threading.local()
+
+
+def _disk_db(data_dir: Path) -> sqlite3.Connection:
+    """Conexión por (proceso, thread, data_dir); sqlite no se comparte entre threads."""
+    conns = getattr(_DISK_LOCAL, "conns", None)
+    if conns is None or _DISK_LOCAL.pid != os.getpid():
+        conns = _DISK_LOCAL.conns = {}
+        _DISK_LOCAL.pid = os.getpid()
+    path = data_dir / DISK_CACHE_FILE
+    con = conns.get(path)
+    if con is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        con = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, fn TEXT, value BLOB, size INTEGER, last_used REAL)"
+        )
+        con.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_used)")
+        con.execute("CREATE TABLE IF NOT EXISTS metrics (fn TEXT PRIMARY KEY, hits INTEGER, misses INTEGER)")
+        conns[path] = con
+    return con
+
+
+def _digest(x, h) -> None:
+    """Alimenta `h` con el contenido de `x` (pandas/numpy por valor, el resto por pickle)."""
+    if isinstance(x, (pd.Series, pd.DataFrame)):
+        h.update(pickle.dumps((type(x).__name__, getattr(x, "name", None), list(getattr(x, "columns", [])))))
+        h.update(pd.util.hash_pandas_object(x, index=True).to_numpy().tobytes())
+    elif isinstance(x, np.ndarray):
+        h.update(str((x.dtype, x.shape)).encode())
+        h.update(np.ascontiguousarray(x).tobytes())
+    elif isinstance(x, (list, tuple)):
+        h.update(f"{type(x).__name__}{len(x)}".encode())
+        for v in x:
+            _digest(v, h)
+    elif isinstance(x, dict):
+        for k in sorted(x, key=repr):
+            h.update(repr(k).encode())
+            _digest(x[k], h)
+    else:
+        h.update(pickle.dumps(x, protocol=4))
+
+
+def _metric(con: sqlite3.Connection, fn: str, hit: bool) -> None:
+    col = "hits" if hit else "misses"
+    con.execute(
+        f"INSERT INTO metrics (fn, hits, misses) VALUES (?, ?, ?) "
+        f"ON CONFLICT(fn) DO UPDATE SET {col} = {col} + 1",
+        (fn, int(hit), int(not hit)),
+    )
+
+
+def _evict(con: sqlite3.Connection, max_bytes: int) -> None:
+    total = con.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    if total <= max_bytes:
+        return
+    # se borra desde el menos usado hasta quedar en ~90% del límite
+    con.execute(
+        "DELETE FROM entries WHERE key IN (SELECT key FROM (SELECT key, SUM(size) OVER "
+        "(ORDER BY last_used DESC) AS acc FROM entries) WHERE acc > ?)",
+        (int(max_bytes * 0.9),),
+    )
+
+
+def disk_cache(name: Optional[str] = None, versioned: bool = True, max_bytes: Optional[int] = None):
+    """
+    Decorador: guarda el resultado (pickle) en el cache SQLite de `data/.cache`, con clave
+    (función, argumentos, versión de datos). Es para loaders que leen de `data_dir`: una
+    función barata de sus argumentos no lo necesita (hashear y des-picklear cuesta más que
+    calcular). `versioned=False` sólo si el resultado no depende de los datos. La versión
+    sale del argumento `data_dir` de la función si lo tiene. Ante cualquier problema del cache, calcula y sigue: nunca rompe al caller.
+    Los resultados se comparten: NO modificarlos in-place.
+    """
+    def deco(fn):
+        sig = inspect.signature(fn)
+        fn_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _DISK_ENABLED:
+                return fn(*args, **kwargs)
+            try:
+                bound = sig.bind(*args, **kwargs)
+                bound.apply_defaults()
+                data_dir = Path(bound.arguments.get("data_dir") or "data")
+                h = hashlib.sha1(fn_name.encode())
+                if versioned:
+                    h.update((_pinned_version(data_dir) or data_version(data_dir)).encode())
+                _digest(dict(bound.arguments), h)
+                key = h.hexdigest()
+                con = _disk_db(data_dir)
+                row = con.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = pickle.loads(row[0])
+                    con.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+                    _metric(con, fn_name, True)
+                    return value
+            except Exception:
+                return fn(*args, **kwargs)
+
+            value = fn(*args, **kwargs)
+            try:
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                con.execute(
+                    "INSERT OR REPLACE INTO entries (key, fn, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, fn_name, blob, len(blob), time.time()),
+                )
+                _metric(con, fn_name, False)
+                _evict(con, max_bytes or DISK_CACHE_MAX_BYTES)
+            except Exception:
+                pass
+            return value
+
+        return wrapper
+    return deco
+
+
+def disk_cache_stats(data_dir: str | Path = "data") -> pd.DataFrame:
+    """Por función: hits, misses, hit rate, entradas y bytes en el cache de disco."""
+    con = _disk_db(Path(data_dir))
+    return pd.read_sql_query(
+        "SELECT m.fn, m.hits, m.misses, ROUND(1.0 * m.hits / MAX(m.hits + m.misses, 1), 3) AS hit_rate, "
+        "COUNT(e.key) AS entries, COALESCE(SUM(e.size), 0) AS bytes "
+        "FROM metrics m LEFT JOIN entries e ON e.fn = m.fn GROUP BY m.fn ORDER BY m.fn",
+        con,
+    )
+
+
+def _data_files(data_dir: Path) -> list[Path]:
+    return sorted(data_dir.glob("*.csv")) + [
+        data_dir / STORE_FILE, data_dir / SNAPSHOT_FILE, data_dir / VERSIONS_DIR / VERSIONS_MANIFEST,
+    ]
+
+
+def data_version(data_dir: str | Path = "data") -> str:
+    """Huella corta de los archivos del store en `data_dir`: cambia con cada fetch/build."""
+    fp = data_fingerprint(_data_files(Path(data_dir)))
+    return hashlib.sha1(repr(fp).encode()).hexdigest()[:16]
+
+
+def _load_store_uncached(data_dir: Path, value_dtype: str) -> SeriesStore:
+    snap = _ensure_snapshot(data_dir)
+    if snap is not None:
+        try:
+            return _open_snapshot(snap, value_dtype)
+        except Exception:
+            pass
+    store = data_dir / STORE_FILE
+    if store.exists():
+        try:
+            return _read_store(store, value_dtype)
+        except Exception:
+            # store roto o sin pyarrow: seguimos con los CSV
+            pass
+    return SeriesStore.from_long(_load_csv_dir(data_dir), value_dtype)
+
+
+def load_bcra_store(data_dir: str | Path = "data", value_dtype: str = "float64") -> SeriesStore:
+    """
+    Carga el store en su forma compacta (`SeriesStore`).
+    Orden de preferencia: snapshot Arrow mapeado en memoria (`data/series_store.arrow`),
+    store Parquet (`data/series_store.parquet`) y, si no hay ninguno, el camino
+    viejo: parsear TODOS los CSV de `data/`.
+    `value_dtype="float32"` reduce a la mitad los valores para usos sólo de display.
+    Compartido entre sesiones (ver `shared_cache`): NO modificarlo in-place.
+    """
+    data_dir = Path(data_dir)
+    return shared_cache(
+        ("bcra_store", str(data_dir.resolve()), value_dtype),
+        _data_files(data_dir),
+        lambda: _load_store_uncached(data_dir, value_dtype),
+        data_dir,
+    )
+
+
+def load_bcra_long(data_dir: str | Path = "data") -> pd.DataFrame:
+    """
+    Devuelve un DF long con columnas:
+      fecha (datetime), descripcion (categoría de str), valor (float)
+    ordenado por (descripcion, fecha). Es la vista pandas de `load_bcra_store`: lee el
+    store columnar y, si no hay store, cae a los CSV de `data_dir`.
+    Compartida entre sesiones: NO modificarla in-place.
+    """
+    data_dir = Path(data_dir)
+    return shared_cache(
+        ("bcra_long", str(data_dir.resolve())),
+        _data_files(data_dir),
+        lambda: load_bcra_store(data_dir).to_frame(),
+        data_dir,
+    )
+
+
+def load_store_view(freq: str, how: str = "last", data_dir: str | Path = "data") -> Optional[SeriesStore]:
+    """
+    Vista materializada (freq, how) del store (ver `write_views`); None si no es una de
+    `STORE_VIEWS`. Si el archivo de vistas falta o quedó más viejo que el store, la
+    calcula del store en memoria (una vez: queda en el cache compartido).
+    Compartida entre sesiones: NO modificarla in-place.
+    """
+    if (_freq(freq), how) not in STORE_VIEWS:
+        return None
+    data_dir = Path(data_dir)
+    path = data_dir / VIEWS_FILE
+
+    def _load() -> SeriesStore:
+        _ensure_snapshot(data_dir)
+        if path.exists() and _mtime(path) >= _mtime(data_dir / STORE_FILE):
+            try:
+                return _read_view(path, freq, how)
+            except Exception:
+                pass
+        return load_bcra_store(data_dir).resample(freq, how)
+
+    return shared_cache(
+        ("bcra_view", str(data_dir.resolve()), _view_key(freq, how)),
+        [path] + _data_files(data_dir),
+        _load,
+        data_dir,
+    )
+
+
+def _wide_with_view(store: SeriesStore, view: SeriesStore, names: list, start, end, freq: str, how: str) -> pd.DataFrame:
+    """
+    `store.wide(names, start, end, freq, how)` sirviendo de `view` los períodos enteros
+    dentro de [start, end]; sólo los períodos cortados por los bordes se re-muestrean
+    desde el store (así el resultado es idéntico al re-muestreo en el momento).
+    """
+    d0, d1 = _day(start), _day(end)
+    code = lambda d: int(_period_codes(np.array([d]), freq)[0])
+    end_of = lambda p: int(_period_end(np.array([p], dtype=np.int64), freq)[0])
+    p_lo = p_hi = None
+    if d0 is not None:
+        p_lo = code(d0) if code(d0 - 1) != code(d0) else code(d0) + 1
+    if d1 is not None:
+        p_hi = code(d1) if code(d1 + 1) != code(d1) else code(d1) - 1
+    if p_lo is not None and p_hi is not None and p_lo > p_hi:
+        return store.wide(names, start, end, freq, how)
+
+    date = lambda d: pd.Timestamp(_from_days(np.array([d], dtype=np.int32))[0])
+    parts = []
+    if p_lo is not None and d0 <= end_of(p_lo - 1):
+        parts.append(store.resample(freq, how, names, start, date(end_of(p_lo - 1))).align(names))
+    parts.append(view.align(
+        names,
+        None if p_lo is None else date(end_of(p_lo)),
+        None if p_hi is None else date(end_of(p_hi)),
+    ))
+    if p_hi is not None and d1 > end_of(p_hi):
+        parts.append(store.resample(freq, how, names, date(end_of(p_hi) + 1), end).align(names))
+    days = np.concatenate([d for d, _ in parts])
+    mat = np.concatenate([m for _, m in parts]) if len(parts) > 1 else parts[0][1]
+    return pd.DataFrame(
+        mat,
+        index=pd.DatetimeIndex(_from_days(days), name="fecha"),
+        columns=pd.Index(names, dtype=object, name="descripcion"),
+    )
+
+
+def get_series(
+    name: str, start=None, end=None, freq: str = "D", how: str = "last", data_dir: str | Path = "data",
+) -> pd.Series:
+    """
+    Serie `name` del store compartido (index fecha) recortada a [start, end].
+    Con `freq` W/M/Q/A sale de las vistas materializadas (ver `get_wide`).
+    """
+    if _freq(freq) == "D":
+        return load_bcra_store(data_dir).series(name, start, end)
+    return get_wide([name], start, end, freq, how, data_dir)[name].dropna()
+
+
+def get_wide(
+    names: Iterable[str], start=None, end=None, freq: str = "D", how: "str | dict" = "last",
+    data_dir: str | Path = "data",
+) -> pd.DataFrame:
+    """
+    DF ancho (index fecha, una columna por serie) del store compartido, en [start, end].
+    Reemplaza los `df[df["descripcion"].isin(sel)].pivot(...)` de las páginas.
+    Con `freq` W/M/Q/A usa la vista materializada de (freq, how) si existe, y si no
+    re-muestrea en el momento (`SeriesStore.wide`); el resultado es el mismo.
+    """
+    names = list(dict.fromkeys(names))
+    store = load_bcra_store(data_dir)
+    freq = _freq(freq)
+    view = load_store_view(freq, how, data_dir) if freq != "D" and isinstance(how, str) else None
+    if view is None:
+        return store.wide(names, start, end, freq, how)
+    return _wide_with_view(store, view, names, start, end, freq, how)
+
+
+def load_series_stats(data_dir: str | Path = "data") -> pd.DataFrame:
+    """
+    Resumen por serie (index descripcion; ver `SeriesStore.stats`) desde el sidecar
+    `data/series_store.stats.parquet`. Alcanza para pickers, rango de fechas y último
+    dato sin cargar las series; si falta el sidecar, se calcula del store.
+    Compartido entre sesiones (ver `shared_cache`): NO modificarlo in-place.
+    """
+    data_dir = Path(data_dir)
+    path = data_dir / STATS_FILE
+    return shared_cache(
+        ("bcra_stats", str(data_dir.resolve())),
+        [path] + _data_files(data_dir),
+        lambda: read_stats(path, lambda: load_bcra_store(data_dir)),
+        data_dir,
+    )
+
+
+@disk_cache()
+def _kpi_table_range(names, start, end, freq, how, data_dir) -> pd.DataFrame:
+    return load_bcra_store(data_dir).kpis(names, start, end, freq, how, monthly=load_store_view("M", "last", data_dir))
+
+
+def refresh_kpi_state(data_dir: str | Path = "data") -> pd.DataFrame:
+    """
+    Hook post-fetch: lleva `data/series_store.kpistate.parquet` a la última versión de
+    `data/store/` aplicando sólo los deltas registrados desde la versión del estado (el
+    costo escala con lo que llegó, no con el histórico). Sin estado, o si las versiones
+    arrancaron de nuevo (base sin delta que la preceda), lo arma desde el store.
+    Devuelve el estado; si no se puede escribir (filesystem read-only) igual lo devuelve.
+    """
+    data_dir = Path(data_dir)
+    path = data_dir / KPI_STATE_FILE
+    state, version = read_kpi_state(path)
+    segs = list_versions(data_dir)
+    latest = segs[-1]["id"] if segs else None
+    if state is not None and version is not None and version == latest:
+        return state
+
+    store = load_bcra_store(data_dir)
+    new = [s for s in segs if version is not None and s["id"] > version]
+    delta_ids = {s["id"] for s in new if s["kind"] == "delta"}
+    if state is None or version is None or not new or any(s["kind"] == "base" and s["id"] not in delta_ids for s in new):
+        state = update_kpi_state(None, store)
+    else:
+        vdir = data_dir / VERSIONS_DIR
+        delta = SeriesStore.concat([_read_store(vdir / s["file"]) for s in new if s["kind"] == "delta"])
+        # varias corridas: por (serie, fecha) vale la última
+        keep = np.r_[~delta.duplicated()[1:], True]
+        delta = SeriesStore(delta.names, delta.codes[keep], delta.days[keep], delta.values[keep])
+        state = update_kpi_state(state, store, delta)
+    try:
+        write_kpi_state(state, path, latest)
+    except Exception:
+        pass
+    return state
+
+
+def refresh_real_terms(data_dir: str | Path = "data") -> Optional[Path]:
+    """
+    Hook post-fetch de DatosAR: re-deflacta las series en pesos del store con el IPC
+    nuevo y lo reescribe (con su versión) sólo si cambió algo. Devuelve el Parquet, o None.
+    """
+    data_dir = Path(data_dir)
+    store = load_bcra_store(data_dir)
+    if not len(store) or not len(_diff_stores(store, with_real_terms(store, data_dir))):
+        return None
+    return write_store(store, data_dir)
+
+
+def kpi_table(
+    names: Optional[Iterable[str]] = None, start=None, end=None, freq: str = "D", how: "str | dict" = "last",
+    data_dir: str | Path = "data",
+) -> pd.DataFrame:
+    """
+    KPIs (columnas `KPI_COLUMNS`, index descripcion) de todas las series o de `names`,
+    para el rango visible [start, end] a `freq`/`how`; mismos números que `compute_kpis`
+    serie por serie, en una pasada vectorizada (`SeriesStore.kpis`).
+    Sin rango ni frecuencia sale del estado incremental (`refresh_kpi_state`), O(1) por serie;
+    con rango se calcula sobre la vista mensual y queda en el cache de disco.
+    Compartido entre sesiones: NO modificarlo in-place.
+    """
+    data_dir = Path(data_dir)
+    names = None if names is None else list(dict.fromkeys(names))
+    if start is None and end is None and _freq(freq) == "D":
+        path = data_dir / KPI_STATE_FILE
+
+        def _load() -> pd.DataFrame:
+            _ensure_snapshot(data_dir)
+            return kpis_from_state(refresh_kpi_state(data_dir))
+
+        table = shared_cache(("bcra_kpis", str(data_dir.resolve())), [path] + _data_files(data_dir), _load, data_dir)
+        return table if names is None else table.loc[[n for n in names if n in table.index]]
+    return _kpi_table_range(names, start, end, _freq(freq), how, data_dir)
+
+
+def list_series(data_dir: str | Path = "data") -> list[str]:
+    """
+    Nombres de todas las series del store, ordenados. Del Parquet sólo lee la columna
+    `descripcion` (su diccionario); sin Parquet, usa el store en memoria.
+    """
+    path = Path(data_dir) / STORE_FILE
+    _ensure_snapshot(Path(data_dir))
+    if path.exists():
+        try:
+            import pyarrow.parquet as pq
+            col = pq.read_table(path, columns=["descripcion"]).column("descripcion")
+            return sorted({n for chunk in col.chunks for n in chunk.dictionary.to_pylist()})
+        except Exception:
+            pass
+    return list(load_bcra_store(data_dir).names)
+
+
+@disk_cache()
+def load_series(
+    names: Iterable[str],
+    start=None,
+    end=None,
+    freq: Optional[str] = None,
+    data_dir: str | Path = "data",
+) -> pd.DataFrame:
+    """
+    Lee SÓLO las series `names` en [start, end] y devuelve el DF long (fecha, descripcion, valor).
+    Los filtros se empujan al lector Parquet: con el store ordenado por serie y fecha,
+    las estadísticas min/max de cada row group descartan casi todo el archivo sin decodificarlo.
+    Sin Parquet (o sin pyarrow) recorta el store en memoria.
+    `freq` ("W"/"M"/"Q"/"A") devuelve fin de período por serie.
+    """
+    names = list(dict.fromkeys(names))
+    path = Path(data_dir) / STORE_FILE
+    df = None
+    if names:
+        # por si hay versiones más nuevas que el Parquet local
+        _ensure_snapshot(Path(data_dir))
+    if names and path.exists():
+        try:
+            import pyarrow.parquet as pq
+            filters = [("descripcion", "in", names)]
+            if start is not None:
+                filters.append(("fecha", ">=", pd.Timestamp(start).date()))
+            if end is not None:
+                filters.append(("fecha", "<=", pd.Timestamp(end).date()))
+            table = pq.read_table(path, filters=filters)
+            df = table.to_pandas(date_as_object=False)
+            df["fecha"] = df["fecha"].astype("datetime64[ns]")
+            df["descripcion"] = df["descripcion"].astype(str)
+        except Exception:
+            df = None
+    if df is None:
+        store = load_bcra_store(data_dir)
+        parts = [store.series(n, start, end) for n in names]
+        parts = [p.rename_axis("fecha").rename("valor").reset_index().assign(descripcion=p.name)
+                 for p in parts if not p.empty]
+        df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["fecha", "descripcion", "valor"])
+    df = df[["fecha", "descripcion", "valor"]]
+    if freq and _freq(freq) != "D" and not df.empty:
+        df = SeriesStore.from_long(df).resample(freq, "last").to_frame()
+        df["descripcion"] = df["descripcion"].astype(str)
+    return df.sort_values(["descripcion", "fecha"]).reset_index(drop=True)
+
+
+# =========================
+# Fórmulas (indicadores propios)
+# =========================
+
+# Expresiones como `(base_monetaria / reservas) * 100` o `yoy(m2) - yoy(ipc)`. Las series
+# se nombran por id estable, `bcra_<idVariable>` del catálogo de Monetarias, o por un alias
+# que pase la página. Se parsean con `ast`: números, + - * / ^ y las funciones de FORMULA_FUNCS.
+FORMULA_TOL_DAYS = 3
+
+
+class FormulaError(ValueError):
+    """Fórmula mal escrita o con series que no existen (el mensaje es para el usuario)."""
+
+
+def _lag_change(days: np.ndarray, vals: np.ndarray, offset: pd.DateOffset, tol: int) -> np.ndarray:
+    """Variación % contra el dato (as-of, con tolerancia) de `offset` antes."""
+    prev = _to_days(pd.DatetimeIndex(_from_days(days)) - offset)
+    base = asof_align([(days, vals)], prev, _native_tol(days, tol))[1][:, 0]
+    return (vals / base - 1.0) * 100.0
+
+
+FORMULA_FUNCS = {
+    "yoy": lambda d, v, tol: _lag_change(d, v, pd.DateOffset(years=1), tol),
+    "mom": lambda d, v, tol: _lag_change(d, v, pd.DateOffset(months=1), tol),
+    "log": lambda d, v, tol: np.log(v),
+    "abs": lambda d, v, tol: np.abs(v),
+}
+_FORMULA_BINOPS = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide, ast.Pow: np.power}
+_FORMULA_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Constant, ast.Load,
+                  ast.USub, ast.UAdd, *_FORMULA_BINOPS)
+
+
+def _native_tol(days: np.ndarray, tol: int) -> int:
+    """Tolerancia as-of de una serie: `tol` días o su paso típico (una mensual vale todo el mes)."""
+    if len(days) < 2:
+        return tol
+    return max(tol, int(np.median(np.diff(days))) + 1)
+
+
+def parse_formula(expr: str) -> ast.expr:
+    """Parsea y valida `expr`; acepta también ^ ÷ × − como en el constructor de la página."""
+    text = expr.replace("^", "**").replace("÷", "/").replace("×", "*").replace("−", "-").strip()
+    if not text:
+        raise FormulaError("la fórmula está vacía")
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as e:
+        raise FormulaError(f"fórmula inválida: {e.msg}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, _FORMULA_NODES):
+            raise FormulaError(f"no se admite `{ast.unparse(node)}` en una fórmula")
+        if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+            raise FormulaError(f"constante inválida: {node.value!r}")
+        if isinstance(node, ast.Call):
+            if not (isinstance(node.func, ast.Name) and node.func.id in FORMULA_FUNCS):
+                raise FormulaError(f"función desconocida: `{ast.unparse(node.func)}` (hay {', '.join(FORMULA_FUNCS)})")
+            if len(node.args) != 1 or node.keywords:
+                raise FormulaError(f"`{node.func.id}` lleva un solo argumento (una serie o expresión): `{ast.unparse(node)}`")
+    return tree.body
+
+
+def _formula_names(node: ast.expr) -> list[str]:
+    """Nombres de serie de la fórmula, en orden de aparición (sin los de funciones)."""
+    if isinstance(node, ast.Name):
+        return [node.id]
+    if isinstance(node, ast.BinOp):
+        return _formula_names(node.left) + _formula_names(node.right)
+    if isinstance(node, ast.UnaryOp):
+        return _formula_names(node.operand)
+    if isinstance(node, ast.Call):
+        return _formula_names(node.args[0])
+    return []
+
+
+def formula_inputs(expr: str) -> list[str]:
+    """Nombres de serie que usa `expr`, sin repetir (valida la sintaxis)."""
+    return list(dict.fromkeys(_formula_names(parse_formula(expr))))
+
+
+def _formula_terms(node: ast.expr, terms: dict) -> dict:
+    """Subexpresiones no aritméticas (series y funciones): cada una es una columna a alinear."""
+    if isinstance(node, (ast.Name, ast.Call)):
+        terms.setdefault(ast.dump(node), node)
+    elif isinstance(node, ast.BinOp):
+        _formula_terms(node.left, terms)
+        _formula_terms(node.right, terms)
+    elif isinstance(node, ast.UnaryOp):
+        _formula_terms(node.operand, terms)
+    return terms
+
+
+def _formula_arith(node: ast.expr, cols: dict):
+    if isinstance(node, ast.Constant):
+        return float(node.value)
+    if isinstance(node, ast.UnaryOp):
+        v = _formula_arith(node.operand, cols)
+        return -v if isinstance(node.op, ast.USub) else v
+    if isinstance(node, ast.BinOp):
+        return _FORMULA_BINOPS[type(node.op)](_formula_arith(node.left, cols), _formula_arith(node.right, cols))
+    return cols[ast.dump(node)]
+
+
+def _formula_eval(node: ast.expr, refs: dict, store: "SeriesStore", tol: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(días, valores) de `node`: cada término en su calendario, una alineación as-of y numpy."""
+    native = []
+    terms = _formula_terms(node, {})
+    for term in terms.values():
+        if isinstance(term, ast.Name):
+            lo, hi = store.span(refs[term.id])
+            d, v = store.days[lo:hi], store.values[lo:hi].astype(float)
+        else:
+            d, v = _formula_eval(term.args[0], refs, store, tol)
+            with np.errstate(all="ignore"):
+                v = FORMULA_FUNCS[term.func.id](d, v, tol)
+        ok = np.isfinite(v)
+        native.append((d[ok], v[ok]))
+    if not native:
+        raise FormulaError("la fórmula no usa ninguna serie")
+
+    days, mat = asof_align(native, None, [_native_tol(d, tol) for d, _ in native])
+    cols = dict(zip(terms, mat.T))
+    with np.errstate(all="ignore"):
+        out = np.broadcast_to(_formula_arith(node, cols), days.shape).astype(float)
+    ok = np.isfinite(out)
+    return days[ok], out[ok]
+
+
+@dataclass(frozen=True)
+class FormulaPlan:
+    """
+    Fórmula compilada: expresión canónica (`ast.unparse`) y series que usa, como pares
+    (nombre en la fórmula, descripcion). Al evaluarla, los términos (series y funciones)
+    se calculan cada uno en su calendario, se alinean una vez sobre la unión de fechas
+    (as-of hacia atrás, `tol` días o el paso de la serie) y la aritmética va en numpy.
+    """
+    expr: str
+    refs: Tuple[Tuple[str, str], ...]
+
+    def evaluate(self, store: "SeriesStore", tol_days: int = FORMULA_TOL_DAYS) -> Tuple[np.ndarray, np.ndarray]:
+        return _formula_eval(parse_formula(self.expr), dict(self.refs), store, tol_days)
+
+
+def formula_ids(data_dir: str | Path = "data") -> dict:
+    """Ids estables -> descripcion: `bcra_<idVariable>` del catálogo de Monetarias."""
+    stats = load_series_stats(data_dir)
+    if "id" not in stats:
+        return {}
+    return {f"bcra_{i}": d for d, i in stats["id"].items() if i is not None and not pd.isna(i)}
+
+
+def compile_formula(expr: str, aliases: Optional[dict] = None, data_dir: str | Path = "data") -> FormulaPlan:
+    """
+    Valida `expr` y resuelve sus nombres: `aliases` (nombre -> descripcion) y luego
+    `formula_ids`. Levanta FormulaError si algo no existe en el store.
+    """
+    tree = parse_formula(expr)
+    known = {**formula_ids(data_dir), **(aliases or {})}
+    names = formula_inputs(expr)
+    missing = [n for n in names if n not in known]
+    if missing:
+        raise FormulaError(f"series desconocidas: {', '.join(missing)}")
+    store = load_bcra_store(data_dir)
+    empty = [n for n in names if known[n] not in store.index]
+    if empty:
+        raise FormulaError(f"sin datos para: {', '.join(empty)}")
+    return FormulaPlan(ast.unparse(tree), tuple(sorted((n, known[n]) for n in names)))
+
+
+@disk_cache()
+def _formula_series(expr: str, refs: tuple, tol_days: int, data_dir) -> pd.Series:
+    days, vals = FormulaPlan(expr, refs).evaluate(load_bcra_store(data_dir), tol_days)
+    return pd.Series(vals, index=pd.DatetimeIndex(_from_days(days), name="fecha"), name=expr)
+
+
+def eval_formula(
+    expr: str, aliases: Optional[dict] = None, start=None, end=None,
+    tol_days: int = FORMULA_TOL_DAYS, data_dir: str | Path = "data",
+) -> pd.Series:
+    """
+    Serie (index fecha) de la fórmula `expr`, recortada a [start, end]. Se evalúa sobre
+    la historia completa (yoy/mom miran antes de `start`) y queda en el cache de disco
+    por expresión canónica + versión de datos.
+    """
+    plan = compile_formula(expr, aliases, data_dir)
+    s = _formula_series(plan.expr, plan.refs, tol_days, data_dir)
+    if start is None and end is None:
+        return s
+    return s.loc[pd.Timestamp(start) if start is not None else None:pd.Timestamp(end) if end is not None else None]
+
+
+# =========================
+# SQL embebido (DuckDB) sobre data/
+# =========================
+
+# vista -> archivo dentro de data/; las que no existen no se registran
+QUERY_VIEWS = {
+    "series": STORE_FILE,                       # fecha, descripcion, valor (store BCRA)
+    "stats": STATS_FILE,                        # resumen por serie (ver write_stats)
+    "views": VIEWS_FILE,                        # vista, fecha, descripcion, valor (ver write_views)
+    "macro_core": "macro_core_long.parquet",
+    "datosar": "datosar_long.parquet",
+    "datosar_core": "datosar_core_long.parquet",
+}
+_DUCK: dict[str, Any] = {}
+
+
+def _duck(data_dir: Path):
+    """Conexión DuckDB en memoria (una por data_dir) con las vistas de `QUERY_VIEWS`."""
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("query() necesita duckdb: pip install duckdb") from e
+    _ensure_snapshot(data_dir)
+    key = str(data_dir.resolve())
+    with _SHARED_LOCK:
+        con = _DUCK.get(key)
+        if con is None:
+            con = _DUCK[key] = duckdb.connect(":memory:")
+        # las vistas leen el archivo en cada consulta (siempre lo último en disco),
+        # con proyección y filtros empujados al lector Parquet
+        for view, name in QUERY_VIEWS.items():
+            path = data_dir / name
+            if path.exists():
+                # una vista no acepta parámetros: el path va como literal, con las comillas escapadas
+                literal = path.as_posix().replace("'", "''")
+                con.execute(f"CREATE OR REPLACE VIEW {view} AS SELECT * FROM read_parquet('{literal}')")
+            else:
+                con.execute(f"DROP VIEW IF EXISTS {view}")
+    return con
+
+
+def query(sql: str, params: Optional[list] = None, data_dir: str | Path = "data") -> pd.DataFrame:
+    """
+    Corre `sql` (DuckDB, en proceso y offline) sobre los archivos de `data/` y devuelve
+    un DataFrame. Vistas: `series` (store BCRA), `stats`, `views` (vistas materializadas,
+    columna `vista` = "M_last", ...), `macro_core`, `datosar`, `datosar_core` (ver
+    `QUERY_VIEWS`). Ej.:
+
+        query("SELECT descripcion, max(valor) FROM series WHERE fecha >= ? GROUP BY 1",
+              ["2024-01-01"])
+    """
+    cur = _duck(Path(data_dir)).cursor()  # cursor propio: la conexión se comparte entre threads
+    try:
+        return cur.execute(sql, params or []).df()
+    finally:
+        cur.close()
+
+
+# =========================
+# Helpers de búsqueda / resample
+# =========================
+
+def _norm(s: str) -> str:
+    return str(s).strip().lower()
+
+
+def find_first(candidates: Iterable[str], *tokens: str) -> Optional[str]:
+    """
+    Devuelve el primer string en `candidates` que contenga TODOS los tokens (insensible a mayúsculas).
+    """
+    toks = [_norm(t) for t in tokens if t]
+    for c in candidates:
+        sc = _norm(c)
+        if all(t in sc for t in toks):
+            return c
+    return None
+
+
+def resample_series(s: pd.Series, freq: str = "D", how: str = "last") -> pd.Series:
+    """
+    Re-muestrea una serie (index datetime) a 'D', 'W', 'M', 'Q' o 'A', usando 'last' por default
+    ("auto" = `resample_how(s.name)`). Períodos sin dato no aparecen. Para varias series a la
+    vez, `SeriesStore.resample` / `resample_wide` (mismo núcleo, una sola pasada).
+    """
+    if s.empty:
+        return s
+    if how == "auto":
+        how = resample_how(str(s.name))
+    freq = _freq(freq)
+    s = pd.to_numeric(s, errors="coerce")
+    if s.index.tz is not None:
+        s = s.tz_localize(None)
+    if not s.index.is_monotonic_increasing:
+        s = s.sort_index(kind="stable")
+    days = _to_days(s.index)
+    _, d, v = _resample_rows(
+        np.zeros(len(s), dtype=np.int32), days, s.to_numpy(dtype=float),
+        freq, lambda c: np.full(len(c), how if how in HOWS else "last", dtype=object),
+    )
+    return pd.Series(v, index=pd.DatetimeIndex(_from_days(d), name=s.index.name), name=s.name)
+
+
+def resample_wide(df: pd.DataFrame, freq: str = "D", how: "str | dict" = "last") -> pd.DataFrame:
+    """
+    Re-muestrea un DF ancho (index fecha, una columna por serie) con el mismo núcleo
+    vectorizado que `SeriesStore.resample`; `how` como ahí (str, "auto" o dict por columna).
+    """
+    if _freq(freq) == "D" or df.empty:
+        return df
+    df = df.sort_index(kind="stable")
+    names = [str(c) for c in df.columns]
+    mat = df.to_numpy(dtype=float)
+    n, k = mat.shape
+    store = SeriesStore.from_parts(
+        np.array(names, dtype=object),
+        np.repeat(np.arange(k, dtype=np.int32), n),
+        np.tile(_to_days(df.index), k),
+        mat.T.ravel(),
+    )
+    out = store.resample(freq, how).wide(names)
+    out.columns = df.columns
+    out.index.name = df.index.name
+    return out
 
 
 # =========================
@@ -154,13 +2702,16 @@ def resample_series(s: pd.Series, freq: str = "D", how: str = "last") -> pd.Seri
 def compute_kpis(
     serie_full: pd.Series,
     serie_vis: pd.Series,
-    d_fin: Optional[pd.Timestamp] = None
+    d_fin: Optional[pd.Timestamp] = None,
+    full_is_monthly: bool = False,
 ) -> tuple[Optional[float], Optional[float], Optional[float]]:
     """
     Devuelve (MoM, YoY, Δperiodo) en %.
     - MoM y YoY se calculan SIEMPRE con la serie mensual del histórico (fin de mes).
     - Δperiodo es entre primer y último dato de la serie visible (con su frecuencia actual).
     - d_fin es opcional; si no viene, se toma del último índice visible.
+    - full_is_monthly: `serie_full` ya son los cierres de mes (p.ej. de la vista "M_last",
+      `get_series(name, freq="M")`); no se re-muestrea.
     """
     # Normalizaciones
     sf = serie_full.copy()
@@ -174,7 +2725,7 @@ def compute_kpis(
         sv.index = sv.index.tz_localize(None)
 
     # MoM / YoY con mensual del histórico
-    m = sf.resample("M").last().dropna()
+    m = sf.sort_index() if full_is_monthly else resample_series(sf, "M", "last")
 
     # elegimos d_fin
     if d_fin is None:
@@ -194,10 +2745,14 @@ def compute_kpis(
 
     # calcular YoY
     yoy = None
-    if not m.empty:
-        # último mensual <= d_fin
-        last_idx = m.index[m.index <= d_fin][-1] if d_fin is not None else m.index[-1]
-        ref_date = last_idx - pd.DateOffset(years=1)
+    # último mensual <= d_fin (puede no haber: rango que termina antes del primer cierre)
+    m_upto = m.index[m.index <= d_fin] if d_fin is not None else m.index
+    if len(m_upto):
+        last_idx = m_upto[-1]
+        # el mismo mes del año previo, entero: con DateOffset el cierre del 29/02 quedaría
+        # después del 28/02 y el YoY de feb del año siguiente saldría contra enero (igual
+        # regla de meses que `_mom_yoy`)
+        ref_date = last_idx - pd.DateOffset(years=1) + pd.offsets.MonthEnd(0)
         # buscamos el mensual “previo o igual” a ref_date
         m_ref = m.loc[:ref_date]
         if len(m_ref) > 0:
@@ -3,8 +3,8 @@ import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
 
-from ui import inject_css, range_controls, kpi_quad, clean_label, looks_percent
-from bcra_utils import resample_series, compute_kpis  # ya lo tenés
+from ui import inject_css, range_controls, kpi_quad, clean_label, looks_percent, freq_code
+from bcra_utils import SeriesStore, shared_cache, read_stats  # ya lo tenés
 
 st.set_page_config(page_title="Series de Datos Argentina", layout="wide")
 inject_css()
@@ -12,9 +12,9 @@ st.title("🇦🇷 Series de Datos Argentina")
 
 LONG = "data/datosar_long.parquet"
 CAT  = "data/datosar_catalog_meta.parquet"
+STATS = "data/datosar_long.stats.parquet"
 
-@st.cache_data
-def load_long():
+def _load_long():
     try:
         df = pd.read_parquet(LONG)
         df["fecha"] = pd.to_datetime(df["fecha"])
@@ -22,17 +22,27 @@ def load_long():
     except Exception:
         return pd.DataFrame()
 
-@st.cache_data
-def load_catalog():
+def _load_catalog():
     try:
         return pd.read_parquet(CAT)
     except Exception:
         return pd.DataFrame()
 
-df = load_long()
+# compartidos entre sesiones (read-only); se invalidan cuando cambian los archivos
+def load_store():
+    return shared_cache("datosar_store", [LONG], lambda: SeriesStore.from_long(_load_long()))
+
+def load_catalog():
+    return shared_cache("datosar_catalog", [CAT], _load_catalog)
+
+def load_stats():
+    return shared_cache("datosar_stats", [STATS, LONG], lambda: read_stats(STATS, load_store))
+
+# primero el resumen por serie (chico); el long completo sólo cuando hay algo para graficar
+stats = load_stats()
 cat = load_catalog()
 
-if df.empty or cat.empty:
+if stats.empty or cat.empty:
     st.warning("Todavía no hay datos locales de DatosAR. Corré el fetch de catálogo + datos.")
     st.stop()
 
@@ -50,20 +60,17 @@ if not sel:
     st.info("Seleccioná al menos una serie.")
     st.stop()
 
-# Pivot largo → ancho
-wide = (
-    df[df["descripcion"].isin(sel)]
-    .pivot(index="fecha", columns="descripcion", values="valor")
-    .sort_index()
-)
-
-dmin, dmax = wide.index.min(), wide.index.max()
+sel = [s for s in sel if s in stats.index]
+if not sel:
+    st.warning("Las series elegidas no tienen datos locales.")
+    st.stop()
+dmin, dmax = stats.loc[sel, "desde"].min(), stats.loc[sel, "hasta"].max()
 d_ini, d_fin, freq_label = range_controls(dmin, dmax, key="datosar", show_government=False)
-freq = "D" if freq_label.startswith("Diaria") else "M"
+freq, how = freq_code(freq_label)
 
-vis = wide.loc[d_ini:d_fin]
-if freq == "M":
-    vis = vis.resample("M").last()
+# ancho sólo para el rango visible
+store = load_store()
+vis = store.wide(sel, d_ini, d_fin, freq=freq, how=how)
 vis = vis.dropna(how="all")
 
 fig = go.Figure()
@@ -93,22 +100,13 @@ fig.update_yaxes(title_text="Valor")
 
 st.plotly_chart(fig, use_container_width=True)
 
-# KPIs (cuádruple: último + MoM + YoY + Δ)
+# KPIs (cuádruple: último + MoM + YoY + Δ), las series elegidas en una pasada
+kpis = store.kpis(sel, d_ini, d_fin, freq=freq, how=how)
+
 def kpis_for(name: str, color: str):
-    full = (
-        df[df["descripcion"] == name]
-        .set_index("fecha")["valor"]
-        .sort_index()
-        .astype(float)
-    )
-    visible = resample_series(
-        vis[name].dropna(),
-        freq=("D" if freq_label.startswith("Diaria") else "M"),
-        how="last",
-    ).dropna()
-
-    mom, yoy, d_per = compute_kpis(full, visible)
-    last_val = visible.iloc[-1] if not visible.empty else None
+    k = kpis.loc[name] if name in kpis.index else None
+    mom, yoy, d_per = (None, None, None) if k is None else (k["mom"], k["yoy"], k["d_per"])
+    last_val = None if k is None else float(k["ultimo"])
     kpi_quad(
         title=name,
         color=color,
@@ -40,5 +40,11 @@ card(
     page_path="pages/15_BCRA_Comparador_Libre.py",
     icon="🧪",
 )
+card(
+    title="6) Mayores variaciones",
+    body_md="Todas las series ordenadas por MoM, i.a. o Δ del período.",
+    page_path="pages/16_BCRA_Mayores_Variaciones.py",
+    icon="🏁",
+)
 
 st.markdown('</div>', unsafe_allow_html=True)
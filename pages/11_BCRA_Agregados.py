@@ -4,26 +4,27 @@ import plotly.graph_objects as go
 import pandas as pd
 import re
 
-from ui import inject_css, range_controls, kpi_triplet
+from ui import inject_css, pin_data, range_controls, kpi_triplet, freq_code, real_terms_toggle, is_real
 from bcra_utils import (
-    load_bcra_long,
-    resample_series,
-    compute_kpis,
+    get_wide,
+    load_series_stats,
+    kpi_table,
 )
 
 st.set_page_config(page_title="BCRA – Agregados", layout="wide")
 inject_css()
+pin_data()
 st.title("🟦 Agregados monetarios")
 
 # -----------------------------
 # Carga de datos (long format)
 # -----------------------------
-df = load_bcra_long()
-if df.empty:
+# resumen por serie: alcanza para pickers y rango; las series se cargan al graficar
+stats = load_series_stats()
+if stats.empty:
     st.error("No encontré datos del BCRA. Corré el fetch (GitHub Actions) primero.")
     st.stop()
 
-df["descripcion"] = df["descripcion"].fillna("").astype(str)
 
 # -----------------------------
 # Catálogo curado: solo agregados monetarios (niveles)
@@ -48,8 +49,8 @@ inc_re = re.compile("|".join(INCLUDE_PATTERNS), re.IGNORECASE)
 exc_re = re.compile("|".join(EXCLUDE_PATTERNS), re.IGNORECASE)
 
 candidatas = sorted(
-    s for s in df["descripcion"].unique()
-    if inc_re.search(s) and not exc_re.search(s)
+    s for s in stats.index
+    if inc_re.search(s) and not exc_re.search(s) and not is_real(s)
 )
 
 # Fallback sensato
@@ -62,10 +63,10 @@ if not candidatas:
         "Circulación monetaria",
         "M2 Transaccional del Sector Privado - miles de millones de $",
     ]
-    candidatas = [s for s in posibles if s in set(df["descripcion"].unique())]
+    candidatas = [s for s in posibles if s in stats.index]
     if not candidatas:
         st.warning("No pude identificar agregados por nombre. Muestro toda la lista disponible.")
-        candidatas = sorted(df["descripcion"].unique().tolist())
+        candidatas = list(stats.index)
 
 # -----------------------------
 # Multi-selección hasta 3
@@ -81,23 +82,16 @@ sel = st.multiselect(
 if not sel:
     st.info("Elegí al menos una serie para comenzar.")
     st.stop()
-
-wide_full = (
-    df[df["descripcion"].isin(sel)]
-    .pivot(index="fecha", columns="descripcion", values="valor")
-    .sort_index()
-)
+sel = real_terms_toggle(sel, stats.index, key="agregados_real")
 
 # ----------------------------------------
 # Controles de rango + frecuencia
 # ----------------------------------------
-dmin, dmax = wide_full.index.min(), wide_full.index.max()
+dmin, dmax = stats.loc[sel, "desde"].min(), stats.loc[sel, "hasta"].max()
 d_ini, d_fin, freq_label = range_controls(dmin, dmax, key="agregados")
-freq = "D" if freq_label.startswith("Diaria") else "M"
+freq, how = freq_code(freq_label)
 
-wide_vis = wide_full.loc[d_ini:d_fin]
-if freq == "M":
-    wide_vis = wide_vis.resample("M").last()
+wide_vis = get_wide(sel, d_ini, d_fin, freq=freq, how=how)
 wide_vis = wide_vis.dropna(how="all")
 if wide_vis.empty:
     st.warning("El rango/frecuencia seleccionados dejan las series sin datos.")
@@ -225,20 +219,12 @@ if legend_left or legend_right:
 # -----------------------------
 # KPIs por serie (tripleta)
 # -----------------------------
-def kpis_for(name: str, color: str):
-    serie_full = (
-        df[df["descripcion"] == name]
-        .set_index("fecha")["valor"]
-        .sort_index()
-        .astype(float)
-    )
-    serie_visible = resample_series(
-        wide_full[name].loc[d_ini:d_fin].dropna(),
-        freq=("D" if freq_label.startswith("Diaria") else "M"),
-        how="last",
-    ).dropna()
+# las series elegidas en una pasada (mismos números que compute_kpis)
+kpis = kpi_table(sel, d_ini, d_fin, freq=freq, how=how)
 
-    mom, yoy, d_per = compute_kpis(serie_full, serie_visible)
+def kpis_for(name: str, color: str):
+    k = kpis.loc[name] if name in kpis.index else None
+    mom, yoy, d_per = (None, None, None) if k is None else (k["mom"], k["yoy"], k["d_per"])
     kpi_triplet(
         title=name, color=color,
         mom=mom, yoy=yoy, d_per=d_per,
@@ -4,32 +4,39 @@ import plotly.graph_objects as go
 
 from ui import (
     inject_css,
+    pin_data,
     range_controls,
     kpi_quad,
     series_picker,
     clean_label,
     looks_percent,
+    freq_code,
+    real_terms_toggle,
+    is_real,
 )
 from bcra_utils import (
-    load_bcra_long,
+    get_wide,
+    load_series_stats,
     find_first,
-    resample_series,
-    compute_kpis,
+    kpi_table,
 )
 
 st.set_page_config(page_title="BCRA – Política monetaria y tasas", layout="wide")
 inject_css()
+pin_data()
 st.title("🟦 Política monetaria y tasas")
 
 # =========================
 # Datos
 # =========================
-df = load_bcra_long()
-if df.empty:
+# resumen por serie: alcanza para pickers y rango; las series se cargan al graficar
+stats = load_series_stats()
+if stats.empty:
     st.error("No encontré datos del BCRA. Corré el fetch (GitHub Actions) primero.")
     st.stop()
 
-vars_all = sorted(df["descripcion"].dropna().unique().tolist())
+# sólo nominales: la versión real de cada serie en pesos sale del toggle de abajo
+vars_all = [n for n in stats.index if not is_real(n)]
 
 # Sugerencias iniciales
 tpm    = find_first(vars_all, "tasa", "política") or find_first(vars_all, "tasa de política")
@@ -54,24 +61,16 @@ sel = series_picker(
 if not sel:
     st.info("Elegí al menos una serie para comenzar.")
     st.stop()
-
-# Wide completo
-wide_full = (
-    df[df["descripcion"].isin(sel)]
-    .pivot(index="fecha", columns="descripcion", values="valor")
-    .sort_index()
-)
+sel = real_terms_toggle(sel, stats.index, key="tasas_real")
 
 # =========================
 # Rango + frecuencia (última acción gana)
 # =========================
-dmin, dmax = wide_full.index.min(), wide_full.index.max()
+dmin, dmax = stats.loc[sel, "desde"].min(), stats.loc[sel, "hasta"].max()
 d_ini, d_fin, freq_label = range_controls(dmin, dmax, key="tasas")
-freq = "D" if freq_label.startswith("Diaria") else "M"
+freq, how = freq_code(freq_label)
 
-wide_vis = wide_full.loc[d_ini:d_fin]
-if freq == "M":
-    wide_vis = wide_vis.resample("M").last()
+wide_vis = get_wide(sel, d_ini, d_fin, freq=freq, how=how)
 wide_vis = wide_vis.dropna(how="all")
 if wide_vis.empty:
     st.warning("El rango/frecuencia seleccionados dejan las series sin datos.")
@@ -229,21 +228,13 @@ if legend_left or legend_right:
 # =========================
 # KPIs por serie (con “Último dato”)
 # =========================
-def kpis_for(name: str, color: str):
-    serie_full = (
-        df[df["descripcion"] == name]
-        .set_index("fecha")["valor"]
-        .sort_index()
-        .astype(float)
-    )
-    serie_visible = resample_series(
-        wide_full[name].loc[d_ini:d_fin].dropna(),
-        freq=("D" if freq_label.startswith("Diaria") else "M"),
-        how="last",
-    ).dropna()
+# las series elegidas en una pasada (mismos números que compute_kpis)
+kpis = kpi_table(sel, d_ini, d_fin, freq=freq, how=how)
 
-    mom, yoy, d_per = compute_kpis(serie_full, serie_visible)
-    last_val = float(serie_visible.iloc[-1]) if not serie_visible.empty else None
+def kpis_for(name: str, color: str):
+    k = kpis.loc[name] if name in kpis.index else None
+    mom, yoy, d_per = (None, None, None) if k is None else (k["mom"], k["yoy"], k["d_per"])
+    last_val = None if k is None else float(k["ultimo"])
     kpi_quad(
         title=clean_label(name),
         color=color,
@@ -4,27 +4,29 @@ import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
-from ui import inject_css, range_controls, kpi_triplet
+from ui import inject_css, pin_data, range_controls, kpi_triplet, freq_code, is_real
 from bcra_utils import (
-    load_bcra_long,
-    resample_series,
-    compute_kpis,
+    get_wide,
+    load_series_stats,
+    kpi_table,
 )
 
 st.set_page_config(page_title="BCRA – Pasivos remunerados", layout="wide")
 inject_css()
+pin_data()
 st.title("🟦 Pasivos remunerados y absorción")
 
 # -----------------------------
 # Carga y normalización
 # -----------------------------
-df = load_bcra_long()
-if df.empty:
+# resumen por serie: alcanza para pickers y rango; las series se cargan al graficar
+stats = load_series_stats()
+if stats.empty:
     st.error("No encontré datos del BCRA. Corré el fetch (GitHub Actions) primero.")
     st.stop()
 
-df["descripcion"] = df["descripcion"].fillna("").astype(str)
-descs = sorted(df["descripcion"].unique().tolist())
+# sólo nominales: las versiones en términos reales duplicarían los candidatos
+descs = [n for n in stats.index if not is_real(n)]
 descs_set = set(descs)
 
 # -----------------------------
@@ -95,23 +97,14 @@ if not sel:
     st.info("Elegí al menos una serie para comenzar.")
     st.stop()
 
-# Wide (completo) para lo seleccionado
-wfull = (
-    df[df["descripcion"].isin(sel)]
-    .pivot(index="fecha", columns="descripcion", values="valor")
-    .sort_index()
-)
-
 # -----------------------------
 # Rango + Frecuencia (última acción gana)
 # -----------------------------
-dmin, dmax = wfull.index.min(), wfull.index.max()
+dmin, dmax = stats.loc[sel, "desde"].min(), stats.loc[sel, "hasta"].max()
 d_ini, d_fin, freq_label = range_controls(dmin, dmax, key="pasivos")
-freq = "D" if freq_label.startswith("Diaria") else "M"
+freq, how = freq_code(freq_label)
 
-w = wfull.loc[d_ini:d_fin]
-if freq == "M":
-    w = w.resample("M").last()
+w = get_wide(sel, d_ini, d_fin, freq=freq, how=how)
 w = w.dropna(how="all")
 if w.empty:
     st.warning("El rango/frecuencia seleccionados dejan las series sin datos.")
@@ -250,20 +243,12 @@ if legend_left or legend_right:
 # -----------------------------
 # KPI tripletas por serie (como en las otras páginas)
 # -----------------------------
-def kpis_for(name: str, color: str):
-    serie_full = (
-        df[df["descripcion"] == name]
-        .set_index("fecha")["valor"]
-        .sort_index()
-        .astype(float)
-    )
-    serie_visible = resample_series(
-        wfull[name].loc[d_ini:d_fin].dropna(),
-        freq=("D" if freq_label.startswith("Diaria") else "M"),
-        how="last",
-    ).dropna()
+# las series elegidas en una pasada (mismos números que compute_kpis)
+kpis = kpi_table(sel, d_ini, d_fin, freq=freq, how=how)
 
-    mom, yoy, d_per = compute_kpis(serie_full, serie_visible)
+def kpis_for(name: str, color: str):
+    k = kpis.loc[name] if name in kpis.index else None
+    mom, yoy, d_per = (None, None, None) if k is None else (k["mom"], k["yoy"], k["d_per"])
     kpi_triplet(
         title=name, color=color,
         mom=mom, yoy=yoy, d_per=d_per,
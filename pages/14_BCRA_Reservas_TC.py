@@ -5,28 +5,30 @@ import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
-from ui import inject_css, range_controls
+from ui import inject_css, pin_data, range_controls, freq_code
 from bcra_utils import (
-    load_bcra_long,
+    get_wide,
+    load_series_stats,
     nice_ticks,
     aligned_right_ticks_round,
 )
 
 st.set_page_config(page_title="BCRA – Reservas y Tipo de Cambio", layout="wide")
 inject_css()
+pin_data()
 
 st.title("🟦 Reservas y tipo de cambio")
 
 # -----------------------------
 # Carga y normalización
 # -----------------------------
-df = load_bcra_long()
-if df.empty:
+# resumen por serie: alcanza para pickers y rango; las series se cargan al graficar
+stats = load_series_stats()
+if stats.empty:
     st.error("No encontré datos del BCRA. Corré el fetch primero.")
     st.stop()
 
-df["descripcion"] = df["descripcion"].fillna("").astype(str)
-descs = sorted(df["descripcion"].unique().tolist())
+descs = list(stats.index)
 
 # -----------------------------
 # Candidatos de series
@@ -64,27 +66,20 @@ with col_a:
 with col_b:
     tc_sel = st.selectbox("Serie de tipo de cambio", tc_cands, index=0)
 
-# Wide con ambas
-wide_all = (
-    df[df["descripcion"].isin([reservas_sel, tc_sel])]
-    .pivot(index="fecha", columns="descripcion", values="valor")
-    .sort_index()
-    .dropna(how="all")
-)
-if wide_all.empty:
+# Ambas series
+pair = list(dict.fromkeys([reservas_sel, tc_sel]))
+dmin, dmax = stats.loc[pair, "desde"].min(), stats.loc[pair, "hasta"].max()
+if pd.isna(dmin):
     st.warning("No hay datos para graficar.")
     st.stop()
 
 # -----------------------------
 # Controles de rango + gobierno + frecuencia (consistentes)
 # -----------------------------
-dmin, dmax = wide_all.index.min(), wide_all.index.max()
 d_ini, d_fin, freq_label = range_controls(dmin, dmax, key="reservas_tc")
 
-freq = "D" if freq_label.startswith("Diaria") else "M"
-w = wide_all.loc[d_ini:d_fin]
-if freq == "M":
-    w = w.resample("M").last()
+freq, how = freq_code(freq_label)
+w = get_wide(pair, d_ini, d_fin, freq=freq, how=how)
 w = w.dropna(how="all")
 if w.empty:
     st.warning("El rango/frecuencia seleccionados dejan las series sin datos.")
@@ -3,9 +3,10 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 
-from ui import inject_css, range_controls
+from ui import inject_css, pin_data, range_controls, freq_code, real_terms_toggle, is_real
 from bcra_utils import (
-    load_bcra_long,
+    get_wide,
+    load_series_stats,
     find_first,
     resample_series,
     nice_ticks,
@@ -14,17 +15,19 @@ from bcra_utils import (
 
 st.set_page_config(page_title="BCRA – Comparador libre", layout="wide")
 inject_css()
+pin_data()
 
 st.title("🧪 Comparador libre")
 st.caption("Elegí hasta dos series del BCRA y comparalas en distintos modos. "
            "Podés filtrar por rango rápido, gobierno y cambiar la frecuencia (diaria/mensual).")
 
-df = load_bcra_long()
-if df.empty:
+# resumen por serie: alcanza para pickers y rango; las series se cargan al graficar
+stats = load_series_stats()
+if stats.empty:
     st.error("No encontré datos del BCRA. Asegurate de correr el fetch en GitHub Actions.")
     st.stop()
 
-vars_all = sorted(df["descripcion"].dropna().unique().tolist())
+vars_all = [n for n in stats.index if not is_real(n)]
 base_default = find_first(vars_all, "base", "monetaria")
 reservas_default = find_first(vars_all, "reservas", "internacionales") or find_first(vars_all, "saldo", "reservas")
 
@@ -48,15 +51,13 @@ with col_sel[1]:
 if not selected:
     st.info("Elegí al menos una variable para comenzar.")
     st.stop()
+selected = real_terms_toggle(selected, stats.index, key="comparador_real")
 
-wfull = df[df["descripcion"].isin(selected)].pivot(index="fecha", columns="descripcion", values="valor").sort_index()
-dmin, dmax = wfull.index.min(), wfull.index.max()
+dmin, dmax = stats.loc[selected, "desde"].min(), stats.loc[selected, "hasta"].max()
 d_ini, d_fin, freq_label = range_controls(dmin, dmax, key="comparador")
 
-w = wfull.loc[d_ini:d_fin]
-freq = "D" if freq_label.startswith("Diaria") else "M"
-if freq == "M":
-    w = w.resample("M").last()
+freq, how = freq_code(freq_label)
+w = get_wide(selected, d_ini, d_fin, freq=freq, how=how)
 
 w = w.dropna(how="all")
 if w.empty:
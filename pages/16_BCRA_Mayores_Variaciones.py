@@ -0,0 +1,76 @@
+# pages/16_BCRA_Mayores_Variaciones.py
+import streamlit as st
+
+from ui import inject_css, pin_data, range_controls, freq_code, clean_label, looks_percent
+from bcra_utils import load_series_stats, kpi_table
+
+st.set_page_config(page_title="BCRA – Mayores variaciones", layout="wide")
+inject_css()
+pin_data()
+st.title("🟦 Mayores variaciones")
+st.caption("Todas las series del BCRA ordenadas por su variación en el rango elegido: "
+           "mensual, interanual o entre el primer y el último dato visible.")
+
+# -----------------------------
+# Rango sobre todo el catálogo
+# -----------------------------
+stats = load_series_stats()
+if stats.empty:
+    st.error("No encontré datos del BCRA. Corré el fetch primero.")
+    st.stop()
+
+dmin, dmax = stats["desde"].min(), stats["hasta"].max()
+d_ini, d_fin, freq_label = range_controls(dmin, dmax, key="movers")
+freq, how = freq_code(freq_label)
+
+METRICAS = {
+    "Δ en el período": "d_per",
+    "Interanual (YoY)": "yoy",
+    "Mensual (MoM)": "mom",
+}
+c1, c2, c3 = st.columns([1.4, 1, 1])
+with c1:
+    metrica = st.radio("Ordenar por", list(METRICAS), horizontal=True)
+with c2:
+    top_n = st.slider("Cuántas series", 5, 50, 15, step=5)
+with c3:
+    sin_pct = st.checkbox(
+        "Excluir tasas y porcentajes", value=True,
+        help="La variación % de una tasa no es comparable con la de un stock.",
+    )
+
+# -----------------------------
+# KPIs de todas las series (una pasada)
+# -----------------------------
+completo = d_ini <= dmin.date() and d_fin >= dmax.date() and freq == "D"
+# rango completo: la tabla que se escribe con el store; si no, se calcula (y queda cacheada)
+kpis = kpi_table() if completo else kpi_table(None, d_ini, d_fin, freq=freq, how=how)
+
+col = METRICAS[metrica]
+tabla = kpis.dropna(subset=[col])
+if sin_pct:
+    tabla = tabla[[not looks_percent(n) for n in tabla.index]]
+if tabla.empty:
+    st.warning("Ninguna serie tiene datos suficientes para esa métrica en el rango elegido.")
+    st.stop()
+
+def _vista(df):
+    out = df.assign(
+        serie=[clean_label(n) for n in df.index],
+        fecha=df["fecha"].dt.strftime("%Y-%m-%d"),
+    )
+    return out[["serie", "fecha", "ultimo", col]].rename(columns={
+        "serie": "Serie", "fecha": "Último dato", "ultimo": "Valor", col: metrica + " %",
+    }).reset_index(drop=True)
+
+fmt = {"Valor": "{:,.2f}", metrica + " %": "{:+,.2f}%"}
+left, right = st.columns(2)
+with left:
+    st.subheader("⬆️ Suben")
+    st.dataframe(_vista(tabla.nlargest(top_n, col)).style.format(fmt), use_container_width=True, hide_index=True)
+with right:
+    st.subheader("⬇️ Bajan")
+    st.dataframe(_vista(tabla.nsmallest(top_n, col)).style.format(fmt), use_container_width=True, hide_index=True)
+
+st.caption(f"{len(tabla)} series con dato para la métrica elegida. "
+           "MoM e interanual usan cierres de mes hasta el último dato visible de cada serie.")
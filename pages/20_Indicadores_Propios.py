@@ -6,23 +6,18 @@ import plotly.graph_objects as go
 import re
 import streamlit as st
 
-from ui import inject_css, range_controls
-from bcra_utils import load_bcra_long, resample_series
+from ui import inject_css, pin_data, range_controls, freq_code
+from bcra_utils import SeriesStore, disk_cache, load_bcra_store, resample_series, eval_formula, formula_ids, FormulaError
 
 st.set_page_config(page_title="📊 Indicadores Propios (en creación)", layout="wide")
 inject_css()
+pin_data()
 
 # =========================
 # Helpers
 # =========================
-def _to_series(df: pd.DataFrame, desc: str) -> pd.Series:
-    s = (
-        df[df["descripcion"] == desc]
-        .set_index("fecha")["valor"]
-        .sort_index()
-        .astype(float)
-    )
-    return s
+def _to_series(store: SeriesStore, desc: str) -> pd.Series:
+    return store.series(desc)
 
 def _fmt_value(x: float, unit: str = "ratio") -> str:
     if x is None or (isinstance(x, float) and (np.isnan(x) or np.isinf(x))):
@@ -33,34 +28,6 @@ def _fmt_value(x: float, unit: str = "ratio") -> str:
         return f"{x:,.2f}%"
     return f"{x:,.2f}"
 
-def _asof_op(s_left: pd.Series, s_right: pd.Series | float, op: str, tol_days: int = 3) -> pd.Series:
-    if isinstance(s_right, (int, float)):
-        if   op == "÷": return (s_left / float(s_right)).astype(float)
-        elif op == "×": return (s_left * float(s_right)).astype(float)
-        elif op == "+": return (s_left + float(s_right)).astype(float)
-        elif op == "−": return (s_left - float(s_right)).astype(float)
-        elif op == "^": return (s_left ** float(s_right)).astype(float)
-        return pd.Series(dtype=float)
-
-    s_left  = s_left.sort_index()
-    s_right = s_right.sort_index()
-    df_l = s_left.rename("l").to_frame().reset_index().rename(columns={"index": "fecha"})
-    df_r = s_right.rename("r").to_frame().reset_index().rename(columns={"index": "fecha"})
-    merged = pd.merge_asof(
-        df_l, df_r, on="fecha", direction="backward",
-        tolerance=pd.Timedelta(days=tol_days)
-    ).dropna()
-    if merged.empty:
-        return pd.Series(dtype=float)
-    merged = merged.set_index("fecha")
-    if   op == "÷": res = merged["l"] / merged["r"]
-    elif op == "×": res = merged["l"] * merged["r"]
-    elif op == "+": res = merged["l"] + merged["r"]
-    elif op == "−": res = merged["l"] - merged["r"]
-    elif op == "^": res = merged["l"] ** merged["r"]
-    else:           res = pd.Series(dtype=float)
-    return res.astype(float)
-
 def _mini_chart(title: str, y: pd.Series, y_label: str = "Valor"):
     if y.empty:
         st.info("No hay datos suficientes para graficar este indicador.")
@@ -75,12 +42,11 @@ def _mini_chart(title: str, y: pd.Series, y_label: str = "Valor"):
 # =========================
 # Carga
 # =========================
-df = load_bcra_long()
-if df.empty:
+store = load_bcra_store()
+if not len(store):
     st.error("No encontré datos del BCRA. Corré el fetch primero.")
     st.stop()
-df["descripcion"] = df["descripcion"].fillna("").astype(str)
-ALL = sorted(df["descripcion"].unique().tolist())
+ALL = list(store.names)
 
 # =========================
 # Alias robustos (regex)
@@ -122,22 +88,47 @@ DESC_PASES = find_desc([
     r"\bstock.*pases\s+pasivos\b",
 ]) or ""
 
-s_base   = _to_series(df, DESC_BASE)   if DESC_BASE   else pd.Series(dtype=float)
-s_resv   = _to_series(df, DESC_RESERVAS) if DESC_RESERVAS else pd.Series(dtype=float)
-s_m2t    = _to_series(df, DESC_M2T)    if DESC_M2T    else pd.Series(dtype=float)
-s_m2     = _to_series(df, DESC_M2)     if DESC_M2     else pd.Series(dtype=float)
-s_pases  = _to_series(df, DESC_PASES)  if DESC_PASES  else pd.Series(dtype=float)
+s_base   = _to_series(store, DESC_BASE)   if DESC_BASE   else pd.Series(dtype=float)
+s_resv   = _to_series(store, DESC_RESERVAS) if DESC_RESERVAS else pd.Series(dtype=float)
+s_m2t    = _to_series(store, DESC_M2T)    if DESC_M2T    else pd.Series(dtype=float)
+s_m2     = _to_series(store, DESC_M2)     if DESC_M2     else pd.Series(dtype=float)
+s_pases  = _to_series(store, DESC_PASES)  if DESC_PASES  else pd.Series(dtype=float)
 
 # =========================
 # Indicadores (series completas)
 # =========================
+# Una sola alineación as-of para todo: cada numerador manda con sus fechas (tol 0) y los
+# denominadores toman el último dato dentro de 3 días. `base` aparece en los dos roles.
+# Sobre el histórico completo y sin depender del rango: queda en el cache de disco por
+# versión de datos (un cálculo por fetch para todas las sesiones y workers).
+TOL = 3
+RATIOS = {
+    "fx_base": ("base", "resv", 1.0),
+    "fx_m2t": ("m2t", "resv", 1.0),
+    "pasivos_base": ("pases", "base_den", 100.0),
+    "mult_monet": ("m2", "base_den", 1.0),
+}
+
+@disk_cache("pages.indicadores_propios")
+def _indicadores(descs: tuple, data_dir: str = "data") -> dict[str, pd.Series]:
+    cols = ["base", "base_den", "resv", "m2t", "m2", "pases"]
+    days, m = load_bcra_store(data_dir).asof(list(descs), tol=[0, TOL, TOL, 0, 0, 0])
+    al = dict(zip(cols, m.T))
+    fechas = pd.DatetimeIndex(pd.to_datetime(days, unit="D"), name="fecha")
+    out = {}
+    with np.errstate(all="ignore"):
+        for key, (num, den, scale) in RATIOS.items():
+            out[key] = pd.Series(al[num] / al[den] * scale, index=fechas).replace([np.inf, -np.inf], np.nan).dropna()
+    return out
+
+ratios = _indicadores((DESC_BASE, DESC_BASE, DESC_RESERVAS, DESC_M2T, DESC_M2, DESC_PASES))
 ind = {}
 
 ind["fx_base"] = dict(
     title="FX Benchmark – Base Monetaria",
     tip=f"{DESC_BASE or 'Base monetaria'} / {DESC_RESERVAS or 'Reservas internacionales'}",
     unit="ars_per_usd",
-    serie=_asof_op(s_base, s_resv, "÷", tol_days=3),
+    serie=ratios["fx_base"],
     parts=(s_base, s_resv, "ARS/USD"),
 )
 
@@ -145,7 +136,7 @@ ind["fx_m2t"] = dict(
     title="FX Benchmark – M2 Transaccional",
     tip=f"{DESC_M2T or 'M2 transaccional (o M1)'} / {DESC_RESERVAS or 'Reservas internacionales'}",
     unit="ars_per_usd",
-    serie=_asof_op(s_m2t, s_resv, "÷", tol_days=3),
+    serie=ratios["fx_m2t"],
     parts=(s_m2t, s_resv, "ARS/USD"),
 )
 
@@ -153,7 +144,7 @@ ind["pasivos_base"] = dict(
     title="Pasivos remunerados / Base",
     tip=f"{DESC_PASES or 'Pases pasivos'} / {DESC_BASE or 'Base monetaria'}",
     unit="percent",
-    serie=_asof_op(s_pases, s_base, "÷", tol_days=3) * 100.0,
+    serie=ratios["pasivos_base"],
     parts=(s_pases, s_base, "%"),
 )
 
@@ -161,7 +152,7 @@ ind["mult_monet"] = dict(
     title="Multiplicador monetario",
     tip=f"{DESC_M2 or 'M2'} / {DESC_BASE or 'Base monetaria'}",
     unit="ratio",
-    serie=_asof_op(s_m2, s_base, "÷", tol_days=3),
+    serie=ratios["mult_monet"],
     parts=(s_m2, s_base, "ratio"),
 )
 
@@ -182,7 +173,7 @@ if all_idx.empty:
     st.stop()
 dmin, dmax = all_idx.min(), all_idx.max()
 d_ini, d_fin, freq_label = range_controls(dmin, dmax, key="ind_propios", show_government=True)
-freq = "D" if freq_label.startswith("Diaria") else "M"
+freq, how = freq_code(freq_label)
 
 # Escala log ocular
 col_log1, _ = st.columns([1,3])
@@ -192,7 +183,7 @@ with col_log1:
 # aplico rango + resample a cada serie del indicador
 for meta in ind.values():
     s = meta["serie"].loc[d_ini:d_fin].dropna()
-    meta["serie_vis"] = resample_series(s, freq=("D" if freq=="D" else "M"), how="last").dropna()
+    meta["serie_vis"] = resample_series(s, freq=freq, how=how).dropna()
 
 # =========================
 # Cards con último valor + botón de gráfico
@@ -260,43 +251,54 @@ if clicked_key:
     st.caption("Series base de la fórmula")
     cA, cB = st.columns(2)
     with cA:
-        _mini_chart("Numerador", resample_series(s_a.loc[d_ini:d_fin].dropna(), freq=("D" if freq=="D" else "M"), how="last"), "Nivel")
+        _mini_chart("Numerador", resample_series(s_a.loc[d_ini:d_fin].dropna(), freq=freq, how=how), "Nivel")
     with cB:
-        _mini_chart("Denominador", resample_series(s_b.loc[d_ini:d_fin].dropna(), freq=("D" if freq=="D" else "M"), how="last"), "Nivel")
+        _mini_chart("Denominador", resample_series(s_b.loc[d_ini:d_fin].dropna(), freq=freq, how=how), "Nivel")
 
 st.markdown("---")
 
 # =========================
-# Constructor de indicador propio (con ^)
+# Constructor de indicador propio (fórmulas)
 # =========================
 st.subheader("🔧 Crear indicador propio")
 
-colA, colB, colC = st.columns([3, 1, 3])
-with colA:
-    num_var = st.selectbox("Numerador", ALL, index=0 if ALL else 0, key="ip_num")
-with colB:
-    op = st.selectbox("Operación", ["÷", "×", "+", "−", "^"], key="ip_op")
-with colC:
-    den_mode = st.radio("Tipo de denominador", ["Serie", "Constante"], horizontal=True, key="ip_den_mode")
-
-if den_mode == "Serie":
-    den_var = st.selectbox("Denominador (serie)", ALL, index=0 if ALL else 0, key="ip_den_series")
-    den_value: float | pd.Series = _to_series(df, den_var) if den_var else pd.Series(dtype=float)
-else:
-    den_value = st.number_input("Denominador (constante)", value=1.0, step=0.1, key="ip_den_const")
+# alias legibles para las series que ya resolvimos arriba; el resto va por id (bcra_<id>)
+ALIASES = {k: v for k, v in {
+    "base_monetaria": DESC_BASE, "reservas": DESC_RESERVAS,
+    "m2t": DESC_M2T, "m2": DESC_M2, "pases": DESC_PASES,
+}.items() if v}
+IDS = formula_ids()
+
+formula = st.text_input(
+    "Fórmula",
+    value="(base_monetaria / reservas) * 100" if {"base_monetaria", "reservas"} <= set(ALIASES) else "",
+    key="ip_formula",
+    help="Operadores + − × ÷ ^ (o + - * / **), paréntesis y constantes. "
+         "Funciones: yoy(x), mom(x) (variación % interanual / mensual), log(x), abs(x). "
+         "Ej.: `yoy(m2) - yoy(base_monetaria)` o `bcra_15 / bcra_1`.",
+)
+with st.expander("Series disponibles (alias e ids)"):
+    st.dataframe(
+        pd.DataFrame(
+            [(k, v) for k, v in ALIASES.items()] + sorted(IDS.items(), key=lambda kv: kv[1]),
+            columns=["Nombre en la fórmula", "Serie"],
+        ),
+        use_container_width=True, hide_index=True,
+    )
 
 if st.button("Calcular indicador", type="primary"):
-    s_num = _to_series(df, num_var)
-    s_calc = _asof_op(s_num, den_value if isinstance(den_value, pd.Series) else float(den_value), op, tol_days=3)
-    s_calc = resample_series(s_calc.loc[d_ini:d_fin].dropna(), freq=("D" if freq=="D" else "M"), how="last")
+    try:
+        s_calc = eval_formula(formula, ALIASES, d_ini, d_fin)
+    except FormulaError as e:
+        st.error(str(e))
+        st.stop()
+    s_calc = resample_series(s_calc, freq=freq, how=how)
     if s_calc.empty:
         st.warning("No se pudo calcular el indicador con los datos disponibles.")
     else:
         st.success(f"Último valor: {_fmt_value(s_calc.iloc[-1])}")
         if log_scale:
             s_plot = s_calc.replace({0: np.nan}).dropna()
-            _mini_chart(f"{num_var} {op} {'(serie)' if isinstance(den_value, pd.Series) else den_value} [log]",
-                        s_plot, "Valor")
+            _mini_chart(f"{formula} [log]", s_plot, "Valor")
         else:
-            _mini_chart(f"{num_var} {op} {'(serie)' if isinstance(den_value, pd.Series) else den_value}",
-                        s_calc, "Valor")
+            _mini_chart(formula, s_calc, "Valor")
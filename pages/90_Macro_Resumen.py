@@ -5,7 +5,8 @@ import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
-from ui import inject_css, range_controls, kpi_quad
+from ui import inject_css, range_controls, kpi_quad, freq_code
+from bcra_utils import SeriesStore, shared_cache, read_kpi_state, kpis_from_state
 
 st.set_page_config(page_title="Resumen macro – núcleo", layout="wide")
 inject_css()
@@ -14,6 +15,7 @@ st.title("📈 Resumen macro – núcleo (BCRA + DatosAR)")
 BCRA_PARQ = Path("data/macro_core_long.parquet")
 BCRA_CSV  = Path("data/macro_core_long.csv")
 DAR_PARQ  = Path("data/datosar_core_long.parquet")
+DAR_STATE = DAR_PARQ.with_suffix(".kpistate.parquet")
 
 def _load_any(path: Path) -> pd.DataFrame:
     if not path.exists():
@@ -35,14 +37,31 @@ def _load_any(path: Path) -> pd.DataFrame:
         df["fuente"] = ""
     return df.dropna(subset=["fecha","indicador","valor"])
 
-@st.cache_data
-def load_all():
+def _load_all():
     bc = _load_any(BCRA_PARQ) if BCRA_PARQ.exists() else _load_any(BCRA_CSV)
     da = _load_any(DAR_PARQ)
     if bc.empty and da.empty:
         return pd.DataFrame()
     return pd.concat([bc, da], ignore_index=True).sort_values(["titulo","fecha"])
 
+def load_all():
+    # compartido entre sesiones (read-only); se invalida cuando cambian los archivos
+    return shared_cache("macro_resumen", [BCRA_PARQ, BCRA_CSV, DAR_PARQ], _load_all)
+
+def load_store():
+    # mismo contenido en forma compacta: ancho, re-muestreo y KPIs vectorizados
+    return shared_cache(
+        "macro_resumen_store", [BCRA_PARQ, BCRA_CSV, DAR_PARQ],
+        lambda: SeriesStore.from_long(load_all()[["fecha", "titulo", "valor"]].rename(columns={"titulo": "descripcion"})),
+    )
+
+def load_dar_kpis():
+    # KPIs de DatosAR sobre la serie completa, tal como los deja el fetch
+    def _load():
+        state, _ = read_kpi_state(DAR_STATE)
+        return None if state is None else kpis_from_state(state)
+    return shared_cache("macro_resumen_dar_kpis", [DAR_STATE, DAR_PARQ], _load)
+
 df = load_all()
 if df.empty:
     st.warning(
@@ -72,20 +91,15 @@ if not sel:
     st.info("Seleccioná al menos una serie.")
     st.stop()
 
-wide = (
-    df[df["titulo"].isin(sel)]
-    .pivot(index="fecha", columns="titulo", values="valor")
-    .sort_index()
-)
-if wide.empty:
+store = load_store()
+dmin, dmax = store.bounds(sel)
+if dmin is None:
     st.warning("No hay datos para las series seleccionadas.")
     st.stop()
 
-dmin, dmax = wide.index.min(), wide.index.max()
 d_ini, d_fin, freq_label = range_controls(dmin, dmax, key="macro_core", show_government=False)
-vis = wide.loc[d_ini:d_fin].dropna(how="all")
-if freq_label.startswith("Mensual"):
-    vis = vis.resample("M").last()
+freq, how = freq_code(freq_label)
+vis = store.wide(sel, d_ini, d_fin, freq=freq, how=how).dropna(how="all")
 
 # Chart
 fig = go.Figure()
@@ -105,17 +119,20 @@ fig.update_yaxes(title_text="Valor")
 st.plotly_chart(fig, use_container_width=True)
 
 # KPIs
-from bcra_utils import resample_series, compute_kpis
+completo = d_ini <= dmin.date() and d_fin >= dmax.date() and freq == "D"
+dar = load_dar_kpis() if completo else None
+if dar is not None:
+    # rango completo: lo de DatosAR sale del estado; el resto se calcula
+    hechas = [n for n in sel if n in dar.index]
+    resto = [n for n in sel if n not in dar.index]
+    kpis = pd.concat([dar.loc[hechas], store.kpis(resto, d_ini, d_fin, freq=freq, how=how)])
+else:
+    kpis = store.kpis(sel, d_ini, d_fin, freq=freq, how=how)
 palette_cycle = ["#60A5FA", "#F87171", "#34D399"]
 for idx, name in enumerate(vis.columns):
-    full = wide[name].dropna()
-    visible = resample_series(
-        vis[name].dropna(),
-        freq=("D" if freq_label.startswith("Diaria") else "M"),
-        how="last",
-    ).dropna()
-    mom, yoy, d_per = compute_kpis(full, visible)
-    last_val = visible.iloc[-1] if not visible.empty else None
+    k = kpis.loc[name] if name in kpis.index else None
+    mom, yoy, d_per = (None, None, None) if k is None else (k["mom"], k["yoy"], k["d_per"])
+    last_val = None if k is None else float(k["ultimo"])
     st.markdown(" ")
     kpi_quad(
         title=name,
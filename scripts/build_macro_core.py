@@ -1,12 +1,28 @@
 # scripts/build_macro_core.py
-# Lee data/monetarias_long.csv (y el catálogo) generado por scripts/fetch_bcra.py
-# y arma series “core” derivadas en data/macro_core_long.parquet / .csv
+# Lee del store (data/series_store.parquet, lo regenera scripts/fetch_bcra.py a partir de
+# data/monetarias_long.csv) sólo las series del BCRA que usan las fórmulas, con filtros
+# empujados al lector Parquet, y arma las series “core” derivadas declaradas en DERIVED,
+# en data/macro_core_long.parquet / .csv
+#
+# Cada derivada es una fórmula (ver bcra_utils.eval_formula) sobre ids estables del BCRA
+# (bcra_<idVariable>) u otras derivadas: se evalúan como DAG, por niveles y en paralelo.
+# Un nodo se recalcula sólo si cambió el contenido de alguna entrada desde el último build
+# (data/macro_core_long.dag.json) y, si las entradas sólo sumaron fechas, sólo desde ahí.
 
 from __future__ import annotations
-import json
+import hashlib, json, os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+from bcra_utils import (
+    FORMULA_TOL_DAYS, STATS_FILE, STORE_FILE, FormulaPlan, SeriesStore, atomic_path, build_store, formula_ids,
+    formula_inputs, load_series, refresh_kpi_state,
+)
+
 # ------------------------------
 # Entradas (de TU fetch_bcra.py)
 # ------------------------------
@@ -19,6 +35,34 @@ BCRA_CAT_JSON = DATA_DIR / "monetarias_catalogo.json"
 # ------------------------------
 OUT_PARQUET = DATA_DIR / "macro_core_long.parquet"
 OUT_CSV     = DATA_DIR / "macro_core_long.csv"
+DAG_STATE   = DATA_DIR / "macro_core_long.dag.json"
+
+# ------------------------------
+# Series derivadas
+# ------------------------------
+# id: nombre para usar en otras fórmulas; formula: sobre bcra_<idVariable> (catálogo de
+# Monetarias) u otros id de esta lista; serie: título que ven las páginas.
+DERIVED = [
+    {
+        "id": "reservas_usd",
+        "serie": "Reservas brutas del BCRA – millones de USD",
+        "formula": "bcra_1",
+        "unidades": "Millones de USD",
+        "nota": "Serie del API 'Reservas internacionales'; nivel en millones de USD.",
+    },
+    {
+        "id": "pasivos_usd",
+        "serie": "Pasivos remunerados del BCRA – millones de USD",
+        "formula": "bcra_42 / bcra_5",
+        "unidades": "Millones de USD",
+        "nota": "Pases pasivos en millones de ARS convertidos a USD con TC mayorista de referencia.",
+    },
+]
+FUENTE = "BCRA (Monetarias)"
+
+# Historia que se re-lee antes de la primera fecha nueva al recalcular sólo la cola:
+# cubre yoy (1 año) más la tolerancia as-of de una serie mensual.
+LOOKBACK_DAYS = 400
 
 # ------------------------------
 # Helpers
@@ -36,127 +80,197 @@ def _ensure_inputs():
             + "\nCorré primero: scripts/fetch_bcra.py (o el workflow de fetch del BCRA)."
         )
 
-def _load_bcra_long() -> pd.DataFrame:
-    df = pd.read_csv(BCRA_LONG_CSV, dtype={"id": str, "descripcion": str})
-    # normalizo tipos
-    df["fecha"] = pd.to_datetime(df["fecha"], errors="coerce", utc=True).dt.tz_localize(None)
-    df["valor"] = pd.to_numeric(df["valor"], errors="coerce")
-    df = df.dropna(subset=["fecha", "valor"]).sort_values(["descripcion", "fecha"])
-    return df
+def _ensure_store():
+    """
+    Los ids estables salen del sidecar de stats del store: si falta (sólo está el CSV) o
+    quedó más viejo que el CSV del BCRA, se re-arma el store antes de leer.
+    """
+    csv_mtime = BCRA_LONG_CSV.stat().st_mtime_ns
+    for f in (DATA_DIR / STORE_FILE, DATA_DIR / STATS_FILE):
+        if not f.exists() or f.stat().st_mtime_ns < csv_mtime:
+            print(f"· Store ausente o desactualizado; regenerando: {build_store(DATA_DIR)}")
+            return
+
+def _hash(days: np.ndarray, vals: np.ndarray) -> str:
+    h = hashlib.sha1(np.ascontiguousarray(days, dtype=np.int32).tobytes())
+    h.update(np.ascontiguousarray(vals, dtype=np.float64).tobytes())
+    return h.hexdigest()
 
-def _load_catalog() -> pd.DataFrame:
-    with open(BCRA_CAT_JSON, "r", encoding="utf-8") as f:
-        raw = json.load(f)
-    return pd.DataFrame(raw)
+def _signature(days: np.ndarray, vals: np.ndarray) -> dict:
+    return {"hash": _hash(days, vals), "n": int(len(days)), "last": int(days[-1]) if len(days) else None}
 
-def _find_desc(options: list[str], *tokens: str) -> str | None:
+def _spec_hash(node: dict) -> str:
+    return hashlib.sha1(json.dumps(node, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def _levels(deps: dict[str, list[str]]) -> list[list[str]]:
+    """Orden topológico por niveles (los nodos de un nivel no dependen entre sí)."""
+    pending = {k: {d for d in v if d in deps} for k, v in deps.items()}
+    levels = []
+    while pending:
+        ready = sorted(k for k, v in pending.items() if not v)
+        if not ready:
+            raise RuntimeError(f"Hay un ciclo entre las derivadas: {', '.join(sorted(pending))}")
+        levels.append(ready)
+        for k in ready:
+            del pending[k]
+        for v in pending.values():
+            v.difference_update(ready)
+    return levels
+
+def _read_state() -> dict:
+    try:
+        return json.loads(DAG_STATE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def _read_previous() -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Salida del último build por id de derivada (para conservar lo que no cambia)."""
+    if not OUT_PARQUET.exists():
+        return {}
+    df = pd.read_parquet(OUT_PARQUET)
+    if "id" not in df:
+        return {}
+    store = SeriesStore.from_long(df.rename(columns={"id": "descripcion"})[["fecha", "descripcion", "valor"]])
+    out = {}
+    for name in store.names:
+        lo, hi = store.span(name)
+        out[name] = (store.days[lo:hi], store.values[lo:hi].astype(float))
+    return out
+
+def _append_start(inputs: dict, before: dict) -> int | None:
     """
-    Devuelve la primera descripción cuyo string incluye TODOS los tokens (case-insensitive).
+    Primera fecha nueva si todas las entradas sólo sumaron filas al final desde el último
+    build; None si alguna cambió historia (o es nueva) y hay que recalcular todo.
     """
-    toks = [t.lower() for t in tokens if t]
-    for name in options:
-        s = (name or "").lower()
-        if all(tok in s for tok in toks):
-            return name
-    return None
+    firsts = []
+    for name, (days, vals) in inputs.items():
+        prev = before.get(name)
+        if prev is None or prev["last"] is None:
+            return None
+        k = int(np.searchsorted(days, prev["last"], side="right"))
+        if k != prev["n"] or _hash(days[:k], vals[:k]) != prev["hash"]:
+            return None
+        if k < len(days):
+            firsts.append(int(days[k]))
+    return min(firsts) if firsts else None
+
+def _evaluate(node: dict, inputs: dict, since: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    names = list(inputs)
+    parts = []
+    for name in names:
+        days, vals = inputs[name]
+        if since is not None:
+            k = int(np.searchsorted(days, since - LOOKBACK_DAYS, side="left"))
+            days, vals = days[k:], vals[k:]
+        parts.append((days, vals))
+    store = SeriesStore.from_parts(
+        names,
+        np.repeat(np.arange(len(names)), [len(d) for d, _ in parts]),
+        np.concatenate([d for d, _ in parts]),
+        np.concatenate([v for _, v in parts]),
+    )
+    days, vals = FormulaPlan(node["formula"], tuple((n, n) for n in names)).evaluate(store, FORMULA_TOL_DAYS)
+    if since is not None:
+        keep = days >= since
+        days, vals = days[keep], vals[keep]
+    return days, vals
+
+def _run_node(node: dict, inputs: dict, prev_out, prev_state: dict | None):
+    """(días, valores, estado, qué se hizo) de una derivada."""
+    state = {"spec": _spec_hash(node), "inputs": {n: _signature(d, v) for n, (d, v) in inputs.items()}}
+    if prev_out is not None and prev_state and prev_state.get("spec") == state["spec"]:
+        before = prev_state.get("inputs", {})
+        if all(before.get(n, {}).get("hash") == s["hash"] for n, s in state["inputs"].items()):
+            return prev_out[0], prev_out[1], state, "sin cambios"
+        since = _append_start(inputs, before)
+        if since is not None:
+            days, vals = _evaluate(node, inputs, since)
+            keep = prev_out[0] < since
+            return (
+                np.concatenate([prev_out[0][keep], days]), np.concatenate([prev_out[1][keep], vals]),
+                state, f"desde {pd.to_datetime(since, unit='D'):%Y-%m-%d}",
+            )
+    days, vals = _evaluate(node, inputs)
+    return days, vals, state, "completa"
 
 # ------------------------------
 # Core builder
 # ------------------------------
-def build_series() -> pd.DataFrame:
+def build_series() -> tuple[pd.DataFrame, dict[str, str], dict]:
+    """
+    Long de derivadas (fecha, id, serie, valor, unidades, fuente, nota), qué se hizo por
+    nodo y el estado a guardar (ver `_write_state`) una vez escritas las salidas.
+    """
     _ensure_inputs()
-    df = _load_bcra_long()
-    cat = _load_catalog()
-
-    # universo de descripciones disponibles
-    descs = sorted(df["descripcion"].dropna().unique().tolist())
-
-    # 1) Reservas internacionales brutas del BCRA (en millones de USD)
-    #    (hay varias descripciones; tratamos de agarrar la más estándar)
-    reservas_desc = (
-        _find_desc(descs, "reservas", "internacionales", "dólar")
-        or _find_desc(descs, "reservas", "internacionales", "usd")
-        or _find_desc(descs, "reservas", "brutas")
-        or _find_desc(descs, "reservas")
-    )
-
-    # 2) Pasivos remunerados del BCRA (Pases pasivos, en millones de $)
-    pases_desc = (
-        _find_desc(descs, "pases", "pasivos")
-        or _find_desc(descs, "stock", "pases", "pasivos")
-        or _find_desc(descs, "pases")  # fallback
-    )
+    _ensure_store()
+    nodes = {d["id"]: d for d in DERIVED}
+    deps = {k: formula_inputs(d["formula"]) for k, d in nodes.items()}
 
-    # 3) Tipo de cambio mayorista para convertir $ -> USD
-    tc_desc = (
-        _find_desc(descs, "tipo", "cambio", "comunicación", "3500")
-        or _find_desc(descs, "tipo", "cambio", "mayorista")
-        or _find_desc(descs, "tipo", "cambio", "referencia")
-        or _find_desc(descs, "ars/usd")
-        or _find_desc(descs, "usd", "oficial")
-    )
-
-    missing = []
-    if not reservas_desc: missing.append("Reservas internacionales (no encontré descripción)")
-    if not pases_desc:    missing.append("Pases pasivos / Pasivos remunerados (no encontré descripción)")
-    if not tc_desc:       missing.append("Tipo de cambio mayorista/ref. (no encontré descripción)")
+    # entradas del BCRA por id estable (sin NaN): sólo esas series salen del Parquet
+    ids = formula_ids(DATA_DIR)
+    base = sorted({n for v in deps.values() for n in v if n not in nodes})
+    found = load_series([ids[n] for n in base if n in ids], data_dir=DATA_DIR)
+    store = SeriesStore.from_long(found.dropna(subset=["valor"]))
+    missing = [n for n in base if n not in ids or ids[n] not in store.index]
     if missing:
-        raise RuntimeError("No pude identificar las siguientes series base:\n- " + "\n- ".join(missing))
+        raise RuntimeError("No encontré estas series base en el store:\n- " + "\n- ".join(missing))
+    series = {}
+    for n in base:
+        lo, hi = store.span(ids[n])
+        series[n] = (store.days[lo:hi], store.values[lo:hi].astype(float))
 
-    # Pivot base
-    wide = (
-        df[df["descripcion"].isin([reservas_desc, pases_desc, tc_desc])]
-        .pivot(index="fecha", columns="descripcion", values="valor")
-        .sort_index()
-    )
+    state, prev = _read_state(), _read_previous()
+    new_state, done = {}, {}
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+        for level in _levels(deps):
+            jobs = {
+                k: pool.submit(_run_node, nodes[k], {n: series[n] for n in deps[k]}, prev.get(k), state.get(k))
+                for k in level
+            }
+            for k, job in jobs.items():
+                days, vals, new_state[k], done[k] = job.result()
+                series[k] = (days, vals)
 
-    # renombres cortos
-    wide = wide.rename(columns={
-        reservas_desc: "reservas_usd_mill",
-        pases_desc:    "pases_mill_ars",
-        tc_desc:       "tc_ars_por_usd",
-    })
-
-    # Derivados
     out = []
-
-    # Reservas (ya en millones de USD, asumimos)
-    if "reservas_usd_mill" in wide:
-        s = wide["reservas_usd_mill"].dropna()
-        out.append(pd.DataFrame({
-            "fecha": s.index,
-            "serie": "Reservas brutas del BCRA – millones de USD",
-            "valor": s.values,
-            "fuente": "BCRA (Monetarias)",
-            "nota": "Serie del API 'Reservas internacionales'; nivel en millones de USD.",
-        }))
-
-    # Pasivos remunerados en millones de USD = pases (mill. ARS) / tipo de cambio (ARS/USD)
-    if {"pases_mill_ars", "tc_ars_por_usd"}.issubset(wide.columns):
-        s = (wide["pases_mill_ars"] / wide["tc_ars_por_usd"]).dropna()
+    for k, node in nodes.items():
+        days, vals = series[k]
         out.append(pd.DataFrame({
-            "fecha": s.index,
-            "serie": "Pasivos remunerados del BCRA – millones de USD",
-            "valor": s.values,
-            "fuente": "BCRA (Monetarias)",
-            "nota": "Pases pasivos en millones de ARS convertidos a USD con TC mayorista de referencia.",
+            "fecha": pd.to_datetime(days, unit="D"),
+            "id": k,
+            "serie": node["serie"],
+            "valor": vals,
+            "unidades": node.get("unidades", ""),
+            "fuente": node.get("fuente", FUENTE),
+            "nota": node.get("nota", ""),
         }))
-
-    if not out:
+    long = pd.concat(out, ignore_index=True).sort_values(["serie", "fecha"])
+    if long.empty:
         raise RuntimeError("No se pudo construir ninguna serie derivada (out vacío).")
+    return long, done, new_state
 
-    long = pd.concat(out, ignore_index=True).sort_values(["serie", "fecha"])
-    return long
+def _write_state(state: dict) -> None:
+    with atomic_path(DAG_STATE) as tmp:
+        tmp.write_text(json.dumps(state, indent=1), encoding="utf-8")
 
 def main():
     try:
         DATA_DIR.mkdir(parents=True, exist_ok=True)
-        long = build_series()
+        long, done, state = build_series()
+        for k, what in done.items():
+            print(f" · {k}: {what}")
+        if all(v == "sin cambios" for v in done.values()) and OUT_PARQUET.exists() and OUT_CSV.exists():
+            print("✅ Sin cambios en las derivadas; no se reescribe nada.")
+            return
         # Guardamos
         long.to_parquet(OUT_PARQUET, index=False)
         long.to_csv(OUT_CSV, index=False, encoding="utf-8")
         print(f"✅ Guardado: {OUT_PARQUET} ({len(long):,} filas)")
         print(f"✅ Guardado: {OUT_CSV} ({len(long):,} filas)")
+        # el estado va después de las salidas: si algo falla, el próximo build recalcula
+        _write_state(state)
+        # Re-armamos el store con las derivadas nuevas
+        print(f"✅ Guardado: {build_store(DATA_DIR)}")
+        refresh_kpi_state(DATA_DIR)
         # Resumen por serie
         resumen = long.groupby("serie")["valor"].last().to_frame("último").reset_index()
         print("\nSeries derivadas y último valor:")
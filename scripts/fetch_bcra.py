@@ -1,10 +1,14 @@
 # scripts/fetch_bcra.py
-import json, sys, time
+import json, os, sys, time
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
 from pathlib import Path
 from datetime import date
 import requests
 import pandas as pd
 
+from bcra_utils import build_store, refresh_kpi_state
+
 OUT_DIR = Path("data")
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -84,6 +88,29 @@ def fetch_series_v3(id_var, start="1990-01-01", end=None, page=1000, pause=0.15)
         time.sleep(pause)  # ser amable con el API
     return out
 
+def save_long_csv(df):
+    """
+    Si el histórico ya guardado no cambió (mismas filas, mismos valores), agrega al final
+    sólo las filas nuevas: build_store ingiere nada más esa cola. Si hubo revisiones, reescribe.
+    Devuelve la cantidad de filas escritas.
+    """
+    if ALL_CSV.exists():
+        try:
+            prev = pd.read_csv(ALL_CSV, dtype={"descripcion": str})
+            prev["fecha"] = pd.to_datetime(prev["fecha"], errors="coerce")
+            key = ["descripcion", "fecha"]
+            m = df.merge(prev[key + ["valor"]], on=key, how="left", suffixes=("", "_prev"), indicator=True)
+            viejas = m[m["_merge"] == "both"]
+            if len(viejas) == len(prev) and (viejas["valor"] == viejas["valor_prev"]).all():
+                nuevas = m.loc[m["_merge"] == "left_only", df.columns]
+                if not nuevas.empty:
+                    nuevas.to_csv(ALL_CSV, mode="a", header=False, index=False, encoding="utf-8")
+                return len(nuevas)
+        except Exception as e:
+            print(f"⚠️  No pude comparar con {ALL_CSV} ({e}); lo reescribo entero.")
+    df.to_csv(ALL_CSV, index=False, encoding="utf-8")
+    return len(df)
+
 def main():
     try:
         catalogo = load_catalog()
@@ -119,10 +146,17 @@ def main():
         df["valor"] = pd.to_numeric(df["valor"], errors="coerce")
         df = df.dropna().sort_values(["descripcion", "fecha"])
 
-        df.to_csv(ALL_CSV, index=False, encoding="utf-8")
+        escritas = save_long_csv(df[["id", "descripcion", "fecha", "valor"]])
 
         print(f"💾 Guardado catálogo: {CAT_JSON}")
-        print(f"💾 Guardado series (formato largo): {ALL_CSV} ({len(df)} filas)")
+        print(f"💾 Guardado series (formato largo): {ALL_CSV} ({len(df)} filas, {escritas} escritas)")
+
+        store = build_store(OUT_DIR)
+        print(f"💾 Guardado store: {store}")
+
+        # KPIs: sólo se tocan las series que recibieron datos en esta corrida
+        state = refresh_kpi_state(OUT_DIR)
+        print(f"💾 Estado de KPIs: {len(state)} series")
 
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -5,10 +5,12 @@ sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from pathlib import Path
 import pandas as pd
 from datosar_utils import fetch_ids_to_long, save_long
+from bcra_utils import SeriesStore, write_stats
 
 CATALOG_META_OUT = "data/datosar_catalog_meta.parquet"  # lo genera el script de catálogo
 ALLOWLIST_OUT    = "data/datosar_allowlist.txt"         # lo genera el script de catálogo
 LONG_OUT         = "data/datosar_long.parquet"
+STATS_OUT        = "data/datosar_long.stats.parquet"  # resumen por serie para la página
 
 def main():
     print("[DatosAR] Leyendo catálogo local + allowlist…")
@@ -24,8 +26,10 @@ def main():
     long_df["descripcion"] = long_df["descripcion"].map(id_to_name).fillna(long_df["descripcion"])
 
     save_long(long_df, LONG_OUT)
+    write_stats(SeriesStore.from_long(long_df), STATS_OUT, meta=cat.rename(columns={"name": "descripcion"}))
     print(f"[DatosAR] Hecho. Rows: {len(long_df):,}")
     print(f"         -> {LONG_OUT}")
+    print(f"         -> {STATS_OUT}")
 
 if __name__ == "__main__":
     main()
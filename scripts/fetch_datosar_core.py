@@ -1,10 +1,13 @@
 # scripts/fetch_datosar_core.py
 from __future__ import annotations
-import sys, time, io
+import sys, os, time, io
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from pathlib import Path
 import requests
 import pandas as pd
 
+from bcra_utils import refresh_kpi_state, refresh_long_kpi_state, refresh_real_terms
+
 OUT = Path("data/datosar_core_long.parquet")
 OUT.parent.mkdir(parents=True, exist_ok=True)
 
@@ -122,8 +125,20 @@ def main():
         if not frames:
             raise RuntimeError("ninguna serie descargada")
         long_df = pd.concat(frames, ignore_index=True).sort_values(["indicador","fecha"])
+        prev = pd.read_parquet(OUT) if OUT.exists() else None
         long_df.to_parquet(OUT, index=False)
         print(f"✅ Guardado {OUT} ({len(long_df):,} filas)")
+
+        # KPIs por título: sólo se recalculan las series con filas nuevas o revisadas
+        state = refresh_long_kpi_state(OUT, prev)
+        print(f"💾 Estado de KPIs: {len(state)} series")
+
+        # IPC nuevo => series del BCRA en términos reales (sólo si cambió algo)
+        out = refresh_real_terms(OUT.parent)
+        print(f"💾 Términos reales: {out or 'sin cambios'}")
+        if out:
+            # el estado de KPIs del store se commitea: lo avanzamos con el delta de esta versión
+            refresh_kpi_state(OUT.parent)
     except Exception as e:
         print(f"ERROR: {e}")
         sys.exit(1)
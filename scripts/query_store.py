@@ -0,0 +1,56 @@
+# scripts/query_store.py
+# SQL (DuckDB) sobre el store local de data/, sin pasar por notebooks.
+#   python scripts/query_store.py "SELECT descripcion, count(*) FROM series GROUP BY 1"
+#   python scripts/query_store.py --format csv -f consulta.sql > salida.csv
+#   python scripts/query_store.py --tables
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+from bcra_utils import QUERY_VIEWS, query
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Consulta SQL sobre data/ (DuckDB en proceso).")
+    ap.add_argument("sql", nargs="?", help="consulta SQL ('-' = leer de stdin)")
+    ap.add_argument("-f", "--file", help="leer la consulta de un archivo .sql")
+    ap.add_argument("--data-dir", default="data")
+    ap.add_argument("--format", choices=("table", "csv", "json"), default="table")
+    ap.add_argument("--tables", action="store_true", help="listar las vistas disponibles")
+    args = ap.parse_args()
+
+    if args.tables:
+        for view, name in QUERY_VIEWS.items():
+            estado = "ok" if (Path(args.data_dir) / name).exists() else "falta"
+            print(f"{view:<14} {name:<32} {estado}")
+        return
+
+    if args.file:
+        sql = Path(args.file).read_text(encoding="utf-8")
+    elif args.sql == "-":
+        sql = sys.stdin.read()
+    elif args.sql:
+        sql = args.sql
+    else:
+        ap.error("falta la consulta (argumento, -f o '-')")
+
+    try:
+        df = query(sql, data_dir=args.data_dir)
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.format == "csv":
+        df.to_csv(sys.stdout, index=False)
+    elif args.format == "json":
+        print(df.to_json(orient="records", date_format="iso", force_ascii=False))
+    else:
+        with pd.option_context("display.max_rows", 200, "display.max_columns", None, "display.width", 200):
+            print(df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
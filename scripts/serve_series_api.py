@@ -0,0 +1,266 @@
+# scripts/serve_series_api.py
+# API HTTP mínima (stdlib) sobre la capa de datos de bcra_utils, para herramientas
+# que necesitan las mismas series que el dashboard sin pasar por Streamlit.
+#
+#   python scripts/serve_series_api.py --port 8765
+#   GET /catalog                                   -> resumen por serie (stats)
+#   GET /series?names=A&names=B&start=2024-01-01&end=&freq=M[&how=mean][&format=arrow]
+#   GET /kpis?names=A&names=B[&start=&end=&freq=&how=]  -> último dato, MoM, YoY, Δperíodo
+#
+# `names` se repite (las descripciones del BCRA tienen comas). Respuestas JSON o Arrow
+# IPC stream (`format=arrow` o `Accept: application/vnd.apache.arrow.stream`), con ETag
+# por versión de datos + URL y un LRU en proceso con la misma clave.
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+from bcra_utils import (
+    HOWS,
+    data_version,
+    get_series as store_series,
+    kpi_table,
+    load_bcra_store,
+    load_series_stats,
+    normalize_freq,
+)
+
+DATA_DIR = Path("data")
+CACHE_SIZE = 512
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, msg: str):
+        super().__init__(msg)
+        self.status = status
+
+
+# -----------------------------
+# Cache LRU (clave: versión de datos + consulta)
+# -----------------------------
+_CACHE: "OrderedDict[tuple, tuple[str, bytes]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _cache_get(key):
+    with _CACHE_LOCK:
+        hit = _CACHE.get(key)
+        if hit is not None:
+            _CACHE.move_to_end(key)
+        return hit
+
+
+def _cache_put(key, value):
+    with _CACHE_LOCK:
+        _CACHE[key] = value
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > CACHE_SIZE:
+            _CACHE.popitem(last=False)
+
+
+# -----------------------------
+# Endpoints
+# -----------------------------
+def _names(q: dict) -> list[str]:
+    names = [n for n in q.get("names", []) if n]
+    if not names:
+        raise ApiError(400, "falta el parámetro names (repetible)")
+    return list(dict.fromkeys(names))
+
+
+def _one(q: dict, key: str):
+    v = q.get(key, [None])[-1]
+    return v or None
+
+
+def _freq(q: dict):
+    # misma normalización que la librería (Y => A, ME/QE/YE de pandas => M/Q/A)
+    f = _one(q, "freq")
+    if f is None:
+        return None
+    try:
+        return normalize_freq(f)
+    except ValueError as e:
+        raise ApiError(400, str(e))
+
+
+def _date(q: dict, key: str):
+    v = _one(q, key)
+    if v is None:
+        return None
+    try:
+        ts = pd.Timestamp(v)
+    except (ValueError, TypeError):
+        ts = pd.NaT
+    if pd.isna(ts):
+        raise ApiError(400, f"{key} no es una fecha válida (AAAA-MM-DD): {v!r}")
+    return ts
+
+
+def _how(q: dict) -> str:
+    h = _one(q, "how") or "last"
+    if h not in HOWS and h != "auto":
+        raise ApiError(400, f"how debe ser una de {'/'.join(HOWS)} o auto")
+    return h
+
+
+def _slice(data_dir, name, start, end, freq, how="last") -> pd.Series:
+    # W/M/Q/A salen de las vistas materializadas del store
+    return store_series(name, start, end, freq or "D", how, data_dir)
+
+
+def _num(x):
+    return None if x is None or (isinstance(x, float) and math.isnan(x)) else float(x)
+
+
+def get_catalog(q: dict, data_dir: Path):
+    stats = load_series_stats(data_dir).reset_index()
+    for c in ("desde", "hasta"):
+        stats[c] = stats[c].dt.strftime("%Y-%m-%d")
+    stats = stats.astype(object).where(stats.notna(), None)
+    return {"series": stats.to_dict(orient="records")}
+
+
+def get_series(q: dict, data_dir: Path):
+    names, freq, how = _names(q), _freq(q), _how(q)
+    start, end = _date(q, "start"), _date(q, "end")
+    store = load_bcra_store(data_dir)
+    missing = [n for n in names if n not in store.index]
+    if missing:
+        raise ApiError(404, f"series desconocidas: {missing}")
+    return {n: _slice(data_dir, n, start, end, freq, how) for n in names}
+
+
+def get_kpis(q: dict, data_dir: Path):
+    # una pasada vectorizada (y sin rango, el estado incremental): mismos números que las páginas
+    names, freq, how = _names(q), _freq(q) or "D", _how(q)
+    start, end = _date(q, "start"), _date(q, "end")
+    store = load_bcra_store(data_dir)
+    missing = [n for n in names if n not in store.index]
+    if missing:
+        raise ApiError(404, f"series desconocidas: {missing}")
+    table = kpi_table(names, start, end, freq, how, data_dir)
+    out = {}
+    for n in names:
+        k = table.loc[n] if n in table.index else None
+        out[n] = {
+            "ultimo": _num(k["ultimo"]) if k is not None else None,
+            "fecha": k["fecha"].strftime("%Y-%m-%d") if k is not None and pd.notna(k["fecha"]) else None,
+            "mom": _num(k["mom"]) if k is not None else None,
+            "yoy": _num(k["yoy"]) if k is not None else None,
+            "d_per": _num(k["d_per"]) if k is not None else None,
+        }
+    return {"kpis": out}
+
+
+ROUTES = {"/catalog": get_catalog, "/series": get_series, "/kpis": get_kpis}
+
+
+def _encode(route: str, result, arrow: bool) -> tuple[str, bytes]:
+    if route == "/series":
+        if arrow:
+            import pyarrow as pa
+            long = pd.concat(
+                [pd.DataFrame({"fecha": s.index, "descripcion": n, "valor": s.to_numpy()}) for n, s in result.items()],
+                ignore_index=True,
+            )
+            table = pa.Table.from_pandas(long, preserve_index=False)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as w:
+                w.write_table(table)
+            return ARROW_MIME, sink.getvalue().to_pybytes()
+        result = {"series": {
+            n: {"fecha": s.index.strftime("%Y-%m-%d").tolist(), "valor": [_num(v) for v in s.to_numpy()]}
+            for n, s in result.items()
+        }}
+    body = json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+    return "application/json; charset=utf-8", body.encode("utf-8")
+
+
+# -----------------------------
+# Servidor
+# -----------------------------
+class Handler(BaseHTTPRequestHandler):
+    data_dir = DATA_DIR
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        route = url.path.rstrip("/") or "/"
+        if route == "/":
+            return self._send(200, "application/json", json.dumps({"endpoints": sorted(ROUTES)}).encode())
+        handler = ROUTES.get(route)
+        if handler is None:
+            return self._error(404, f"no existe {route}")
+
+        q = parse_qs(url.query)
+        arrow = _one(q, "format") == "arrow" or ARROW_MIME in (self.headers.get("Accept") or "")
+        version = data_version(self.data_dir)
+        key = (version, route, tuple(sorted((k, tuple(v)) for k, v in q.items())), arrow)
+        etag = '"' + hashlib.sha1(repr(key).encode()).hexdigest()[:20] + '"'
+        if etag in (self.headers.get("If-None-Match") or ""):
+            return self._send(304, None, b"", etag)
+
+        hit = _cache_get(key)
+        if hit is None:
+            try:
+                hit = _encode(route, handler(q, self.data_dir), arrow)
+            except ApiError as e:
+                return self._error(e.status, str(e))
+            except Exception as e:
+                return self._error(500, f"{type(e).__name__}: {e}")
+            _cache_put(key, hit)
+        ctype, body = hit
+        self._send(200, ctype, body, etag)
+
+    def _error(self, status: int, msg: str):
+        self._send(status, "application/json; charset=utf-8", json.dumps({"error": msg}, ensure_ascii=False).encode("utf-8"))
+
+    def _send(self, status: int, ctype, body: bytes, etag: str = None):
+        self.send_response(status)
+        if ctype:
+            self.send_header("Content-Type", ctype)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        if os.environ.get("API_LOG"):
+            super().log_message(fmt, *args)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="API HTTP de series (catálogo, series, KPIs).")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--data-dir", default=str(DATA_DIR))
+    args = ap.parse_args()
+
+    Handler.data_dir = Path(args.data_dir)
+    # precarga: el primer request no paga la apertura del store
+    load_bcra_store(Handler.data_dir)
+    srv = ThreadingHTTPServer((args.host, args.port), Handler)
+    srv.daemon_threads = True
+    print(f"[API] Sirviendo {Handler.data_dir} en http://{args.host}:{args.port}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
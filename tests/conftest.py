@@ -0,0 +1,55 @@
+# tests/conftest.py
+# Los tests importan los módulos de la raíz como los scripts (ver scripts/*.py).
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bcra_utils as bu
+
+
+def make_store(series: dict) -> "bu.SeriesStore":
+    """{nombre: pd.Series con index de fechas} -> SeriesStore."""
+    frames = [
+        pd.DataFrame({"fecha": pd.DatetimeIndex(s.index), "descripcion": name, "valor": s.to_numpy(dtype=float)})
+        for name, s in series.items()
+    ]
+    return bu.SeriesStore.from_long(pd.concat(frames, ignore_index=True))
+
+
+def assert_same_store(a: "bu.SeriesStore", b: "bu.SeriesStore") -> None:
+    assert list(a.names) == list(b.names)
+    np.testing.assert_array_equal(a.offsets, b.offsets)
+    np.testing.assert_array_equal(a.days, b.days)
+    np.testing.assert_allclose(a.values.astype(float), b.values.astype(float), rtol=1e-12)
+
+
+def monetarias(rows) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["id", "descripcion", "fecha", "valor"])
+
+
+def daily_rows(id_, name, start, periods, seed):
+    """Filas (id, descripcion, fecha, valor) diarias como las de monetarias_long.csv."""
+    fechas = pd.date_range(start, periods=periods, freq="D").strftime("%Y-%m-%d")
+    vals = np.round(np.random.default_rng(seed).normal(100, 5, periods), 4)
+    return [(id_, name, f, v) for f, v in zip(fechas, vals)]
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """data/ chico: dos series del BCRA y un CSV suelto, con el store ya armado."""
+    monetarias(
+        daily_rows(1, "Reservas (en millones de USD)", "2024-01-01", 90, 1)
+        + daily_rows(5, "Tipo de cambio mayorista, en pesos por dólar", "2024-01-01", 90, 2)
+    ).to_csv(tmp_path / "monetarias_long.csv", index=False)
+    pd.DataFrame({"fecha": pd.date_range("2024-01-01", periods=60, freq="D").strftime("%Y-%m-%d"),
+                  "valor": np.arange(60, dtype=float)}).to_csv(tmp_path / "tasa_demo.csv", index=False)
+    bu.build_store(tmp_path, incremental=False)
+    return tmp_path
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
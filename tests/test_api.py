@@ -0,0 +1,96 @@
+# tests/test_api.py
+# API HTTP (scripts/serve_series_api.py): respuestas, errores y ETag / 304 por versión de datos.
+import importlib.util
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import bcra_utils as bu
+from conftest import daily_rows, monetarias
+
+NAME = "Reservas (en millones de USD)"
+
+_spec = importlib.util.spec_from_file_location(
+    "serve_series_api", Path(__file__).resolve().parents[1] / "scripts" / "serve_series_api.py"
+)
+api = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(api)
+
+
+@pytest.fixture
+def server(data_dir, monkeypatch):
+    monkeypatch.setattr(bu, "_DISK_ENABLED", False)
+    monkeypatch.setattr(api.Handler, "data_dir", data_dir)
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), api.Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def _get(url, **headers):
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req) as r:
+            return r.status, dict(r.headers), r.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+def test_series_json_matches_store(server, data_dir):
+    status, _, body = _get(f"{server}/series?names={NAME}&start=2024-02-01&freq=W".replace(" ", "%20"))
+    assert status == 200
+    got = json.loads(body)["series"][NAME]
+    exp = bu.load_bcra_store(data_dir).resample("W", "last", [NAME], "2024-02-01").series(NAME)
+    assert got["fecha"] == exp.index.strftime("%Y-%m-%d").tolist()
+    np.testing.assert_allclose(got["valor"], exp.to_numpy())
+
+
+def test_series_arrow(server):
+    import pyarrow as pa
+    status, headers, body = _get(f"{server}/series?names={NAME}&format=arrow".replace(" ", "%20"))
+    assert status == 200 and headers["Content-Type"] == api.ARROW_MIME
+    table = pa.ipc.open_stream(body).read_all()
+    assert table.column_names == ["fecha", "descripcion", "valor"] and table.num_rows == 90
+
+
+def test_etag_304_until_data_changes(server, data_dir):
+    url = f"{server}/kpis?names={NAME}".replace(" ", "%20")
+    status, headers, body = _get(url)
+    assert status == 200 and body
+    etag = headers["ETag"]
+    status, _, body = _get(url, **{"If-None-Match": etag})
+    assert status == 304 and body == b""
+
+    monetarias(daily_rows(1, NAME, "2024-03-31", 5, 3)).to_csv(
+        data_dir / "monetarias_long.csv", mode="a", header=False, index=False
+    )
+    bu.build_store(data_dir)
+    status, headers, body = _get(url, **{"If-None-Match": etag})
+    assert status == 200 and headers["ETag"] != etag
+    assert json.loads(body)["kpis"][NAME]["fecha"] == "2024-04-04"
+
+
+@pytest.mark.parametrize("query, status", [
+    ("/series?names=no%20existe", 404),
+    ("/series", 400),
+    (f"/series?names={NAME}&freq=X", 400),
+    (f"/series?names={NAME}&how=median", 400),
+    (f"/series?names={NAME}&start=ayer", 400),
+    ("/nada", 404),
+])
+def test_errors(server, query, status):
+    code, _, body = _get(server + query.replace(" ", "%20"))
+    assert code == status and "error" in json.loads(body)
+
+
+def test_freq_aliases():
+    assert [bu.normalize_freq(f) for f in (None, "d", "W-SUN", "ME", "QE", "YE", "A")] == ["D", "D", "W", "M", "Q", "A", "A"]
+    with pytest.raises(ValueError):
+        bu.normalize_freq("X")
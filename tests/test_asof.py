@@ -0,0 +1,48 @@
+# tests/test_asof.py
+# asof_align (N series en una pasada) contra N merge_asof de pandas.
+import numpy as np
+import pandas as pd
+import pytest
+
+import bcra_utils as bu
+
+
+def _parts(rng):
+    out = []
+    for size in (200, 60, 12):
+        days = np.sort(rng.choice(np.arange(19000, 19400), size, replace=False)).astype(np.int32)
+        out.append((days, rng.normal(100, 10, size)))
+    return out
+
+
+def _expected(parts, cal, tols, dirs):
+    grid = pd.DataFrame({"d": np.asarray(cal, dtype=np.int64)})
+    for i, ((days, vals), tol, direction) in enumerate(zip(parts, tols, dirs)):
+        right = pd.DataFrame({"d": days.astype(np.int64), i: vals})
+        grid = pd.merge_asof(grid, right, on="d", direction=direction, tolerance=tol)
+    return grid[list(range(len(parts)))].to_numpy(dtype=float)
+
+
+@pytest.mark.parametrize("direction", bu.ASOF_DIRECTIONS)
+@pytest.mark.parametrize("tol", [None, 0, 5])
+def test_matches_merge_asof_on_union(rng, direction, tol):
+    parts = _parts(rng)
+    cal, out = bu.asof_align(parts, tol=tol, direction=direction)
+    exp_cal = np.unique(np.concatenate([d for d, _ in parts]))
+    np.testing.assert_array_equal(cal, exp_cal)
+    np.testing.assert_allclose(out, _expected(parts, cal, [tol] * 3, [direction] * 3), rtol=1e-12)
+
+
+def test_per_series_tol_and_direction_on_one_calendar(rng):
+    parts = _parts(rng)
+    tols, dirs = [None, 3, 40], ["backward", "nearest", "forward"]
+    cal, out = bu.asof_align(parts, on=1, tol=tols, direction=dirs)
+    np.testing.assert_array_equal(cal, parts[1][0])
+    np.testing.assert_allclose(out, _expected(parts, cal, tols, dirs), rtol=1e-12)
+
+
+def test_empty_and_bad_direction():
+    cal, out = bu.asof_align([(np.array([], dtype=np.int32), np.array([]))])
+    assert len(cal) == 0 and out.shape == (0, 1)
+    with pytest.raises(ValueError):
+        bu.asof_align([(np.array([1]), np.array([1.0]))], direction="sideways")
@@ -0,0 +1,63 @@
+# tests/test_disk_cache.py
+# Cache de disco (SQLite en data/.cache): clave por argumentos + versión, LRU por tamaño.
+import time
+
+import numpy as np
+import pytest
+
+import bcra_utils as bu
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    monkeypatch.setattr(bu, "_DISK_ENABLED", True)
+    return []
+
+
+def _cached(calls, max_bytes=None):
+    @bu.disk_cache("test.blob", max_bytes=max_bytes)
+    def blob(k: int, data_dir) -> np.ndarray:
+        calls.append(k)
+        return np.full(1000, k, dtype=np.float64)   # ~8 KB pickleado
+    return blob
+
+
+def test_hit_miss_and_version(calls, data_dir):
+    blob = _cached(calls)
+    assert blob(1, data_dir)[0] == 1 and blob(1, data_dir)[0] == 1
+    assert calls == [1]
+    stats = bu.disk_cache_stats(data_dir).set_index("fn").loc["test.blob"]
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    # otra versión de datos => otra clave
+    with open(data_dir / "tasa_demo.csv", "a", encoding="utf-8") as f:
+        f.write("2024-03-01,60.5\n")
+    blob(1, data_dir)
+    assert calls == [1, 1]
+
+
+def test_lru_eviction_by_size(calls, data_dir):
+    blob = _cached(calls, max_bytes=40_000)                # entran ~4 resultados
+    for k in range(4):
+        blob(k, data_dir)
+        time.sleep(0.01)
+    blob(0, data_dir)                                       # 0 pasa a ser el más usado
+    time.sleep(0.01)
+    for k in range(4, 8):
+        blob(k, data_dir)
+        time.sleep(0.01)
+
+    stats = bu.disk_cache_stats(data_dir).set_index("fn").loc["test.blob"]
+    assert stats["bytes"] <= 40_000
+    del calls[:]
+    blob(7, data_dir)
+    assert calls == []                                      # lo último sigue
+    blob(1, data_dir)
+    assert calls == [1]                                     # lo menos usado se fue
+
+
+def test_broken_cache_still_computes(calls, data_dir, monkeypatch):
+    def boom(*a):
+        raise OSError("disco lleno")
+    monkeypatch.setattr(bu, "_disk_db", boom)
+    assert _cached(calls)(3, data_dir)[0] == 3 and calls == [3]
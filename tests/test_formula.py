@@ -0,0 +1,78 @@
+# tests/test_formula.py
+# Motor de fórmulas: sólo aritmética + funciones de la lista blanca, y evaluación as-of.
+import numpy as np
+import pandas as pd
+import pytest
+
+import bcra_utils as bu
+from conftest import make_store
+
+
+@pytest.mark.parametrize("expr, names", [
+    ("a + b", ["a", "b"]),
+    ("(bcra_42 / bcra_5) * 100", ["bcra_42", "bcra_5"]),
+    ("yoy(m2) - yoy(ipc)", ["m2", "ipc"]),
+    ("log(abs(a)) ^ 2 − -b", ["a", "b"]),
+    ("a ÷ b × 3", ["a", "b"]),
+    ("a / a + 1e3", ["a"]),
+])
+def test_accepts_whitelist(expr, names):
+    assert bu.formula_inputs(expr) == names
+
+
+@pytest.mark.parametrize("expr", [
+    "__import__('os').system('true')",
+    "a.__class__",
+    "a.real",
+    "a[0]",
+    "lambda: a",
+    "[a, b]",
+    "{a: b}",
+    "(x for x in a)",
+    "a if b else c",
+    "a < b",
+    "a and b",
+    "'texto'",
+    "True + a",
+    "f'{a}'",
+    "open('/etc/passwd')",
+    "eval('1')",
+    "(a := 1)",
+    "a @ b",
+    "a; b",
+    "",
+])
+def test_rejects_unsafe_ast(expr):
+    with pytest.raises(bu.FormulaError):
+        bu.parse_formula(expr)
+
+
+def test_unknown_function_and_arity():
+    with pytest.raises(bu.FormulaError, match="función desconocida"):
+        bu.parse_formula("foo(a)")
+    with pytest.raises(bu.FormulaError, match="`yoy` lleva un solo argumento"):
+        bu.parse_formula("yoy(a, b)")
+    with pytest.raises(bu.FormulaError, match="`log` lleva un solo argumento"):
+        bu.parse_formula("log(x=a)")
+
+
+def test_evaluate_matches_merge_asof(rng):
+    tol = bu.FORMULA_TOL_DAYS
+    a_idx = pd.date_range("2023-01-02", "2023-12-29", freq="B")
+    b_idx = pd.DatetimeIndex(sorted(rng.choice(a_idx, 150, replace=False)))
+    a = pd.Series(rng.uniform(1, 2, len(a_idx)), index=a_idx)
+    b = pd.Series(rng.uniform(1, 2, len(b_idx)), index=b_idx)
+    store = make_store({"serie a": a, "serie b": b})
+
+    days, vals = bu.FormulaPlan("a / b - 1", (("a", "serie a"), ("b", "serie b"))).evaluate(store, tol)
+
+    grid = pd.DataFrame({"fecha": a_idx.union(b_idx)})
+    for col, s in (("a", a), ("b", b)):
+        step = int(np.median(np.diff(s.index.to_numpy()).astype("timedelta64[D]").astype(int))) + 1
+        grid = pd.merge_asof(
+            grid, s.rename(col).rename_axis("fecha").reset_index(), on="fecha",
+            direction="backward", tolerance=pd.Timedelta(days=max(tol, step)),
+        )
+    exp = (grid["a"] / grid["b"] - 1).set_axis(grid["fecha"]).dropna()
+    np.testing.assert_array_equal(bu._from_days(days), exp.index.to_numpy())
+    np.testing.assert_allclose(vals, exp.to_numpy(), rtol=1e-12)
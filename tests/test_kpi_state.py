@@ -0,0 +1,76 @@
+# tests/test_kpi_state.py
+# update_kpi_state (sólo el delta) tiene que dar lo mismo que kpi_state desde cero.
+import numpy as np
+import pandas as pd
+import pytest
+
+import bcra_utils as bu
+from conftest import make_store
+
+
+def _daily(start, end, seed):
+    idx = pd.date_range(start, end, freq="B")
+    return pd.Series(100 + np.random.default_rng(seed).normal(0, 1, len(idx)).cumsum(), index=idx)
+
+
+def _monthly(start, end, seed):
+    idx = pd.date_range(start, end, freq="ME")
+    return pd.Series(np.random.default_rng(seed).uniform(1, 5, len(idx)), index=idx)
+
+
+BASE = {
+    "diaria": _daily("2021-06-01", "2024-03-14", 1),
+    "otra diaria": _daily("2022-01-01", "2024-03-14", 2),
+    "mensual": _monthly("2020-01-01", "2024-02-29", 3),
+}
+
+
+def _extend(s, end, seed):
+    more = _daily(s.index[-1] + pd.Timedelta(days=1), end, seed)
+    return pd.concat([s, more])
+
+
+CASES = {
+    "mismo mes": {**BASE, "diaria": _extend(BASE["diaria"], "2024-03-28", 4)},
+    "cruza meses": {**BASE, "diaria": _extend(BASE["diaria"], "2024-06-10", 5),
+                    "mensual": pd.concat([BASE["mensual"], _monthly("2024-03-01", "2024-05-31", 6)])},
+    "revision": {**BASE, "otra diaria": BASE["otra diaria"].where(BASE["otra diaria"].index != "2023-06-01", 1.0)},
+    "baja": {**BASE, "diaria": BASE["diaria"].iloc[:-15]},
+    "serie nueva": {**BASE, "nueva": _daily("2023-01-01", "2024-03-14", 7)},
+}
+
+
+def _assert_same_state(a: pd.DataFrame, b: pd.DataFrame) -> None:
+    a, b = a.sort_index(), b.sort_index()
+    assert list(a.index) == list(b.index)
+    pd.testing.assert_series_equal(a["fecha"], b["fecha"])
+    for col in ("ultimo", "primero", "mom", "yoy"):
+        np.testing.assert_allclose(a[col].to_numpy(float), b[col].to_numpy(float), rtol=1e-12, equal_nan=True)
+    np.testing.assert_array_equal(a["n"].to_numpy(), b["n"].to_numpy())
+    for col in ("meses", "cierres"):
+        for x, y in zip(a[col], b[col]):
+            np.testing.assert_allclose(np.asarray(x, float), np.asarray(y, float), rtol=1e-12)
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_update_matches_full(case):
+    old, new = make_store(BASE), make_store(CASES[case])
+    delta = bu._diff_stores(old, new)
+    assert len(delta)
+    _assert_same_state(bu.update_kpi_state(bu.kpi_state(old), new, delta), bu.kpi_state(new))
+
+
+def test_state_matches_compute_kpis():
+    store = make_store(CASES["cruza meses"])
+    kpis = bu.kpis_from_state(bu.kpi_state(store))
+    for name in store.names:
+        s = store.series(name)
+        mom, yoy, _ = bu.compute_kpis(s, s)
+        assert kpis.loc[name, "mom"] == pytest.approx(mom, nan_ok=True)
+        assert kpis.loc[name, "yoy"] == pytest.approx(yoy, nan_ok=True)
+
+
+def test_empty_delta_keeps_state():
+    store = make_store(BASE)
+    state = bu.kpi_state(store)
+    assert bu.update_kpi_state(state, store, bu._diff_stores(store, store)) is state
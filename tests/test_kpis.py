@@ -0,0 +1,57 @@
+# tests/test_kpis.py
+# kpi_table (una pasada vectorizada) contra compute_kpis serie por serie.
+import numpy as np
+import pandas as pd
+import pytest
+
+import bcra_utils as bu
+from conftest import monetarias
+
+DIARIA = "Reservas (en millones de USD)"
+MENSUAL = "Préstamos al sector privado (en millones de pesos)"
+
+
+@pytest.fixture
+def kpi_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(bu, "_DISK_ENABLED", False)
+    rng = np.random.default_rng(11)
+    daily = pd.date_range("2022-11-01", "2025-03-10", freq="B")
+    monthly = pd.date_range("2022-11-30", "2025-02-28", freq="ME")
+    rows = [(1, DIARIA, f"{d:%Y-%m-%d}", v) for d, v in zip(daily, 100 + rng.normal(0, 1, len(daily)).cumsum())]
+    rows += [(7, MENSUAL, f"{d:%Y-%m-%d}", v) for d, v in zip(monthly, rng.uniform(50, 80, len(monthly)))]
+    monetarias(rows).to_csv(tmp_path / "monetarias_long.csv", index=False)
+    bu.build_store(tmp_path, incremental=False)
+    return tmp_path
+
+
+def _expected(store, name, start, end, freq, how):
+    vis = bu.resample_series(store.series(name, start, end), freq, how)
+    # compute_kpis devuelve None donde la tabla tiene NaN
+    return [np.nan if x is None else x for x in bu.compute_kpis(store.series(name), vis)]
+
+
+@pytest.mark.parametrize("freq, how", [("D", "last"), ("W", "last"), ("M", "last"), ("M", "mean"), ("Q", "last")])
+@pytest.mark.parametrize("start, end", [
+    (None, None),
+    ("2023-06-10", "2024-09-17"),
+    (None, "2025-02-28"),            # YoY de feb contra el cierre del 29/02/2024
+    ("2024-02-01", "2024-02-29"),
+])
+def test_kpi_table_matches_compute_kpis(kpi_dir, freq, how, start, end):
+    store = bu.load_bcra_store(kpi_dir)
+    table = bu.kpi_table([DIARIA, MENSUAL], start, end, freq, how, kpi_dir)
+    for name in (DIARIA, MENSUAL):
+        mom, yoy, d_per = _expected(store, name, start, end, freq, how)
+        assert table.loc[name, "mom"] == pytest.approx(mom, nan_ok=True, rel=1e-12)
+        assert table.loc[name, "yoy"] == pytest.approx(yoy, nan_ok=True, rel=1e-12)
+        assert table.loc[name, "d_per"] == pytest.approx(d_per, nan_ok=True, rel=1e-12)
+
+
+def test_yoy_after_leap_day_uses_the_same_month(kpi_dir):
+    store = bu.load_bcra_store(kpi_dir)
+    m = store.series(MENSUAL)
+    exp = (m["2025-02-28"] / m["2024-02-29"] - 1) * 100
+    assert bu.compute_kpis(m, m[:"2025-02-28"])[1] == pytest.approx(exp)
+    assert bu.kpi_table([MENSUAL], None, "2025-02-28", data_dir=kpi_dir).loc[MENSUAL, "yoy"] == pytest.approx(exp)
+    # sin rango: estado incremental, mismo número
+    assert bu.kpi_table([MENSUAL], data_dir=kpi_dir).loc[MENSUAL, "yoy"] == pytest.approx(exp)
@@ -0,0 +1,29 @@
+# tests/test_loaders.py
+# Loaders públicos de bcra_utils sobre un data/ chico armado en tmp_path.
+import pandas as pd
+import pytest
+
+import bcra_utils as bu
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    fechas = pd.date_range("2024-01-01", periods=40, freq="D").strftime("%Y-%m-%d")
+    rows = [(1, "Reservas (en millones de USD)", f, 100.0 + i) for i, f in enumerate(fechas)]
+    rows += [(5, "Tipo de cambio mayorista, en pesos por dólar", f, 800.0 + i / 2) for i, f in enumerate(fechas[::2])]
+    pd.DataFrame(rows, columns=["id", "descripcion", "fecha", "valor"]).to_csv(tmp_path / "monetarias_long.csv", index=False)
+    return tmp_path
+
+
+def _plain(df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(descripcion=df["descripcion"].astype(str)).reset_index(drop=True)
+
+
+def test_load_bcra_long_store_and_csv_fallback(data_dir):
+    from_csv = _plain(bu.load_bcra_long(data_dir))
+    assert list(from_csv.columns) == ["fecha", "descripcion", "valor"]
+    assert len(from_csv) == 60
+    bu.build_store(data_dir)
+    from_store = _plain(bu.load_bcra_long(data_dir))
+    pd.testing.assert_frame_equal(from_store, from_csv)
+    assert from_store.equals(from_store.sort_values(["descripcion", "fecha"]).reset_index(drop=True))
@@ -0,0 +1,67 @@
+# tests/test_pin.py
+# Versión fijada por rerun (pin_data_version): todo lo que pide un rerun sale de la misma
+# versión de datos, con o sin el watcher recargando en el medio.
+import threading
+
+import pandas as pd
+import pytest
+
+import bcra_utils as bu
+from conftest import daily_rows, monetarias
+
+NAME = "Reservas (en millones de USD)"
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    for attr in ("_SHARED", "_BY_VERSION", "_LOADERS", "_GEN"):
+        monkeypatch.setattr(bu, attr, {})
+    monkeypatch.setattr(bu, "_PIN", threading.local())
+    monkeypatch.setattr(bu, "_WATCH_CHECKED", True)
+    monkeypatch.setattr(bu, "_WATCHER", None)
+    monkeypatch.setattr(bu, "_DISK_ENABLED", False)
+
+
+def _append_and_build(data_dir):
+    monetarias(daily_rows(1, NAME, "2024-03-31", 7, 3)).to_csv(
+        data_dir / "monetarias_long.csv", mode="a", header=False, index=False
+    )
+    bu.build_store(data_dir)
+
+
+def _rerun(data_dir, between=None):
+    """stats y store de un rerun, con `between()` (p.ej. el watcher) entre las dos lecturas."""
+    bu.pin_data_version(data_dir)
+    stats = bu.load_series_stats(data_dir)
+    if between is not None:
+        between()
+    store = bu.load_bcra_store(data_dir)
+    return stats.loc[NAME, "hasta"], store.series(NAME).index[-1]
+
+
+def test_pin_with_watcher_keeps_the_loaded_version(data_dir, monkeypatch):
+    old = _rerun(data_dir)
+    monkeypatch.setattr(bu, "_WATCHER", object())
+    _append_and_build(data_dir)
+
+    # el rerun arranca con la versión en memoria; el watcher recarga en el medio
+    stats_end, store_end = _rerun(data_dir, between=bu._refresh_shared)
+    assert stats_end == store_end == old[1]
+
+    # el rerun siguiente ya ve la generación nueva, entera
+    stats_end, store_end = _rerun(data_dir)
+    assert stats_end == store_end == pd.Timestamp("2024-04-06")
+
+
+def test_pin_without_watcher_loads_the_new_version(data_dir):
+    _rerun(data_dir)
+    _append_and_build(data_dir)
+    stats_end, store_end = _rerun(data_dir, between=bu._refresh_shared)
+    assert stats_end == store_end == pd.Timestamp("2024-04-06")
+
+
+def test_snapshot_rebuilt_by_loader_is_still_versioned(data_dir):
+    (data_dir / bu.SNAPSHOT_FILE).unlink()
+    bu.load_bcra_store(data_dir)
+    key = ("bcra_store", str(data_dir.resolve()), "float64")
+    assert (key, bu.data_version(data_dir)) in bu._BY_VERSION
@@ -0,0 +1,37 @@
+# tests/test_query.py
+# query(): SQL (DuckDB) sobre los archivos de data/, también con paths raros.
+import shutil
+
+import pytest
+
+import bcra_utils as bu
+
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture
+def quoted_dir(data_dir, tmp_path):
+    # una comilla en el path no puede romper (ni inyectarse en) el CREATE VIEW
+    out = tmp_path / "datos d'o"
+    shutil.copytree(data_dir, out)
+    return out
+
+
+def test_series_and_views(quoted_dir):
+    store = bu._read_store(quoted_dir / bu.STORE_FILE)
+    n = bu.query("SELECT count(*) AS n FROM series", data_dir=quoted_dir)["n"].iloc[0]
+    assert n == len(store)
+    got = bu.query(
+        "SELECT descripcion, count(*) AS n FROM views WHERE vista = ? GROUP BY 1 ORDER BY 1", ["M_last"], quoted_dir
+    )
+    monthly = store.resample("M", "last")
+    assert dict(zip(got["descripcion"], got["n"])) == {
+        name: int(hi - lo) for name, lo, hi in zip(monthly.names, monthly.offsets[:-1], monthly.offsets[1:])
+    }
+
+
+def test_missing_file_drops_the_view(quoted_dir):
+    assert len(bu.query("SELECT * FROM stats", data_dir=quoted_dir))
+    (quoted_dir / bu.STATS_FILE).unlink()
+    with pytest.raises(Exception, match="stats"):
+        bu.query("SELECT * FROM stats", data_dir=quoted_dir)
@@ -0,0 +1,81 @@
+# tests/test_real.py
+# Series en términos reales: deflactor con base fija REAL_BASE, mensual por mes y diario
+# interpolado hasta la mitad del último mes con IPC.
+import numpy as np
+import pandas as pd
+import pytest
+
+import bcra_utils as bu
+from conftest import assert_same_store, make_store
+
+PESOS = "Base monetaria (en millones de pesos)"
+MENSUAL = "Préstamos al sector privado (en millones de pesos)"
+USD = "Reservas (en millones de USD)"
+
+
+def _ipc(first="2024-01", n=13, start=100.0):
+    months = np.arange(n, dtype=np.int64) + int(np.datetime64(first, "M").astype(np.int64))
+    return months, start * 1.03 ** np.arange(n)
+
+
+@pytest.fixture
+def store():
+    daily = pd.date_range("2024-01-01", "2025-02-28", freq="D")
+    monthly = pd.date_range("2024-01-31", "2025-01-31", freq="ME")
+    return make_store({
+        PESOS: pd.Series(np.linspace(1000, 2000, len(daily)), index=daily),
+        MENSUAL: pd.Series(np.linspace(50, 80, len(monthly)), index=monthly),
+        USD: pd.Series(np.ones(len(daily)), index=daily),
+    })
+
+
+def test_is_ars():
+    assert bu.is_ars(PESOS) and bu.is_ars(MENSUAL)
+    assert not bu.is_ars(USD)
+    assert not bu.is_ars("Tasa de política monetaria (en % n.a.) (en millones de pesos)")
+    assert not bu.is_ars(bu.real_name(PESOS))
+
+
+def test_monthly_uses_its_month_and_fixed_base(store):
+    months, level = ipc = _ipc()
+    real = bu.real_terms(store, ipc)
+    assert set(real.names) == {bu.real_name(PESOS), bu.real_name(MENSUAL)}
+    base = level[months == bu._real_base_month()][0]
+    nominal, got = store.series(MENSUAL), real.series(bu.real_name(MENSUAL))
+    m = nominal.index.to_period("M").to_timestamp().to_numpy().astype("datetime64[M]").astype(np.int64)
+    np.testing.assert_allclose(got.to_numpy(), nominal.to_numpy() * base / level[np.searchsorted(months, m)])
+
+
+def test_daily_is_exact_at_mid_month_and_stops_at_last_ipc(store):
+    months, level = ipc = _ipc()
+    real = bu.real_terms(store, ipc).series(bu.real_name(PESOS))
+    base = level[months == bu._real_base_month()][0]
+    nominal = store.series(PESOS)
+    for i, mo in enumerate(months):
+        day = pd.Timestamp(np.datetime64(int(mo), "M")) + pd.Timedelta(days=14)
+        assert real[day] == pytest.approx(nominal[day] * base / level[i], rel=1e-12)
+    assert real.index[-1] == pd.Timestamp("2025-01-15")
+
+
+def test_new_ipc_month_only_appends(store):
+    old = bu.real_terms(store, _ipc(n=12))
+    new = bu.real_terms(store, _ipc(n=13))
+    assert len(new) > len(old)
+    assert not np.isnan(bu._diff_stores(old, new).values).any()      # nada cambia ni desaparece
+    for name in old.names:
+        a, b = old.series(name), new.series(name)
+        pd.testing.assert_series_equal(b[: a.index[-1]], a)
+
+
+def test_without_base_month_there_are_no_real_series(store):
+    assert not len(bu.real_terms(store, _ipc(first="2023-01", n=12)))
+
+
+def test_with_real_terms_is_idempotent(store, tmp_path):
+    months, level = _ipc()
+    pd.DataFrame({
+        "fecha": pd.to_datetime(months.astype("datetime64[M]")), "indicador": bu.IPC_INDICADOR, "valor": level,
+    }).to_parquet(tmp_path / bu.IPC_FILE, index=False)
+    once = bu.with_real_terms(store, tmp_path)
+    assert bu.real_name(PESOS) in once.index
+    assert_same_store(bu.with_real_terms(once, tmp_path), once)
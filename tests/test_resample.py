@@ -0,0 +1,59 @@
+# tests/test_resample.py
+# El motor vectorizado de re-muestreo contra pandas (fin de período, sin períodos vacíos).
+import numpy as np
+import pandas as pd
+import pytest
+
+import bcra_utils as bu
+from conftest import make_store
+
+RULES = {"W": "W-SUN", "M": "ME", "Q": "QE-DEC", "A": "YE-DEC"}
+
+
+@pytest.fixture
+def series(rng):
+    # días hábiles con huecos (meses enteros sin dato) y una serie más corta
+    idx = pd.date_range("2019-12-20", "2024-05-07", freq="B")
+    idx = idx[(idx.month != 7) | (idx.year != 2021)]
+    a = pd.Series(rng.normal(100, 10, len(idx)), index=idx)
+    b = a.iloc[::3] * 2 + 1
+    return {"a": a, "b (en %)": b.iloc[100:]}
+
+
+def _expected(s: pd.Series, freq: str, how: str) -> pd.Series:
+    r = s.resample(RULES[freq])
+    # pandas suma 0 en los períodos vacíos; el motor no los emite
+    return (r.sum(min_count=1) if how == "sum" else r.agg(how)).dropna()
+
+
+@pytest.mark.parametrize("how", bu.HOWS)
+@pytest.mark.parametrize("freq", list(RULES))
+def test_store_resample_matches_pandas(series, freq, how):
+    out = make_store(series).resample(freq, how)
+    for name, s in series.items():
+        got = out.series(name)
+        exp = _expected(s, freq, how)
+        np.testing.assert_array_equal(got.index.to_numpy(), exp.index.to_numpy())
+        np.testing.assert_allclose(got.to_numpy(), exp.to_numpy(), rtol=1e-12)
+
+
+@pytest.mark.parametrize("freq", list(RULES) + ["Y"])
+def test_resample_series_matches_pandas(series, freq):
+    s = series["a"]
+    got = bu.resample_series(s, freq, "mean")
+    exp = _expected(s, bu._freq(freq), "mean")
+    np.testing.assert_array_equal(got.index.to_numpy(), exp.index.to_numpy())
+    np.testing.assert_allclose(got.to_numpy(), exp.to_numpy(), rtol=1e-12)
+
+
+def test_auto_uses_mean_for_rates(series):
+    out = make_store(series).resample("M", "auto")
+    np.testing.assert_allclose(out.series("b (en %)").to_numpy(), _expected(series["b (en %)"], "M", "mean").to_numpy())
+    np.testing.assert_allclose(out.series("a").to_numpy(), _expected(series["a"], "M", "last").to_numpy())
+
+
+def test_range_is_cut_before_grouping(series):
+    s = series["a"]
+    got = make_store(series).resample("M", "sum", ["a"], "2021-03-15", "2021-05-10").series("a")
+    exp = _expected(s.loc["2021-03-15":"2021-05-10"], "M", "sum")
+    np.testing.assert_allclose(got.to_numpy(), exp.to_numpy(), rtol=1e-12)
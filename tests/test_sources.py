@@ -0,0 +1,50 @@
+# tests/test_sources.py
+# Registro de fuentes: alias al nombre canónico y, por (serie, fecha), gana la de menor prioridad.
+from pathlib import Path
+
+import pandas as pd
+
+import bcra_utils as bu
+from conftest import daily_rows, monetarias
+
+BASE = "Base monetaria\xa0- Total (en millones de pesos)"
+
+
+def _write_sources(tmp_path):
+    # monetarias (prioridad 0) trae marzo; el CSV histórico (prioridad 1, alias) trae feb-mar
+    monetarias(daily_rows(15, BASE, "2024-03-01", 31, 1)).to_csv(tmp_path / "monetarias_long.csv", index=False)
+    pd.DataFrame({"fecha": pd.date_range("2024-02-01", "2024-03-31").strftime("%Y-%m-%d"), "valor": -1.0}).to_csv(
+        tmp_path / "base_monetaria.csv", index=False
+    )
+
+
+def _check(s: pd.Series):
+    assert s.index.is_unique and s.index.is_monotonic_increasing
+    assert (s[:"2024-02-29"] == -1.0).all() and len(s[:"2024-02-29"]) == 29
+    assert (s["2024-03-01":] != -1.0).all() and len(s["2024-03-01":]) == 31
+
+
+def test_alias_and_precedence_in_csv_fallback(tmp_path):
+    _write_sources(tmp_path)
+    long = bu._load_csv_dir(tmp_path)
+    assert set(long["descripcion"]) == {BASE}
+    _check(long.set_index("fecha")["valor"])
+
+
+def test_store_resolves_overlap_on_incremental_append(tmp_path):
+    _write_sources(tmp_path)
+    bu.build_store(tmp_path, incremental=False)
+    _check(bu._read_store(tmp_path / bu.STORE_FILE).series(BASE))
+
+    # la fuente de menor rango repite fechas que ya trajo monetarias: no pisa nada
+    with open(tmp_path / "base_monetaria.csv", "a", encoding="utf-8") as f:
+        f.write("2024-03-15,-1.0\n")
+    bu.build_store(tmp_path)
+    _check(bu._read_store(tmp_path / bu.STORE_FILE).series(BASE))
+
+
+def test_last_row_wins_within_a_file():
+    df = pd.DataFrame({"fecha": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-01"]),
+                       "descripcion": "x", "valor": [1.0, 2.0, 3.0]})
+    out = bu._concat_long([df], [Path("otro.csv")])
+    assert out["valor"].tolist() == [3.0, 2.0]
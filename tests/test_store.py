@@ -0,0 +1,70 @@
+# tests/test_store.py
+# build_store incremental (sólo las colas nuevas de los CSV) vs re-ingesta completa.
+import pandas as pd
+import pytest
+
+import bcra_utils as bu
+from conftest import assert_same_store, daily_rows, monetarias
+
+LOCAL = [bu.STORE_FILE, bu.SNAPSHOT_FILE, bu.STATS_FILE, bu.VIEWS_FILE]
+
+
+@pytest.fixture
+def full_calls(monkeypatch):
+    calls = []
+    orig = bu._build_store_full
+    monkeypatch.setattr(bu, "_build_store_full", lambda *a: calls.append(a) or orig(*a))
+    return calls
+
+
+def _append(data_dir):
+    new = monetarias(
+        daily_rows(1, "Reservas (en millones de USD)", "2024-03-31", 20, 3)
+        + daily_rows(42, "Pases pasivos (en millones de pesos)", "2024-03-01", 30, 4)
+    )
+    new.to_csv(data_dir / "monetarias_long.csv", mode="a", header=False, index=False)
+    with open(data_dir / "tasa_demo.csv", "a", encoding="utf-8") as f:
+        f.write("2024-03-01,60.5\n2024-03-02,61.5\n")
+
+
+def _full_rebuild(data_dir) -> "bu.SeriesStore":
+    bu.build_store(data_dir, incremental=False)
+    return bu._read_store(data_dir / bu.STORE_FILE)
+
+
+def test_incremental_append_matches_full(data_dir, full_calls):
+    _append(data_dir)
+    bu.build_store(data_dir)
+    assert not full_calls
+    inc = bu._read_store(data_dir / bu.STORE_FILE)
+    assert "Pases pasivos (en millones de pesos)" in inc.index
+    assert_same_store(inc, _full_rebuild(data_dir))
+    assert_same_store(bu.load_version(None, data_dir), inc)
+
+
+def test_no_changes_keeps_store(data_dir, full_calls):
+    before = bu._read_store(data_dir / bu.STORE_FILE)
+    bu.build_store(data_dir)
+    assert not full_calls
+    assert_same_store(bu._read_store(data_dir / bu.STORE_FILE), before)
+    assert len(bu.list_versions(data_dir)) == 1
+
+
+def test_rewritten_csv_falls_back_to_full(data_dir, full_calls):
+    df = pd.read_csv(data_dir / "monetarias_long.csv")
+    df.loc[0, "valor"] = -1.0
+    df.to_csv(data_dir / "monetarias_long.csv", index=False)
+    bu.build_store(data_dir)
+    assert full_calls
+    store = bu._read_store(data_dir / bu.STORE_FILE)
+    assert store.series("Reservas (en millones de USD)").iloc[0] == -1.0
+
+
+def test_clean_clone_rebuilds_from_versions(data_dir, full_calls):
+    # lo commiteado: data/store/ + manifest + esquemas; el resto es local
+    for f in LOCAL:
+        (data_dir / f).unlink()
+    _append(data_dir)
+    bu.build_store(data_dir)
+    assert not full_calls
+    assert_same_store(bu._read_store(data_dir / bu.STORE_FILE), _full_rebuild(data_dir))
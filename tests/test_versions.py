@@ -0,0 +1,79 @@
+# tests/test_versions.py
+# data/store/: base + deltas. Cada versión registrada se recupera tal cual.
+import numpy as np
+import pandas as pd
+import pytest
+
+import bcra_utils as bu
+from conftest import assert_same_store, make_store
+
+
+def _series(start, periods, seed, step=1.0):
+    idx = pd.date_range(start, periods=periods, freq="D")
+    return pd.Series(np.random.default_rng(seed).normal(100, step, periods), index=idx)
+
+
+@pytest.fixture
+def history():
+    """Versiones sucesivas: alta de filas, revisión, baja, serie nueva."""
+    a, b = _series("2023-01-01", 400, 1), _series("2023-01-01", 400, 2)
+    v0 = {"a": a, "b": b}
+    v1 = {"a": pd.concat([a, _series("2024-02-05", 3, 3)]), "b": b}
+    a_rev = v1["a"].copy()
+    a_rev.iloc[10] = -5.0
+    v2 = {"a": a_rev, "b": b.iloc[:-2]}
+    v3 = {**v2, "c": _series("2024-01-01", 20, 4)}
+    return [make_store(v) for v in (v0, v1, v2, v3)]
+
+
+def test_round_trip(tmp_path, history):
+    ids = [bu.record_version(s, tmp_path, run_id=f"20240101T00000{i}Z") for i, s in enumerate(history)]
+    assert [s["kind"] for s in bu.list_versions(tmp_path)] == ["base", "delta", "delta", "delta"]
+    for vid, store in zip(ids, history):
+        assert_same_store(bu.load_version(vid, tmp_path), store)
+    assert_same_store(bu.load_version(None, tmp_path), history[-1])
+    # delta de una revisión: sólo la fila cambiada
+    assert bu.list_versions(tmp_path)[2]["rows"] == 3
+
+
+def test_no_changes_records_nothing(tmp_path, history):
+    bu.record_version(history[0], tmp_path)
+    assert bu.record_version(history[0], tmp_path) is None
+    assert len(bu.list_versions(tmp_path)) == 1
+
+
+def test_as_of_date(tmp_path, history):
+    bu.record_version(history[0], tmp_path, run_id="20240101T120000Z")
+    bu.record_version(history[1], tmp_path, run_id="20240102T120000Z")
+    assert_same_store(bu.load_version("2024-01-01", tmp_path), history[0])
+    assert_same_store(bu.load_version(pd.Timestamp("2024-01-02 13:00", tz="UTC"), tmp_path), history[1])
+
+
+def test_as_of_before_history_raises(tmp_path, history):
+    bu.record_version(history[0], tmp_path, run_id="20240102T120000Z")
+    with pytest.raises(LookupError, match="20240102T120000Z"):
+        bu.load_version("2024-01-01", tmp_path)
+    assert not len(bu.load_version("2024-01-01", tmp_path / "otro"))   # sin versiones: vacío
+
+
+def test_compaction_keeps_the_retention_window(tmp_path, monkeypatch):
+    monkeypatch.setattr(bu, "COMPACT_EVERY", 3)
+    monkeypatch.setattr(bu, "KEEP_MONTHS", 6)
+    a = _series("2022-01-01", 400, 1)
+    ids = [f"{d:%Y%m%d}T120000Z" for d in pd.date_range("2023-01-01", "2024-12-31", freq="SMS")]
+    stores = [make_store({"a": a.iloc[: 300 + k]}) for k in range(len(ids))]
+    for vid, s in zip(ids, stores):
+        bu.record_version(s, tmp_path, run_id=vid)
+
+    segs = bu.list_versions(tmp_path)
+    on_disk = {p.name for p in (tmp_path / bu.VERSIONS_DIR).iterdir()} - {bu.VERSIONS_MANIFEST}
+    assert on_disk == {s["file"] for s in segs}
+    # toda versión dentro de los últimos 6 meses se reconstruye tal cual; lo podado avisa
+    horizon = (pd.Timestamp(ids[-1]) - pd.DateOffset(months=6)).strftime("%Y%m%dT%H%M%SZ")
+    for vid, s in zip(ids, stores):
+        if vid >= horizon:
+            assert_same_store(bu.load_version(vid, tmp_path), s)
+    assert segs[0]["id"] > ids[0]
+    with pytest.raises(LookupError):
+        bu.load_version(ids[0], tmp_path)
+    assert_same_store(bu.load_version(None, tmp_path), stores[-1])
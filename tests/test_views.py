@@ -0,0 +1,38 @@
+# tests/test_views.py
+# Vistas materializadas (W/M/Q/A) contra el re-muestreo en el momento del store.
+import pandas as pd
+import pytest
+
+import bcra_utils as bu
+from conftest import assert_same_store, daily_rows, monetarias
+
+NAMES = ["Reservas (en millones de USD)", "Tipo de cambio mayorista, en pesos por dólar", "tasa_demo"]
+
+
+@pytest.mark.parametrize("freq, how", bu.STORE_VIEWS)
+def test_views_file_matches_resample(data_dir, freq, how):
+    store = bu._read_store(data_dir / bu.STORE_FILE)
+    assert_same_store(bu._read_view(data_dir / bu.VIEWS_FILE, freq, how), store.resample(freq, how))
+
+
+@pytest.mark.parametrize("freq, how", bu.STORE_VIEWS)
+@pytest.mark.parametrize("start, end", [
+    (None, None),
+    ("2024-01-10", "2024-03-20"),     # bordes a mitad de período: esos se re-muestrean
+    ("2024-02-01", "2024-02-29"),
+    ("2024-03-05", None),
+])
+def test_get_wide_matches_store_wide(data_dir, freq, how, start, end):
+    store = bu.load_bcra_store(data_dir)
+    got = bu.get_wide(NAMES, start, end, freq, how, data_dir)
+    pd.testing.assert_frame_equal(got, store.wide(NAMES, start, end, freq, how))
+
+
+def test_views_follow_incremental_append(data_dir):
+    monetarias(daily_rows(1, NAMES[0], "2024-03-31", 45, 3)).to_csv(
+        data_dir / "monetarias_long.csv", mode="a", header=False, index=False
+    )
+    bu.build_store(data_dir)
+    store = bu._read_store(data_dir / bu.STORE_FILE)
+    for freq, how in bu.STORE_VIEWS:
+        assert_same_store(bu._read_view(data_dir / bu.VIEWS_FILE, freq, how), store.resample(freq, how))
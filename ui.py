@@ -6,6 +6,8 @@ import re, hashlib
 import plotly.io as pio
 import streamlit as st
 
+from bcra_utils import REAL_BASE, REAL_SUFFIX, pin_data_version, real_name
+
 # ---------------- Plotly template ----------------
 _ATLAS_TEMPLATE = dict(
     layout=dict(
@@ -22,6 +24,17 @@ _ATLAS_TEMPLATE = dict(
 pio.templates["atlas_dark"] = _ATLAS_TEMPLATE
 pio.templates.default = "atlas_dark"
 
+# ---------------- Versión de datos del rerun ----------------
+def pin_data(data_dir: str = "data") -> str:
+    """
+    Fija la versión de datos de este rerun (ver `bcra_utils.pin_data_version`) y la deja en
+    `st.session_state["data_version"]`. Va arriba de cada página, antes de leer datos: así
+    resumen, store, vistas y KPIs del rerun son de la misma versión aunque llegue un fetch.
+    """
+    version = pin_data_version(data_dir)
+    st.session_state["data_version"] = version
+    return version
+
 # ---------------- CSS global ----------------
 def inject_css() -> None:
     st.markdown(
@@ -137,6 +150,41 @@ _GOV_PERIODS = [
 def _parse_date(s: Optional[str]) -> Optional[dt.date]:
     return None if not s else dt.date.fromisoformat(s)
 
+# etiqueta del selector -> (freq, agregación) para SeriesStore.wide / resample_series
+FREQ_OPTIONS = {
+    "Diaria": ("D", "last"),
+    "Semanal (fin de semana)": ("W", "last"),
+    "Mensual (fin de mes)": ("M", "last"),
+    "Mensual (promedio)": ("M", "mean"),
+    "Trimestral (fin de trimestre)": ("Q", "last"),
+    "Trimestral (promedio)": ("Q", "mean"),
+    "Anual (fin de año)": ("A", "last"),
+    "Anual (promedio)": ("A", "mean"),
+}
+
+def freq_code(label: str) -> Tuple[str, str]:
+    """Etiqueta de 'Frecuencia' -> (freq, how). Desconocida = diaria."""
+    return FREQ_OPTIONS.get(label, ("D", "last"))
+
+def real_terms_toggle(sel: Sequence[str], available, key: str) -> list[str]:
+    """
+    Toggle "En términos reales": cambia cada serie en pesos de `sel` por su versión
+    deflactada del store (si está en `available`). Sin ninguna deflactable no muestra nada.
+    """
+    reales = {n: real_name(n) for n in sel if real_name(n) in available}
+    if not reales:
+        return list(sel)
+    on = st.toggle(
+        "En términos reales", value=False, key=key,
+        help=f"Series en pesos a precios constantes de {dt.date.fromisoformat(REAL_BASE + '-01'):%m/%Y} (IPC del INDEC, vía DatosAR).",
+    )
+    return [reales.get(n, n) for n in sel] if on else list(sel)
+
+
+def is_real(name: str) -> bool:
+    return name.endswith(REAL_SUFFIX)
+
+
 def range_controls(
     dmin: dt.date | dt.datetime, dmax: dt.date | dt.datetime, key: str = "", show_government: bool = True,
 ) -> Tuple[dt.date, dt.date, str]:
@@ -170,8 +218,9 @@ def range_controls(
             gov_label = st.selectbox("Gobierno", gov_options, index=gov_options.index(st.session_state[gov_key]),
                                      key=gov_key, on_change=_on_gov_change)
     with col3:
-        freq_label = st.selectbox("Frecuencia", ["Diaria", "Mensual (fin de mes)"],
-                                  index=0 if st.session_state[fq_key] == "Diaria" else 1, key=fq_key)
+        fq_opts = list(FREQ_OPTIONS)
+        if st.session_state[fq_key] not in fq_opts: st.session_state[fq_key] = "Diaria"
+        freq_label = st.selectbox("Frecuencia", fq_opts, index=fq_opts.index(st.session_state[fq_key]), key=fq_key)
 
     dmin = (dmin.date() if hasattr(dmin, "date") else dmin)
     dmax = (dmax.date() if hasattr(dmax, "date") else dmax)